@@ -0,0 +1,291 @@
+"""Banco de pruebas de rendimiento del simulador y de las colas
+
+Mide cada operación con entradas generadas de 10^2 a 10^4 elementos. Los tamaños 10^5 y
+10^6 son corridas largas y se piden con --tamaños.
+
+Los resultados se escriben en JSON. Si hay una base guardada, toda medición cuyo tiempo
+por operación empeora más que la tolerancia se marca como regresión y el proceso termina
+con código 1.
+
+    python benchmark.py                                   # compara con benchmark_base.json
+    python benchmark.py --tamaño-maximo 10000 --guardar-base
+    python benchmark.py --pruebas dijkstra cola_enlazada --tamaños 1000 100000
+    python benchmark.py --tamaños 100 1000 10000 100000 1000000 --salida completo.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+import proyecto
+from proyecto import (Emergencia, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo,
+                      TablaHashEmergencias, TipoEmergencia)
+
+# colas.py ejecuta su demostración al importarse: se silencia
+with contextlib.redirect_stdout(io.StringIO()):
+    import colas
+import colas2
+
+# Tamaños por defecto, aptos para comparar con la base de forma rutinaria
+TAMAÑOS = (10 ** 2, 10 ** 3, 10 ** 4)
+# Tamaño máximo de las pruebas cuadráticas (la cola sobre lista desencola con pop(0))
+LIMITES = {'cola_lista': 10 ** 5}
+TOLERANCIA = 0.25
+BASE_POR_DEFECTO = 'benchmark_base.json'
+SALIDA_POR_DEFECTO = 'benchmark_resultados.json'
+# Estaciones de la red fija sobre la que se registran emergencias
+NODOS_REGISTRO = 1000
+
+def _emergencias(cantidad: int, rng: random.Random) -> List[Emergencia]:
+    tipos = list(TipoEmergencia)
+    prioridades = list(PrioridadEmergencia)
+    return [
+        Emergencia(f"B{i}", rng.choice(tipos), rng.choice(prioridades),
+                   (rng.uniform(-10, 10), rng.uniform(-10, 10)), "benchmark", timestamp=float(i))
+        for i in range(cantidad)
+    ]
+
+def _simulador(num_nodos: int, recursos_por_nodo=(1, 3)) -> SimuladorRedLAN:
+    # Sin caché de rutas: cada consulta a dijkstra hace la búsqueda completa
+    sim = SimuladorRedLAN(capacidad_cache_rutas=0, semilla=num_nodos, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos, recursos_por_nodo=recursos_por_nodo)
+    return sim
+
+@lru_cache(maxsize=1)
+def _red(num_nodos: int) -> SimuladorRedLAN:
+    """Red compartida por las pruebas de un mismo tamaño (generar 10^6 nodos lleva su tiempo)"""
+    return _simulador(num_nodos)
+
+def preparar_dijkstra(n: int, rng: random.Random) -> Callable[[], int]:
+    sim = _red(n)
+    ids = list(sim.nodos)
+    pares = [(rng.choice(ids), rng.choice(ids)) for _ in range(max(1, min(200, 10 ** 5 // n)))]
+
+    def ejecutar() -> int:
+        for origen, destino in pares:
+            sim.dijkstra(origen, destino)
+        return len(pares)
+    return ejecutar
+
+def preparar_buscar_nodos_cercanos(n: int, rng: random.Random) -> Callable[[], int]:
+    arbol = _red(n).arbol_geografico
+    # Radio con unos 10 nodos esperados dentro, sea cual sea la densidad
+    radio = math.sqrt(400 * 10 / (math.pi * n))
+    puntos = [(rng.uniform(-10, 10), rng.uniform(-10, 10)) for _ in range(1000)]
+
+    def ejecutar() -> int:
+        for punto in puntos:
+            arbol.buscar_nodos_cercanos(punto, radio)
+        return len(puntos)
+    return ejecutar
+
+def preparar_tabla_hash_insertar(n: int, rng: random.Random) -> Callable[[], int]:
+    emergencias = _emergencias(n, rng)
+
+    def ejecutar() -> int:
+        tabla = TablaHashEmergencias()
+        for emergencia in emergencias:
+            tabla.insertar(emergencia)
+        return n
+    return ejecutar
+
+def preparar_tabla_hash_buscar(n: int, rng: random.Random) -> Callable[[], int]:
+    emergencias = _emergencias(n, rng)
+    tabla = TablaHashEmergencias()
+    tabla.insertar_lote(emergencias)
+    ids = [emergencia.id for emergencia in emergencias]
+    rng.shuffle(ids)
+
+    def ejecutar() -> int:
+        for id_emergencia in ids:
+            tabla.buscar(id_emergencia)
+        return n
+    return ejecutar
+
+def preparar_registrar_emergencia(n: int, rng: random.Random) -> Callable[[], int]:
+    sim = _simulador(NODOS_REGISTRO)
+    emergencias = _emergencias(n, rng)
+
+    def ejecutar() -> int:
+        for emergencia in emergencias:
+            sim.registrar_emergencia(emergencia)
+        return n
+    return ejecutar
+
+def preparar_procesar_emergencias(n: int, rng: random.Random) -> Callable[[], int]:
+    # Diez recursos por estación y una estación cada diez emergencias: capacidad para casi todas
+    sim = _simulador(max(10, n // 10), recursos_por_nodo=(10, 10))
+    sim.registrar_emergencias_lote(_emergencias(n, rng))
+
+    def ejecutar() -> int:
+        return sim.procesar_emergencias(drenar=True)['despachadas']
+    return ejecutar
+
+def preparar_simular_falla_nodo(n: int, rng: random.Random) -> Callable[[], int]:
+    sim = _red(n)
+    for id_nodo in [id_nodo for id_nodo, nodo in sim.nodos.items() if not nodo.activo]:
+        sim.restaurar_nodo(id_nodo)
+    if not len(sim.tabla_emergencias):
+        sim.registrar_emergencias_lote(_emergencias(min(n, 10 ** 5), rng))
+    fallas = rng.sample(list(sim.nodos), min(100, max(1, n // 10)))
+
+    def ejecutar() -> int:
+        for id_nodo in fallas:
+            sim.simular_falla_nodo(id_nodo)
+        return len(fallas)
+    return ejecutar
+
+def _preparar_cola(clase) -> Callable[[int, random.Random], Callable[[], int]]:
+    def preparar(n: int, rng: random.Random) -> Callable[[], int]:
+        def ejecutar() -> int:
+            cola = clase()
+            # colas2.Queue imprime cada elemento encolado
+            with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+                for i in range(n):
+                    cola.enqueue(i)
+                for _ in range(n):
+                    cola.dequeue()
+            return 2 * n
+        return ejecutar
+    return preparar
+
+# Se corren en este orden para cada tamaño. simular_falla_nodo va al final porque hace fallar
+# nodos y redistribuye emergencias de la red compartida de _red, que ninguna otra usa después
+PRUEBAS: Dict[str, Callable[[int, random.Random], Callable[[], int]]] = {
+    'dijkstra': preparar_dijkstra,
+    'buscar_nodos_cercanos': preparar_buscar_nodos_cercanos,
+    'tabla_hash_insertar': preparar_tabla_hash_insertar,
+    'tabla_hash_buscar': preparar_tabla_hash_buscar,
+    'registrar_emergencia': preparar_registrar_emergencia,
+    'procesar_emergencias': preparar_procesar_emergencias,
+    'cola_enlazada': _preparar_cola(colas.Queue),
+    'cola_lista': _preparar_cola(colas2.Queue),
+    'simular_falla_nodo': preparar_simular_falla_nodo,
+}
+
+def medir(preparar: Callable[[int, random.Random], Callable[[], int]], n: int, semilla: int,
+          repeticiones: int = 5, presupuesto: float = 1.0) -> Dict:
+    """Mejor tiempo de varias corridas (sin medir la preparación), cortando al agotar el presupuesto"""
+    tiempos = []
+    operaciones = 0
+    while len(tiempos) < repeticiones:
+        ejecutar = preparar(n, random.Random(semilla))
+        gc.collect()
+        inicio = time.perf_counter()
+        operaciones = ejecutar()
+        tiempos.append(time.perf_counter() - inicio)
+        if sum(tiempos) >= presupuesto:
+            break
+    mejor = min(tiempos)
+    return {
+        'segundos': mejor,
+        'operaciones': operaciones,
+        'us_por_op': mejor / max(operaciones, 1) * 1e6,
+        'repeticiones': len(tiempos)
+    }
+
+def ejecutar_benchmark(tamaños=TAMAÑOS, pruebas: Optional[List[str]] = None, semilla: int = 0,
+                       repeticiones: int = 5, presupuesto: float = 1.0, mostrar: bool = True) -> Dict:
+    """Correr las pruebas pedidas en cada tamaño; devuelve el documento JSON de resultados"""
+    pruebas = [nombre for nombre in PRUEBAS if pruebas is None or nombre in pruebas]
+    resultados = {nombre: {} for nombre in pruebas}
+    inicio = time.perf_counter()
+
+    for n in sorted(tamaños):
+        for nombre in pruebas:
+            if n > LIMITES.get(nombre, n):
+                continue
+            medida = medir(PRUEBAS[nombre], n, semilla, repeticiones, presupuesto)
+            resultados[nombre][str(n)] = medida
+            if mostrar:
+                print(f"{nombre:24} n={n:<9} {medida['us_por_op']:12.3f} µs/op "
+                      f"({medida['operaciones']} ops, {medida['repeticiones']} corridas)", flush=True)
+        _red.cache_clear()
+
+    return {
+        'meta': {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': proyecto.np.__version__ if proyecto.np is not None else None,
+            'semilla': semilla,
+            'duracion': time.perf_counter() - inicio
+        },
+        'resultados': resultados
+    }
+
+def comparar(actual: Dict, base: Dict, tolerancia: float = TOLERANCIA) -> List[Dict]:
+    """Comparar µs/op contra la base; estado 'regresion', 'mejora' o 'igual' por medición común"""
+    comparacion = []
+    for nombre, por_tamaño in actual['resultados'].items():
+        for n, medida in por_tamaño.items():
+            referencia = base.get('resultados', {}).get(nombre, {}).get(n)
+            if referencia is None or referencia['us_por_op'] <= 0:
+                continue
+            razon = medida['us_por_op'] / referencia['us_por_op']
+            if razon > 1 + tolerancia:
+                estado = 'regresion'
+            elif razon < 1 / (1 + tolerancia):
+                estado = 'mejora'
+            else:
+                estado = 'igual'
+            comparacion.append({'prueba': nombre, 'tamaño': int(n), 'razon': razon, 'estado': estado,
+                                'us_por_op': medida['us_por_op'], 'us_por_op_base': referencia['us_por_op']})
+    return comparacion
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del simulador de red y de las colas")
+    parser.add_argument('--tamaños', type=int, nargs='+', default=list(TAMAÑOS),
+                        help="tamaños a medir (por defecto 10^2 a 10^4)")
+    parser.add_argument('--tamaño-maximo', type=int, default=None)
+    parser.add_argument('--pruebas', nargs='+', choices=list(PRUEBAS), default=None)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--presupuesto', type=float, default=1.0,
+                        help="segundos medidos a partir de los cuales no se repite una corrida")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', default=SALIDA_POR_DEFECTO)
+    parser.add_argument('--base', default=BASE_POR_DEFECTO)
+    parser.add_argument('--guardar-base', action='store_true', help="guardar los resultados como nueva base")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argumentos)
+
+    tamaños = [n for n in args.tamaños if args.tamaño_maximo is None or n <= args.tamaño_maximo]
+    resultados = ejecutar_benchmark(tamaños, args.pruebas, args.semilla, args.repeticiones, args.presupuesto)
+
+    regresiones = []
+    if os.path.exists(args.base) and not args.guardar_base:
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        comparacion = comparar(resultados, base, args.tolerancia)
+        resultados['comparacion'] = {'base': args.base, 'tolerancia': args.tolerancia,
+                                     'mediciones': comparacion}
+        regresiones = [medicion for medicion in comparacion if medicion['estado'] == 'regresion']
+        print(f"\nComparación con {args.base} (tolerancia {args.tolerancia:.0%}):")
+        for medicion in comparacion:
+            if medicion['estado'] != 'igual':
+                print(f"  {medicion['estado'].upper():10} {medicion['prueba']:24} n={medicion['tamaño']:<9} "
+                      f"x{medicion['razon']:.2f}")
+        print(f"  {len(regresiones)} regresiones en {len(comparacion)} mediciones comparadas")
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+    if args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Base actualizada en {args.base}")
+
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,41 @@
+import asyncio
+import functools
+import gc
 import heapq
+import itertools
 import json
+import mmap
+import os
+import pickle
+import statistics
+import struct
 import time
 import random
-from collections import defaultdict, deque
-from typing import Dict, List, Tuple, Optional, Set
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, field
 from enum import Enum
 import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan las rutas en Python puro
+    np = None
+
+@contextmanager
+def gc_pausado():
+    """Pausar el recolector cíclico mientras se crean o serializan muchos contenedores de golpe"""
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
 
 class TipoEmergencia(Enum):
     INCENDIO = "incendio"
@@ -33,7 +62,8 @@ class Emergencia:
     tiempo_respuesta: Optional[float] = None
     
     def __lt__(self, other):
-        return self.prioridad.value < other.prioridad.value
+        # A igual prioridad va primero la más antigua (la cabeza del heap es la de _clave_torneo)
+        return (self.prioridad.value, self.timestamp) < (other.prioridad.value, other.timestamp)
 
 @dataclass
 class Recurso:
@@ -43,6 +73,39 @@ class Recurso:
     disponible: bool = True
     capacidad: int = 1
 
+# Tipos de recurso preferidos para cada tipo de emergencia (si no hay, se usa cualquiera libre)
+RECURSOS_PREFERIDOS = {
+    TipoEmergencia.INCENDIO: ('bombero',),
+    TipoEmergencia.ACCIDENTE: ('ambulancia', 'policia'),
+    TipoEmergencia.ROBO: ('policia',),
+    TipoEmergencia.MEDICA: ('ambulancia',),
+    TipoEmergencia.RESCATE: ('bombero', 'ambulancia'),
+}
+
+class ModeloServicio:
+    """Duración de servicio de un recurso según el tipo de emergencia atendida"""
+    
+    # Duración media en segundos por tipo de emergencia
+    DURACIONES_MEDIAS = {
+        TipoEmergencia.INCENDIO: 3600.0,
+        TipoEmergencia.ACCIDENTE: 2400.0,
+        TipoEmergencia.ROBO: 1800.0,
+        TipoEmergencia.MEDICA: 2700.0,
+        TipoEmergencia.RESCATE: 4800.0,
+    }
+    
+    def __init__(self, duraciones: Optional[Dict[TipoEmergencia, float]] = None,
+                 variacion: float = 0.5, escala: float = 1.0):
+        self.duraciones = dict(self.DURACIONES_MEDIAS)
+        if duraciones:
+            self.duraciones.update(duraciones)
+        self.variacion = variacion  # Fracción de la media: uniforme en [1 - v, 1 + v]
+        self.escala = escala        # Comprime o expande todas las duraciones
+    
+    def duracion(self, tipo: TipoEmergencia, rng=random) -> float:
+        media = self.duraciones[tipo] * self.escala
+        return media * rng.uniform(1 - self.variacion, 1 + self.variacion)
+
 class Nodo:
     def __init__(self, id: str, nombre: str, ubicacion: Tuple[float, float]):
         self.id = id
@@ -54,23 +117,87 @@ class Nodo:
         self.datos_transmitidos = 0
         self.emergencias_atendidas = 0
         self.conexiones = {}  # {nodo_id: peso}
+        self.num_recursos_disponibles = 0
+        self.recursos_libres = defaultdict(dict)  # {tipo: {recurso_id: recurso}} siempre al día
+        self.al_cambiar: Optional[Callable[['Nodo'], None]] = None  # Aviso al simulador
         
+    def _notificar(self):
+        if self.al_cambiar is not None:
+            self.al_cambiar(self)
+    
     def agregar_emergencia(self, emergencia: Emergencia):
         heapq.heappush(self.emergencias_pendientes, emergencia)
+        self._notificar()
+    
+    def agregar_emergencias(self, emergencias: List[Emergencia]):
+        """Agregar un lote de emergencias a la cola con la estrategia más barata"""
+        n = len(self.emergencias_pendientes)
+        k = len(emergencias)
+        # k inserciones cuestan k·log(n+k); extender y reconstruir el heap cuesta n+k
+        if k * math.log2(n + k + 1) < n + k:
+            for emergencia in emergencias:
+                heapq.heappush(self.emergencias_pendientes, emergencia)
+        else:
+            self.emergencias_pendientes.extend(emergencias)
+            heapq.heapify(self.emergencias_pendientes)
+        self._notificar()
     
     def obtener_emergencia_prioritaria(self) -> Optional[Emergencia]:
         if self.emergencias_pendientes:
-            return heapq.heappop(self.emergencias_pendientes)
+            emergencia = heapq.heappop(self.emergencias_pendientes)
+            self._notificar()
+            return emergencia
         return None
     
     def agregar_recurso(self, recurso: Recurso):
         self.recursos.append(recurso)
+        if recurso.disponible:
+            self.recursos_libres[recurso.tipo][recurso.id] = recurso
+            self.num_recursos_disponibles += 1
+            self._notificar()
+    
+    def ocupar_recurso(self, recurso: Recurso):
+        if recurso.disponible:
+            recurso.disponible = False
+            del self.recursos_libres[recurso.tipo][recurso.id]
+            self.num_recursos_disponibles -= 1
+            self._notificar()
+    
+    def liberar_recurso(self, recurso: Recurso):
+        if not recurso.disponible:
+            recurso.disponible = True
+            self.recursos_libres[recurso.tipo][recurso.id] = recurso
+            self.num_recursos_disponibles += 1
+            self._notificar()
+    
+    def tomar_recurso(self, tipo_emergencia: Optional[TipoEmergencia] = None) -> Optional[Recurso]:
+        """Ocupar un recurso libre, preferentemente de un tipo adecuado a la emergencia (O(1))"""
+        if self.num_recursos_disponibles == 0:
+            return None
+        
+        for tipo in RECURSOS_PREFERIDOS.get(tipo_emergencia, ()):
+            libres = self.recursos_libres.get(tipo)
+            if libres:
+                _, recurso = libres.popitem()
+                break
+        else:
+            libres = next(lista for lista in self.recursos_libres.values() if lista)
+            _, recurso = libres.popitem()
+        
+        recurso.disponible = False
+        self.num_recursos_disponibles -= 1
+        self._notificar()
+        return recurso
     
     def recursos_disponibles(self) -> List[Recurso]:
-        return [r for r in self.recursos if r.disponible]
+        return [r for libres in self.recursos_libres.values() for r in libres.values()]
 
 class ArbolBusquedaGeografica:
-    """Árbol BST para búsqueda eficiente por coordenadas"""
+    """Árbol k-d (2-d) para búsqueda eficiente por coordenadas"""
+    
+    # Factor alfa del árbol chivo expiatorio: un subárbol se reconstruye cuando
+    # uno de sus hijos concentra más de esta fracción de sus nodos
+    ALFA = 0.7
     
     class NodoArbol:
         def __init__(self, nodo, es_latitud=True):
@@ -78,291 +205,2722 @@ class ArbolBusquedaGeografica:
             self.es_latitud = es_latitud
             self.izquierda = None
             self.derecha = None
+            self.tamaño = 1  # Nodos en el subárbol (incluido este)
     
     def __init__(self):
         self.raiz = None
+        self.tamaño = 0
+        self.reconstrucciones = 0
     
-    def insertar(self, nodo: Nodo):
-        self.raiz = self._insertar_recursivo(self.raiz, nodo, True)
+    def __len__(self):
+        return self.tamaño
+    
+    # A partir de este tamaño la forma del árbol se calcula con NumPy (ver _preorden_balanceado)
+    UMBRAL_NUMPY = 5000
+    
+    def construir(self, nodos: List[Nodo]):
+        """Construir el árbol balanceado por mediana a partir de todos los nodos"""
+        nodos = list(nodos)
+        if np is not None and len(nodos) >= self.UMBRAL_NUMPY:
+            ubicaciones = np.array([nodo.ubicacion for nodo in nodos], dtype=np.float64)
+            rangos = np.empty(len(nodos), dtype=np.int64)
+            rangos[sorted(range(len(nodos)), key=lambda i: nodos[i].id)] = np.arange(len(nodos))
+            forma = self._preorden_balanceado(ubicaciones[:, 0], ubicaciones[:, 1], rangos)
+            with gc_pausado():
+                self.desde_preorden(nodos, *(parte.tolist() for parte in forma))
+            return
+        self.raiz = self._construir_balanceado(nodos, True)
+        self.tamaño = len(nodos)
     
-    def _insertar_recursivo(self, raiz_actual, nodo, es_latitud):
-        if raiz_actual is None:
-            return self.NodoArbol(nodo, es_latitud)
+    @staticmethod
+    def _preorden_balanceado(lat, lon, rangos):
+        """Forma del árbol por mediana (la misma que _construir_balanceado) en formato a_preorden
         
-        coord_actual = nodo.ubicacion[0] if es_latitud else nodo.ubicacion[1]
-        coord_raiz = raiz_actual.nodo.ubicacion[0] if es_latitud else raiz_actual.nodo.ubicacion[1]
+        rangos es la posición de cada nodo en el orden por id, el último criterio de desempate.
+        Procesa todos los subárboles de un nivel a la vez: cada nivel es O(n) vectorizado,
+        particionando de forma estable los dos órdenes por eje sin volver a ordenar.
+        """
+        n = len(lat)
+        orden = np.empty(n, dtype=np.int64)
+        tamaños_izquierda = np.empty(n, dtype=np.int64)
+        ejes = np.empty(n, dtype=np.uint8)
+        # primario ordenado por el eje de corte del nivel, secundario por el otro (ambos por tramos)
+        primario, secundario = np.lexsort((rangos, lon, lat)), np.lexsort((rangos, lat, lon))
+        tamaños = np.array([n])
+        preorden = np.array([0])  # Posición en preorden de la raíz de cada tramo
+        lado = np.empty(n, dtype=np.int8)
+        eje_lat = True
         
-        if coord_actual < coord_raiz:
-            raiz_actual.izquierda = self._insertar_recursivo(
-                raiz_actual.izquierda, nodo, not es_latitud
-            )
-        else:
-            raiz_actual.derecha = self._insertar_recursivo(
-                raiz_actual.derecha, nodo, not es_latitud
-            )
+        while len(primario):
+            coords, otras = (lat, lon) if eje_lat else (lon, lat)
+            inicios = np.cumsum(tamaños) - tamaños
+            m = tamaños // 2
+            # Los iguales a la mediana van a la derecha, igual que en insertar()
+            while True:
+                posibles = np.flatnonzero(m > 0)
+                antes, medio = primario[inicios[posibles] + m[posibles] - 1], primario[inicios[posibles] + m[posibles]]
+                iguales = posibles[(coords[antes] == coords[medio]) & (otras[antes] == otras[medio]) &
+                                   (rangos[antes] == rangos[medio])]
+                if not len(iguales):
+                    break
+                m[iguales] -= 1
+            
+            orden[preorden] = primario[inicios + m]
+            tamaños_izquierda[preorden] = m
+            ejes[preorden] = eje_lat
+            
+            tramo = np.repeat(np.arange(len(tamaños)), tamaños)
+            posicion = np.arange(len(primario)) - inicios[tramo]
+            lado[primario] = np.sign(posicion - m[tramo])  # -1 izquierda, 0 mediana, 1 derecha
+            
+            # Hijos en orden (izquierdo, derecho) de cada tramo, incluidos los vacíos
+            tamaños_hijos = np.column_stack((m, tamaños - m - 1)).ravel()
+            preorden_hijos = np.column_stack((preorden + 1, preorden + 1 + m)).ravel()
+            inicios_hijos = np.cumsum(tamaños_hijos) - tamaños_hijos
+            
+            # El secundario pasa a ser el primario del siguiente nivel: partición estable por hijo
+            lado_secundario = lado[secundario]
+            izquierdos = lado_secundario == -1
+            derechos = lado_secundario == 1
+            rango_izquierdo = np.cumsum(izquierdos) - izquierdos
+            rango_derecho = np.cumsum(derechos) - derechos
+            rango = np.where(izquierdos, rango_izquierdo - rango_izquierdo[inicios][tramo],
+                             rango_derecho - rango_derecho[inicios][tramo])
+            hijo = 2 * tramo + derechos
+            quedan = lado_secundario != 0
+            nuevo_primario = np.empty(len(primario) - len(tamaños), dtype=np.int64)
+            nuevo_primario[inicios_hijos[hijo[quedan]] + rango[quedan]] = secundario[quedan]
+            # El primario sin medianas ya queda partido en (izquierdo, derecho) y ordenado por su eje
+            secundario = primario[lado[primario] != 0]
+            primario = nuevo_primario
+            
+            no_vacios = tamaños_hijos > 0
+            tamaños, preorden = tamaños_hijos[no_vacios], preorden_hijos[no_vacios]
+            eje_lat = not eje_lat
         
-        return raiz_actual
+        return orden, tamaños_izquierda, ejes
     
-    def buscar_nodos_cercanos(self, ubicacion: Tuple[float, float], radio: float) -> List[Nodo]:
-        resultado = []
-        self._buscar_recursivo(self.raiz, ubicacion, radio, resultado, True)
-        return resultado
+    def _construir_balanceado(self, nodos: List[Nodo], es_latitud: bool):
+        """Construcción iterativa por mediana en O(n log n) con listas preordenadas por eje"""
+        n = len(nodos)
+        if n == 0:
+            return None
+        
+        lat = [nodo.ubicacion[0] for nodo in nodos]
+        lon = [nodo.ubicacion[1] for nodo in nodos]
+        ids = [nodo.id for nodo in nodos]
+        por_lat = sorted(range(n), key=lambda i: (lat[i], lon[i], ids[i]))
+        por_lon = sorted(range(n), key=lambda i: (lon[i], lat[i], ids[i]))
+        lado = bytearray(n)  # 1 = izquierda, 2 = derecha (se reutiliza por nivel)
+        
+        raiz = None
+        # Pila de tareas: (padre, es_hijo_izquierdo, primario, secundario, es_latitud)
+        # "primario" está ordenado por el eje de corte del nivel
+        pila = [(None, False, por_lat, por_lon, es_latitud)] if es_latitud else \
+               [(None, False, por_lon, por_lat, es_latitud)]
+        
+        while pila:
+            padre, es_izquierdo, primario, secundario, eje_lat = pila.pop()
+            coords = lat if eje_lat else lon
+            
+            otras = lon if eje_lat else lat
+            m = len(primario) // 2
+            # Los iguales a la mediana van a la derecha, igual que en insertar()
+            while m > 0 and coords[primario[m - 1]] == coords[primario[m]] and \
+                    otras[primario[m - 1]] == otras[primario[m]] and ids[primario[m - 1]] == ids[primario[m]]:
+                m -= 1
+            
+            nodo_arbol = self.NodoArbol(nodos[primario[m]], eje_lat)
+            nodo_arbol.tamaño = len(primario)
+            if padre is None:
+                raiz = nodo_arbol
+            elif es_izquierdo:
+                padre.izquierda = nodo_arbol
+            else:
+                padre.derecha = nodo_arbol
+            
+            izq_primario = primario[:m]
+            der_primario = primario[m + 1:]
+            for i in izq_primario:
+                lado[i] = 1
+            for i in der_primario:
+                lado[i] = 2
+            lado[primario[m]] = 0
+            izq_secundario = [i for i in secundario if lado[i] == 1]
+            der_secundario = [i for i in secundario if lado[i] == 2]
+            
+            # En el siguiente nivel el eje se alterna: el secundario pasa a ser primario
+            if der_primario:
+                pila.append((nodo_arbol, False, der_secundario, der_primario, not eje_lat))
+            if izq_primario:
+                pila.append((nodo_arbol, True, izq_secundario, izq_primario, not eje_lat))
+        
+        return raiz
+    
+    def a_preorden(self, indices: Dict[str, int]) -> Tuple[array, array, bytearray]:
+        """Serializar la forma del árbol: índices en preorden, tamaño del subárbol izquierdo y eje"""
+        orden = array('i')
+        tamaños_izquierda = array('i')
+        ejes = bytearray()
+        pila = [self.raiz] if self.raiz else []
+        while pila:
+            actual = pila.pop()
+            orden.append(indices[actual.nodo.id])
+            tamaños_izquierda.append(actual.izquierda.tamaño if actual.izquierda else 0)
+            ejes.append(1 if actual.es_latitud else 0)
+            if actual.derecha:
+                pila.append(actual.derecha)
+            if actual.izquierda:
+                pila.append(actual.izquierda)
+        return orden, tamaños_izquierda, ejes
+    
+    def copiar(self) -> 'ArbolBusquedaGeografica':
+        """Copia con la misma forma que comparte los Nodo (instantánea de solo lectura)"""
+        nodos = self._recolectar(self.raiz)
+        copia = ArbolBusquedaGeografica()
+        copia.desde_preorden(nodos, *self.a_preorden({nodo.id: i for i, nodo in enumerate(nodos)}))
+        return copia
     
-    def _buscar_recursivo(self, nodo_actual, ubicacion, radio, resultado, es_latitud):
-        if nodo_actual is None:
+    def desde_preorden(self, nodos: List[Nodo], orden, tamaños_izquierda, ejes):
+        """Reconstruir en O(n), sin ordenar, un árbol serializado con a_preorden"""
+        self.tamaño = len(orden)
+        self.raiz = None
+        if not orden:
             return
         
-        # Calcular distancia euclidiana
-        distancia = math.sqrt(
-            (nodo_actual.nodo.ubicacion[0] - ubicacion[0]) ** 2 +
-            (nodo_actual.nodo.ubicacion[1] - ubicacion[1]) ** 2
-        )
+        # Pila de (posición en preorden, tamaño del subárbol, padre, es_hijo_izquierdo)
+        pila = [(0, len(orden), None, False)]
+        while pila:
+            posicion, tamaño, padre, es_izquierdo = pila.pop()
+            nodo_arbol = self.NodoArbol(nodos[orden[posicion]], bool(ejes[posicion]))
+            nodo_arbol.tamaño = tamaño
+            if padre is None:
+                self.raiz = nodo_arbol
+            elif es_izquierdo:
+                padre.izquierda = nodo_arbol
+            else:
+                padre.derecha = nodo_arbol
+            
+            tamaño_izquierda = tamaños_izquierda[posicion]
+            tamaño_derecha = tamaño - 1 - tamaño_izquierda
+            if tamaño_derecha:
+                pila.append((posicion + 1 + tamaño_izquierda, tamaño_derecha, nodo_arbol, False))
+            if tamaño_izquierda:
+                pila.append((posicion + 1, tamaño_izquierda, nodo_arbol, True))
+    
+    def _recolectar(self, subraiz) -> List[Nodo]:
+        """Recorrido iterativo que devuelve todos los nodos de un subárbol"""
+        nodos = []
+        pila = [subraiz] if subraiz else []
+        while pila:
+            actual = pila.pop()
+            nodos.append(actual.nodo)
+            if actual.derecha:
+                pila.append(actual.derecha)
+            if actual.izquierda:
+                pila.append(actual.izquierda)
+        return nodos
+    
+    def _altura_maxima(self) -> float:
+        """Altura permitida antes de buscar un chivo expiatorio: log_{1/alfa}(n)"""
+        return math.log(max(self.tamaño, 1)) / math.log(1 / self.ALFA)
+    
+    def insertar(self, nodo: Nodo):
+        nuevo_arbol = self.NodoArbol(nodo, True)
+        self.tamaño += 1
+        if self.raiz is None:
+            self.raiz = nuevo_arbol
+            return
+        
+        # Descenso iterativo guardando el camino
+        camino = []
+        actual = self.raiz
+        while actual is not None:
+            camino.append(actual)
+            actual.tamaño += 1
+            # Se compara (eje de corte, otro eje, id): con el id como último desempate ni
+            # siquiera las ubicaciones repetidas (p. ej. (0, 0) por defecto) quedan en un solo lado
+            if actual.es_latitud:
+                va_izquierda = (nodo.ubicacion[0], nodo.ubicacion[1], nodo.id) < \
+                    (actual.nodo.ubicacion[0], actual.nodo.ubicacion[1], actual.nodo.id)
+            else:
+                va_izquierda = (nodo.ubicacion[1], nodo.ubicacion[0], nodo.id) < \
+                    (actual.nodo.ubicacion[1], actual.nodo.ubicacion[0], actual.nodo.id)
+            
+            if va_izquierda:
+                if actual.izquierda is None:
+                    actual.izquierda = nuevo_arbol
+                    break
+                actual = actual.izquierda
+            else:
+                if actual.derecha is None:
+                    actual.derecha = nuevo_arbol
+                    break
+                actual = actual.derecha
+        
+        nuevo_arbol.es_latitud = not camino[-1].es_latitud
+        
+        if len(camino) > self._altura_maxima() + 1:
+            self._rebalancear(camino)
+    
+    def _rebalancear(self, camino):
+        """Reconstruir el subárbol del chivo expiatorio más profundo del camino"""
+        for i in range(len(camino) - 1, -1, -1):
+            candidato = camino[i]
+            tam_izq = candidato.izquierda.tamaño if candidato.izquierda else 0
+            tam_der = candidato.derecha.tamaño if candidato.derecha else 0
+            if max(tam_izq, tam_der) > self.ALFA * candidato.tamaño:
+                nuevo = self._construir_balanceado(
+                    self._recolectar(candidato), candidato.es_latitud
+                )
+                if i == 0:
+                    self.raiz = nuevo
+                elif camino[i - 1].izquierda is candidato:
+                    camino[i - 1].izquierda = nuevo
+                else:
+                    camino[i - 1].derecha = nuevo
+                self.reconstrucciones += 1
+                return
+    
+    def buscar_nodos_cercanos(self, ubicacion: Tuple[float, float], radio: float) -> List[Nodo]:
+        resultado = []
+        radio_cuadrado = radio * radio
+        pila = [self.raiz] if self.raiz else []
         
-        if distancia <= radio:
-            resultado.append(nodo_actual.nodo)
+        while pila:
+            nodo_actual = pila.pop()
+            
+            # Distancia euclidiana al cuadrado (evita la raíz)
+            distancia_cuadrada = (
+                (nodo_actual.nodo.ubicacion[0] - ubicacion[0]) ** 2 +
+                (nodo_actual.nodo.ubicacion[1] - ubicacion[1]) ** 2
+            )
+            
+            if distancia_cuadrada <= radio_cuadrado:
+                resultado.append(nodo_actual.nodo)
+            
+            es_latitud = nodo_actual.es_latitud
+            coord_actual = ubicacion[0] if es_latitud else ubicacion[1]
+            coord_nodo = nodo_actual.nodo.ubicacion[0] if es_latitud else nodo_actual.nodo.ubicacion[1]
+            
+            # Explorar subárboles relevantes (derecha primero para visitar la izquierda antes)
+            if nodo_actual.derecha and coord_actual + radio >= coord_nodo:
+                pila.append(nodo_actual.derecha)
+            if nodo_actual.izquierda and coord_actual - radio <= coord_nodo:
+                pila.append(nodo_actual.izquierda)
         
-        coord_actual = ubicacion[0] if es_latitud else ubicacion[1]
-        coord_nodo = nodo_actual.nodo.ubicacion[0] if es_latitud else nodo_actual.nodo.ubicacion[1]
+        return resultado
+
+    def k_mas_cercanos(self, ubicacion: Tuple[float, float], k: int = 1,
+                       filtro: Optional[Callable[[Nodo], bool]] = None) -> List[Nodo]:
+        """Los k nodos más cercanos que cumplen el filtro, ordenados por distancia (ramificación y poda)"""
+        if k <= 0 or self.raiz is None:
+            return []
         
-        # Explorar subárboles relevantes
-        if coord_actual - radio <= coord_nodo:
-            self._buscar_recursivo(nodo_actual.izquierda, ubicacion, radio, resultado, not es_latitud)
-        if coord_actual + radio >= coord_nodo:
-            self._buscar_recursivo(nodo_actual.derecha, ubicacion, radio, resultado, not es_latitud)
+        x, y = ubicacion
+        mejores = []  # Max-heap (-distancia², contador, nodo) con los k mejores hasta ahora
+        contador = 0
+        # Min-heap de subárboles pendientes por cota inferior de distancia²
+        pendientes = [(0.0, 0, self.raiz)]
+        
+        while pendientes:
+            cota, _, nodo_actual = heapq.heappop(pendientes)
+            # Poda: ningún subárbol restante puede mejorar el k-ésimo mejor
+            if len(mejores) == k and cota >= -mejores[0][0]:
+                break
+            
+            nodo = nodo_actual.nodo
+            distancia_cuadrada = (nodo.ubicacion[0] - x) ** 2 + (nodo.ubicacion[1] - y) ** 2
+            if filtro is None or filtro(nodo):
+                contador += 1
+                if len(mejores) < k:
+                    heapq.heappush(mejores, (-distancia_cuadrada, contador, nodo))
+                elif distancia_cuadrada < -mejores[0][0]:
+                    heapq.heapreplace(mejores, (-distancia_cuadrada, contador, nodo))
+            
+            diferencia = (x if nodo_actual.es_latitud else y) - \
+                (nodo.ubicacion[0] if nodo_actual.es_latitud else nodo.ubicacion[1])
+            cercano, lejano = (
+                (nodo_actual.izquierda, nodo_actual.derecha) if diferencia < 0
+                else (nodo_actual.derecha, nodo_actual.izquierda)
+            )
+            # El lado cercano hereda la cota; el lejano queda al menos a diferencia² del plano de corte
+            if cercano:
+                contador += 1
+                heapq.heappush(pendientes, (cota, contador, cercano))
+            if lejano:
+                cota_lejana = max(cota, diferencia * diferencia)
+                if len(mejores) < k or cota_lejana < -mejores[0][0]:
+                    contador += 1
+                    heapq.heappush(pendientes, (cota_lejana, contador, lejano))
+        
+        mejores.sort(key=lambda entrada: (-entrada[0], entrada[1]))
+        return [nodo for _, _, nodo in mejores]
 
 class TablaHashEmergencias:
-    """Tabla hash para acceso rápido a emergencias por ID"""
+    """Tabla hash para acceso rápido a emergencias por ID
+    
+    Crece y se reduce según el factor de carga con un rehash incremental: mientras dura,
+    cada operación migra unas pocas cubetas a la tabla nueva, así ninguna inserción paga
+    la copia completa. Mantiene índices secundarios por tipo, prioridad y estado de atención.
+    """
+    
+    FACTOR_CARGA_MAXIMO = 1.0
+    FACTOR_CARGA_MINIMO = 0.25
+    TAMAÑO_MINIMO = 8
+    CUBETAS_POR_PASO = 4  # Cubetas migradas por operación durante un rehash
     
     def __init__(self, tamaño=1000):
         self.tamaño = tamaño
-        self.tabla = [[] for _ in range(tamaño)]
+        self.tabla = [None] * tamaño  # Cubetas creadas al primer uso (None = vacía)
+        self.cantidad = 0
+        # Estado del rehash incremental (tabla_nueva es None si no hay uno en curso)
+        self.tabla_nueva = None
+        self.tamaño_nuevo = 0
+        self.cubeta_migracion = 0
+        # Índices secundarios: {valor: {id: emergencia}} (dicts usados como conjuntos ordenados)
+        self.por_tipo = defaultdict(dict)
+        self.por_prioridad = defaultdict(dict)
+        self.por_atendida = {False: {}, True: {}}
+        self.claves_indexadas = {}  # {id: (tipo, prioridad, atendida)} con que se indexó
+    
+    def __len__(self):
+        return self.cantidad
+    
+    def __iter__(self):
+        yield from self.por_atendida[False].values()
+        yield from self.por_atendida[True].values()
     
-    def _hash(self, clave: str) -> int:
-        return hash(clave) % self.tamaño
+    def _hash(self, clave: str, tamaño: Optional[int] = None) -> int:
+        return hash(clave) % (tamaño or self.tamaño)
+    
+    def _paso_rehash(self):
+        """Migrar unas pocas cubetas de la tabla vieja a la nueva"""
+        if self.tabla_nueva is None:
+            return
+        
+        fin = min(self.cubeta_migracion + self.CUBETAS_POR_PASO, self.tamaño)
+        tabla_nueva = self.tabla_nueva
+        for indice in range(self.cubeta_migracion, fin):
+            for entrada in self.tabla[indice] or ():
+                destino = self._hash(entrada[0], self.tamaño_nuevo)
+                if tabla_nueva[destino] is None:
+                    tabla_nueva[destino] = []
+                tabla_nueva[destino].append(entrada)
+            self.tabla[indice] = None
+        self.cubeta_migracion = fin
+        
+        if fin == self.tamaño:
+            self.tabla = self.tabla_nueva
+            self.tamaño = self.tamaño_nuevo
+            self.tabla_nueva = None
+            self.tamaño_nuevo = 0
+            self.cubeta_migracion = 0
+    
+    def _iniciar_rehash(self, tamaño_nuevo: int):
+        # Un solo bloque de None: sin crear tamaño_nuevo listas de golpe (ni despertar al GC)
+        self.tabla_nueva = [None] * tamaño_nuevo
+        self.tamaño_nuevo = tamaño_nuevo
+        self.cubeta_migracion = 0
+    
+    def _revisar_carga(self):
+        """Iniciar un rehash si el factor de carga salió de [MINIMO, MAXIMO] y no hay uno en curso"""
+        if self.tabla_nueva is not None:
+            return
+        if self.cantidad > self.tamaño * self.FACTOR_CARGA_MAXIMO:
+            self._iniciar_rehash(self.tamaño * 2)
+        elif self.tamaño > self.TAMAÑO_MINIMO and self.cantidad < self.tamaño * self.FACTOR_CARGA_MINIMO:
+            self._iniciar_rehash(max(self.TAMAÑO_MINIMO, self.tamaño // 2))
+    
+    def _mantener(self):
+        """Paso de mantenimiento de cada operación: la memoria se ajusta sea cual sea la siguiente"""
+        self._revisar_carga()
+        self._paso_rehash()
+    
+    def _cubeta(self, clave: str, crear: bool = False) -> List:
+        """Cubeta donde está (o debe estar) la clave, considerando un rehash en curso
+        
+        Una cubeta vacía que nunca se usó se devuelve como () salvo que se pida crearla.
+        """
+        tabla, indice = self.tabla, self._hash(clave)
+        if self.tabla_nueva is not None and indice < self.cubeta_migracion:
+            tabla, indice = self.tabla_nueva, self._hash(clave, self.tamaño_nuevo)
+        cubeta = tabla[indice]
+        if cubeta is None:
+            if not crear:
+                return ()
+            cubeta = tabla[indice] = []
+        return cubeta
+    
+    def _indexar(self, emergencia: Emergencia):
+        claves = (emergencia.tipo, emergencia.prioridad, emergencia.atendida)
+        self.claves_indexadas[emergencia.id] = claves
+        self.por_tipo[claves[0]][emergencia.id] = emergencia
+        self.por_prioridad[claves[1]][emergencia.id] = emergencia
+        self.por_atendida[claves[2]][emergencia.id] = emergencia
+    
+    def _desindexar(self, id_emergencia: str):
+        tipo, prioridad, atendida = self.claves_indexadas.pop(id_emergencia)
+        del self.por_tipo[tipo][id_emergencia]
+        del self.por_prioridad[prioridad][id_emergencia]
+        del self.por_atendida[atendida][id_emergencia]
     
     def insertar(self, emergencia: Emergencia):
-        indice = self._hash(emergencia.id)
+        self._mantener()
+        cubeta = self._cubeta(emergencia.id, crear=True)
         # Verificar si ya existe y actualizar
-        for i, (id_em, em) in enumerate(self.tabla[indice]):
+        for i, (id_em, em) in enumerate(cubeta):
             if id_em == emergencia.id:
-                self.tabla[indice][i] = (emergencia.id, emergencia)
+                cubeta[i] = (emergencia.id, emergencia)
+                self._desindexar(emergencia.id)
+                self._indexar(emergencia)
                 return
-        self.tabla[indice].append((emergencia.id, emergencia))
+        cubeta.append((emergencia.id, emergencia))
+        self._indexar(emergencia)
+        self.cantidad += 1
+        self._revisar_carga()
+    
+    def insertar_lote(self, emergencias: List[Emergencia]):
+        necesario = self.cantidad + len(emergencias)
+        if self.tabla_nueva is None and necesario > self.tamaño * self.FACTOR_CARGA_MAXIMO:
+            # Crecer una sola vez hasta el tamaño final en lugar de duplicar varias veces en el lote
+            tamaño = self.tamaño
+            while necesario > tamaño * self.FACTOR_CARGA_MAXIMO:
+                tamaño *= 2
+            self._iniciar_rehash(tamaño)
+            while self.tabla_nueva is not None:
+                self._paso_rehash()
+        for emergencia in emergencias:
+            self.insertar(emergencia)
     
     def buscar(self, id_emergencia: str) -> Optional[Emergencia]:
-        indice = self._hash(id_emergencia)
-        for id_em, emergencia in self.tabla[indice]:
+        self._mantener()
+        for id_em, emergencia in self._cubeta(id_emergencia):
+            if id_em == id_emergencia:
+                return emergencia
+        return None
+    
+    def eliminar(self, id_emergencia: str) -> Optional[Emergencia]:
+        self._mantener()
+        cubeta = self._cubeta(id_emergencia)
+        for i, (id_em, emergencia) in enumerate(cubeta):
             if id_em == id_emergencia:
+                cubeta[i] = cubeta[-1]
+                cubeta.pop()
+                self._desindexar(id_emergencia)
+                self.cantidad -= 1
+                self._revisar_carga()
                 return emergencia
         return None
     
+    def reindexar(self, emergencia: Emergencia):
+        """Actualizar los índices secundarios tras modificar tipo, prioridad o atendida"""
+        if emergencia.id in self.claves_indexadas:
+            self._desindexar(emergencia.id)
+            self._indexar(emergencia)
+    
+    def marcar_atendida(self, emergencia: Emergencia):
+        emergencia.atendida = True
+        self.reindexar(emergencia)
+    
+    def consultar(self, tipo: Optional[TipoEmergencia] = None,
+                  prioridad: Optional[PrioridadEmergencia] = None,
+                  atendida: Optional[bool] = None) -> List[Emergencia]:
+        """Emergencias que cumplen todos los filtros dados, sin recorrer la tabla completa"""
+        indices = []
+        if tipo is not None:
+            indices.append(self.por_tipo.get(tipo, {}))
+        if prioridad is not None:
+            indices.append(self.por_prioridad.get(prioridad, {}))
+        if atendida is not None:
+            indices.append(self.por_atendida[atendida])
+        
+        if not indices:
+            return self.obtener_todas()
+        
+        # Recorrer el índice más pequeño y comprobar pertenencia en los demás
+        indices.sort(key=len)
+        menor, resto = indices[0], indices[1:]
+        return [em for id_em, em in menor.items() if all(id_em in indice for indice in resto)]
+    
     def obtener_todas(self) -> List[Emergencia]:
-        todas = []
-        for bucket in self.tabla:
-            todas.extend([em for _, em in bucket])
-        return todas
+        return list(self)
 
-class SimuladorRedLAN:
+class TablaHashConcurrente:
+    """Tabla de emergencias segura entre hilos con un cerrojo por franja
+    
+    Cada clave cae por hash en una franja: una TablaHashEmergencias independiente con su
+    propio cerrojo, rehash incremental e índices secundarios. Los hilos que tocan franjas
+    distintas no se esperan entre sí. Ofrece la misma interfaz que TablaHashEmergencias.
+    """
+    
+    def __init__(self, franjas: int = 64, tamaño: int = 1000):
+        tamaño_franja = max(TablaHashEmergencias.TAMAÑO_MINIMO, tamaño // franjas)
+        self.franjas = [TablaHashEmergencias(tamaño_franja) for _ in range(franjas)]
+        self.cerrojos = [threading.Lock() for _ in range(franjas)]
+    
+    def __len__(self):
+        return sum(len(franja) for franja in self.franjas)
+    
+    def __iter__(self):
+        for franja, cerrojo in zip(self.franjas, self.cerrojos):
+            with cerrojo:
+                emergencias = list(franja)
+            yield from emergencias
+    
+    def _franja(self, clave: str) -> int:
+        # Bits altos del hash: las franjas usan los bajos para elegir cubeta
+        return (hash(clave) >> 32) % len(self.franjas)
+    
+    def insertar(self, emergencia: Emergencia):
+        i = self._franja(emergencia.id)
+        with self.cerrojos[i]:
+            self.franjas[i].insertar(emergencia)
+    
+    def insertar_lote(self, emergencias: List[Emergencia]):
+        por_franja = defaultdict(list)
+        for emergencia in emergencias:
+            por_franja[self._franja(emergencia.id)].append(emergencia)
+        for i, lote in por_franja.items():
+            with self.cerrojos[i]:
+                self.franjas[i].insertar_lote(lote)
+    
+    def buscar(self, id_emergencia: str) -> Optional[Emergencia]:
+        i = self._franja(id_emergencia)
+        with self.cerrojos[i]:
+            return self.franjas[i].buscar(id_emergencia)
+    
+    def eliminar(self, id_emergencia: str) -> Optional[Emergencia]:
+        i = self._franja(id_emergencia)
+        with self.cerrojos[i]:
+            return self.franjas[i].eliminar(id_emergencia)
+    
+    def reindexar(self, emergencia: Emergencia):
+        i = self._franja(emergencia.id)
+        with self.cerrojos[i]:
+            self.franjas[i].reindexar(emergencia)
+    
+    def marcar_atendida(self, emergencia: Emergencia):
+        i = self._franja(emergencia.id)
+        with self.cerrojos[i]:
+            self.franjas[i].marcar_atendida(emergencia)
+    
+    def consultar(self, tipo: Optional[TipoEmergencia] = None,
+                  prioridad: Optional[PrioridadEmergencia] = None,
+                  atendida: Optional[bool] = None) -> List[Emergencia]:
+        resultado = []
+        for franja, cerrojo in zip(self.franjas, self.cerrojos):
+            with cerrojo:
+                resultado.extend(franja.consultar(tipo, prioridad, atendida))
+        return resultado
+    
+    def obtener_todas(self) -> List[Emergencia]:
+        return list(self)
+
+class ContadorAtomico:
+    """Entrada entera de un dict de estadísticas incrementada de forma atómica entre hilos"""
+    
+    def __init__(self, destino: Dict, clave: str):
+        self.destino = destino
+        self.clave = clave
+        self._cerrojo = threading.Lock()
+    
+    def sumar(self, cantidad: int = 1) -> int:
+        with self._cerrojo:
+            self.destino[self.clave] += cantidad
+            return self.destino[self.clave]
+
+class SketchPercentiles:
+    """Histograma logarítmico mergeable (estilo DDSketch) para percentiles en streaming
+    
+    Cada valor positivo cae en la cubeta ceil(log_gamma(x)); el percentil devuelto tiene
+    error relativo menor que precision. Dos sketches con la misma precisión se combinan
+    sumando cubetas, lo que permite agregar por tipo, por nodo o entre réplicas.
+    """
+    
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self.gamma)
+        self.cubetas = defaultdict(int)  # {índice: cuenta}
+        self.ceros = 0  # Valores <= 0 (p. ej. respuesta inmediata)
+        self.cuenta = 0
+        self.suma = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+    
+    def agregar(self, valor: float):
+        self.cuenta += 1
+        self.suma += valor
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+        if valor <= 0:
+            self.ceros += 1
+        else:
+            self.cubetas[math.ceil(math.log(valor) / self._log_gamma)] += 1
+    
+    def combinar(self, otro: 'SketchPercentiles'):
+        """Sumar otro sketch de la misma precisión a este"""
+        for indice, cuenta in otro.cubetas.items():
+            self.cubetas[indice] += cuenta
+        self.ceros += otro.ceros
+        self.cuenta += otro.cuenta
+        self.suma += otro.suma
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+    
+    def percentil(self, q: float) -> Optional[float]:
+        """Valor aproximado del cuantil q (0..1)"""
+        if self.cuenta == 0:
+            return None
+        rango = q * (self.cuenta - 1)
+        acumulado = self.ceros
+        if rango < acumulado:
+            return 0.0
+        for indice in sorted(self.cubetas):
+            acumulado += self.cubetas[indice]
+            if rango < acumulado:
+                valor = 2 * self.gamma ** indice / (self.gamma + 1)
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+    
+    def promedio(self) -> float:
+        return self.suma / self.cuenta if self.cuenta else 0.0
+    
+    def exportar(self) -> Dict:
+        """Representación compacta y serializable (para enviar entre procesos o guardar)"""
+        return {
+            'precision': self.precision,
+            'cubetas': dict(self.cubetas),
+            'ceros': self.ceros,
+            'cuenta': self.cuenta,
+            'suma': self.suma,
+            'minimo': self.minimo,
+            'maximo': self.maximo
+        }
+    
+    @classmethod
+    def importar(cls, datos: Dict) -> 'SketchPercentiles':
+        sketch = cls(datos['precision'])
+        sketch.cubetas.update({int(indice): cuenta for indice, cuenta in datos['cubetas'].items()})
+        sketch.ceros = datos['ceros']
+        sketch.cuenta = datos['cuenta']
+        sketch.suma = datos['suma']
+        sketch.minimo = datos['minimo']
+        sketch.maximo = datos['maximo']
+        return sketch
+    
+    def resumen(self) -> Dict:
+        return {
+            'cuenta': self.cuenta,
+            'promedio': self.promedio(),
+            'p50': self.percentil(0.50),
+            'p95': self.percentil(0.95),
+            'p99': self.percentil(0.99)
+        }
+
+class ArbolTorneo:
+    """Árbol de torneo (mínimo) sobre claves indexadas por hoja, almacenado en un arreglo
+    
+    Cada nodo interno guarda la hoja ganadora de sus dos hijos; actualizar una hoja
+    rejuega solo su camino a la raíz (O(log n)) y el mínimo global se lee en O(1).
+    """
+    
+    VACIO = (float('inf'),)  # Clave de una hoja sin candidato
+    
+    def __init__(self, capacidad: int = 16):
+        self.capacidad = 1
+        while self.capacidad < capacidad:
+            self.capacidad *= 2
+        self.claves = [self.VACIO] * self.capacidad
+        self.ganadores = [0] * (2 * self.capacidad)
+        self._reconstruir()
+    
+    def _reconstruir(self):
+        cap = self.capacidad
+        for i in range(cap):
+            self.ganadores[cap + i] = i
+        for pos in range(cap - 1, 0, -1):
+            a, b = self.ganadores[2 * pos], self.ganadores[2 * pos + 1]
+            self.ganadores[pos] = a if self.claves[a] <= self.claves[b] else b
+    
+    def actualizar(self, hoja: int, clave):
+        if hoja >= self.capacidad:
+            while self.capacidad <= hoja:
+                self.capacidad *= 2
+            self.claves.extend([self.VACIO] * (self.capacidad - len(self.claves)))
+            self.ganadores = [0] * (2 * self.capacidad)
+            self._reconstruir()
+        
+        if self.claves[hoja] == clave:
+            return
+        self.claves[hoja] = clave
+        claves, ganadores = self.claves, self.ganadores
+        pos = (self.capacidad + hoja) // 2
+        while pos >= 1:
+            a, b = ganadores[2 * pos], ganadores[2 * pos + 1]
+            ganadores[pos] = a if claves[a] <= claves[b] else b
+            pos //= 2
+    
+    def cargar(self, claves: List):
+        """Fijar todas las hojas a la vez (O(n)) en lugar de actualizarlas una a una"""
+        while self.capacidad < len(claves):
+            self.capacidad *= 2
+        self.claves = list(claves) + [self.VACIO] * (self.capacidad - len(claves))
+        self.ganadores = [0] * (2 * self.capacidad)
+        self._reconstruir()
+    
+    def minimo(self) -> Tuple[Tuple, int]:
+        """(clave, hoja) ganadora; la clave es VACIO si no hay candidatos"""
+        hoja = self.ganadores[1]
+        return self.claves[hoja], hoja
+
+class GrafoCompacto:
+    """Grafo en formato CSR: índices enteros, arreglos offsets/destinos/pesos y máscara de activos
+    
+    Los vecinos del nodo i son destinos[offsets[i]:offsets[i + 1]] con los pesos en las
+    mismas posiciones de pesos. Cada arista cuesta 12 bytes en lugar de cuatro entradas de dict.
+    """
+    
+    def __init__(self, ids: List[str], offsets, destinos, pesos, activos):
+        self.ids = ids
+        self.indices = {id_nodo: i for i, id_nodo in enumerate(ids)}
+        self.offsets = offsets    # int64, len(ids) + 1 posiciones
+        self.destinos = destinos  # int32
+        self.pesos = pesos        # float64
+        self.activos = activos    # bytearray: 1 = nodo activo
+    
+    @classmethod
+    def desde_grafo(cls, nodos: Dict[str, Nodo], grafo: Dict[str, Dict[str, float]]) -> 'GrafoCompacto':
+        ids = list(nodos)
+        indices = {id_nodo: i for i, id_nodo in enumerate(ids)}
+        offsets = array('q', [0])
+        destinos = array('i')
+        pesos = array('d')
+        for id_nodo in ids:
+            vecinos = grafo.get(id_nodo, {})
+            destinos.extend(indices[vecino] for vecino in vecinos)
+            pesos.extend(vecinos.values())
+            offsets.append(len(destinos))
+        activos = bytearray(1 if nodo.activo else 0 for nodo in nodos.values())
+        return cls(ids, offsets, destinos, pesos, activos)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def vecinos(self, i: int) -> array:
+        return self.destinos[self.offsets[i]:self.offsets[i + 1]]
+    
+    def vecinos_activos(self, i: int) -> List[int]:
+        activos = self.activos
+        return [j for j in self.destinos[self.offsets[i]:self.offsets[i + 1]] if activos[j]]
+    
+    def dijkstra(self, origen: int) -> Tuple[List[float], array, int]:
+        """Dijkstra completo desde origen sobre nodos activos: (distancias, padres, expandidos)"""
+        infinito = float('inf')
+        distancias = [infinito] * len(self.ids)
+        padres = array('i', [-1]) * len(self.ids)
+        offsets, destinos, pesos, activos = self.offsets, self.destinos, self.pesos, self.activos
+        distancias[origen] = 0
+        cola = [(0, origen)]
+        expandidos = 0
+        
+        while cola:
+            dist_actual, u = heapq.heappop(cola)
+            if dist_actual > distancias[u]:
+                continue
+            expandidos += 1
+            
+            for k in range(offsets[u], offsets[u + 1]):
+                v = destinos[k]
+                if activos[v]:
+                    nueva_distancia = dist_actual + pesos[k]
+                    if nueva_distancia < distancias[v]:
+                        distancias[v] = nueva_distancia
+                        padres[v] = u
+                        heapq.heappush(cola, (nueva_distancia, v))
+        
+        return distancias, padres, expandidos
+
+class ArbolRutas:
+    """Árbol de caminos mínimos desde un origen (resultado completo de Dijkstra)"""
+    
+    def __init__(self, origen: str):
+        self.origen = origen
+        self.distancias = {origen: 0}
+        self.padres: Dict[str, Optional[str]] = {origen: None}
+        self.hijos = defaultdict(int)  # {nodo: número de hijos en el árbol}
+    
+    def fijar_padre(self, nodo: str, padre: str, distancia: float):
+        anterior = self.padres.get(nodo)
+        if anterior is not None:
+            self.hijos[anterior] -= 1
+        self.padres[nodo] = padre
+        self.hijos[padre] += 1
+        self.distancias[nodo] = distancia
+    
+    def quitar_hoja(self, nodo: str):
+        padre = self.padres.pop(nodo, None)
+        if padre is not None:
+            self.hijos[padre] -= 1
+        self.distancias.pop(nodo, None)
+        self.hijos.pop(nodo, None)
+    
+    def ruta_hasta(self, destino: str) -> List[str]:
+        """Reconstruir la ruta origen -> destino en O(longitud de la ruta)"""
+        if destino not in self.distancias:
+            return []
+        ruta = []
+        nodo_actual = destino
+        while nodo_actual is not None:
+            ruta.append(nodo_actual)
+            nodo_actual = self.padres[nodo_actual]
+        ruta.reverse()
+        return ruta
+
+class TablaRutasCompleta:
+    """Distancias y siguiente salto entre todos los pares de estaciones, precalculados
+    
+    Se guarda por destino: hacia[t][s] es el siguiente salto de s hacia t (-1 si no hay
+    ruta) y distancias[t][s] su costo. Con NumPy son matrices int32/float32 de n × n; sin
+    él, listas de array('i')/array('f'). Como el grafo es no dirigido, la fila t es el árbol
+    de caminos mínimos con raíz t, así una falla solo obliga a recalcular las filas en las
+    que el nodo caído es un nodo interno y una restauración se incorpora con un paso min-plus.
+    """
+    
+    # Costos aproximados por operación elemental, usados para elegir el algoritmo
+    COSTO_FLOYD = 3.5e-9     # Por celda y pivote en Floyd-Warshall vectorizado
+    COSTO_DIJKSTRA = 5e-8    # Por arista relajada × log n en Dijkstra en Python
+    # Con menos destinos que esto no compensa arrancar procesos
+    UMBRAL_PARALELO = 256
+    
+    def __init__(self, compacto: GrafoCompacto):
+        self.compacto = compacto
+        self.ids = compacto.ids
+        self.indices = compacto.indices
+        self.metodo = None
+        self.hacia = None
+        self.distancias = None
+    
+    @classmethod
+    def construir(cls, compacto: GrafoCompacto, metodo: str = 'auto',
+                  procesos: Optional[int] = None) -> 'TablaRutasCompleta':
+        """Calcular la tabla con 'floyd' (NumPy), 'dijkstra' (repetido, en paralelo) o 'auto'"""
+        tabla = cls(compacto)
+        if metodo == 'auto':
+            metodo = tabla.elegir_metodo(procesos)
+        if metodo == 'floyd':
+            if np is None:
+                raise RuntimeError("Floyd-Warshall vectorizado requiere NumPy")
+            tabla._floyd_warshall()
+        elif metodo == 'dijkstra':
+            tabla._dijkstra_repetido(procesos)
+        else:
+            raise ValueError(f"Método desconocido: {metodo}")
+        tabla.metodo = metodo
+        return tabla
+    
+    def elegir_metodo(self, procesos: Optional[int] = None) -> str:
+        """Floyd-Warshall si NumPy lo hace más barato que n Dijkstra (grafos chicos y densos)"""
+        n = len(self.compacto)
+        if np is None or n == 0:
+            return 'dijkstra'
+        aristas = len(self.compacto.destinos)
+        procesos = procesos or os.cpu_count() or 1
+        costo_floyd = n ** 3 * self.COSTO_FLOYD
+        costo_dijkstra = n * (n + aristas) * math.log2(n + 1) * self.COSTO_DIJKSTRA / procesos
+        return 'floyd' if costo_floyd <= costo_dijkstra else 'dijkstra'
+    
+    def _floyd_warshall(self):
+        compacto = self.compacto
+        n = len(compacto)
+        activos = np.frombuffer(bytes(compacto.activos), dtype=np.uint8).astype(bool)
+        offsets = np.asarray(compacto.offsets, dtype=np.int64)
+        origenes = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        destinos = np.asarray(compacto.destinos, dtype=np.int64)
+        pesos = np.asarray(compacto.pesos, dtype=np.float32)
+        validas = activos[origenes] & activos[destinos]
+        origenes, destinos, pesos = origenes[validas], destinos[validas], pesos[validas]
+        
+        # Filas por destino: distancias[t, s] = d(s, t); el grafo es simétrico
+        distancias = np.full((n, n), np.inf, dtype=np.float32)
+        np.minimum.at(distancias, (destinos, origenes), pesos)
+        hacia = np.full((n, n), -1, dtype=np.int32)
+        hacia[destinos, origenes] = destinos
+        diagonal = np.nonzero(activos)[0]
+        distancias[diagonal, diagonal] = 0
+        hacia[diagonal, diagonal] = diagonal
+        
+        via = np.empty_like(distancias)
+        mejora = np.empty((n, n), dtype=bool)
+        for k in diagonal.tolist():
+            # s -> k -> t: hacia t desde s se sale hacia k
+            np.add(distancias[:, k, None], distancias[k, None, :], out=via)
+            np.less(via, distancias, out=mejora)
+            np.copyto(distancias, via, where=mejora)
+            np.copyto(hacia, hacia[k, None, :], where=mejora)
+        
+        self.distancias = distancias
+        self.hacia = hacia
+    
+    def _dijkstra_repetido(self, procesos: Optional[int] = None, destinos: Optional[List[int]] = None):
+        """Una corrida de Dijkstra por destino (todas o las dadas), repartidas entre procesos"""
+        compacto = self.compacto
+        n = len(compacto)
+        if destinos is None:
+            destinos = [t for t in range(n) if compacto.activos[t]]
+            if np is not None:
+                self.distancias = np.full((n, n), np.inf, dtype=np.float32)
+                self.hacia = np.full((n, n), -1, dtype=np.int32)
+            else:
+                self.distancias = [array('f', [math.inf]) * n for _ in range(n)]
+                self.hacia = [array('i', [-1]) * n for _ in range(n)]
+        
+        procesos = procesos or os.cpu_count() or 1
+        if procesos == 1 or len(destinos) < self.UMBRAL_PARALELO:
+            filas = _filas_rutas(destinos, compacto)
+            for t, distancias, padres in filas:
+                self._guardar_fila(t, distancias, padres)
+            return
+        
+        grafo = (array('q', compacto.offsets), array('i', compacto.destinos),
+                 array('d', compacto.pesos), bytes(compacto.activos))
+        bloque = max(1, len(destinos) // (procesos * 4))
+        bloques = [destinos[i:i + bloque] for i in range(0, len(destinos), bloque)]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador_rutas,
+                                 initargs=grafo) as ejecutor:
+            for filas in ejecutor.map(_filas_rutas, bloques):
+                for t, distancias, padres in filas:
+                    self._guardar_fila(t, distancias, padres)
+    
+    def _guardar_fila(self, t: int, distancias: array, padres: array):
+        """La fila t es el árbol de Dijkstra con raíz t: el padre de s es su salto hacia t"""
+        if np is not None:
+            self.distancias[t] = np.frombuffer(distancias, dtype=np.float32)
+            self.hacia[t] = np.frombuffer(padres, dtype=np.int32)
+        else:
+            self.distancias[t] = distancias
+            self.hacia[t] = padres
+        self.hacia[t][t] = t
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def siguiente_salto(self, origen: str, destino: str) -> Optional[str]:
+        salto = int(self.hacia[self.indices[destino]][self.indices[origen]])
+        return self.ids[salto] if salto >= 0 else None
+    
+    def distancia(self, origen: str, destino: str) -> float:
+        return float(self.distancias[self.indices[destino]][self.indices[origen]])
+    
+    def ruta(self, origen: str, destino: str) -> Tuple[List[str], float]:
+        """Ruta reconstruida salto a salto en O(longitud de la ruta)"""
+        s, t = self.indices[origen], self.indices[destino]
+        fila = self.hacia[t]
+        if fila[s] < 0:
+            return [], float('inf')
+        ruta = [s]
+        while s != t:
+            s = int(fila[s])
+            ruta.append(s)
+        return [self.ids[i] for i in ruta], float(self.distancias[t][ruta[0]])
+    
+    def aplicar_falla(self, indice: int, procesos: Optional[int] = None) -> int:
+        """Quitar un nodo caído; devuelve cuántas filas (destinos) hubo que reparar
+        
+        Solo cambian las filas donde el caído es nodo interno, y en ellas solo su subárbol.
+        Con NumPy el subárbol de todas las filas sale a la vez por saltos de puntero sobre la
+        matriz y cada fila se repara con un Dijkstra acotado a él; sin NumPy se recalculan
+        las filas afectadas completas.
+        """
+        self.compacto.activos[indice] = 0
+        n = len(self.compacto)
+        if np is None:
+            afectadas = [t for t in range(n) if t != indice and indice in self.hacia[t]]
+            self.distancias[indice] = array('f', [math.inf]) * n
+            self.hacia[indice] = array('i', [-1]) * n
+            for t in range(n):
+                self.distancias[t][indice] = math.inf
+                self.hacia[t][indice] = -1
+            self._dijkstra_repetido(procesos, afectadas)
+            return len(afectadas)
+        
+        filas = np.nonzero((self.hacia == indice).any(axis=1))[0]
+        filas = filas[filas != indice]
+        self.distancias[indice] = np.inf
+        self.distancias[:, indice] = np.inf
+        self.hacia[indice] = -1
+        
+        # en_subarbol[i, s]: la ruta de s hacia filas[i] pasaba por el caído
+        punteros = self.hacia[filas]
+        en_subarbol = punteros == indice
+        punteros = np.where(punteros < 0, filas[:, None], punteros)
+        punteros[:, indice] = filas  # El caído ya no lleva a ningún lado
+        while True:
+            en_subarbol |= np.take_along_axis(en_subarbol, punteros, axis=1)
+            saltos = np.take_along_axis(punteros, punteros, axis=1)
+            if np.array_equal(saltos, punteros):
+                break
+            punteros = saltos
+        self.hacia[:, indice] = -1
+        
+        for t, subarbol in zip(filas.tolist(), en_subarbol):
+            self._reparar_fila(t, np.nonzero(subarbol)[0].tolist())
+        return len(filas)
+    
+    def _reparar_fila(self, t: int, invalidos: List[int]):
+        """Dijkstra acotado a los nodos que perdieron su ruta hacia t, sembrado desde el resto"""
+        compacto = self.compacto
+        offsets, destinos, pesos, activos = compacto.offsets, compacto.destinos, compacto.pesos, compacto.activos
+        fila_d, fila_h = self.distancias[t], self.hacia[t]
+        fila_d[invalidos] = np.inf
+        fila_h[invalidos] = -1
+        conjunto = set(invalidos)
+        
+        cola = []
+        for s in invalidos:
+            for k in range(offsets[s], offsets[s + 1]):
+                v = destinos[k]
+                if activos[v] and v not in conjunto and fila_h[v] >= 0:
+                    cola.append((float(fila_d[v]) + pesos[k], s, v))
+        heapq.heapify(cola)
+        
+        mejores = {}
+        while cola:
+            distancia, s, salto = heapq.heappop(cola)
+            if s in mejores:
+                continue
+            mejores[s] = (distancia, salto)
+            for k in range(offsets[s], offsets[s + 1]):
+                v = destinos[k]
+                if v in conjunto and v not in mejores and activos[v]:
+                    heapq.heappush(cola, (distancia + pesos[k], v, s))
+        
+        if mejores:
+            nodos = list(mejores)
+            fila_d[nodos] = [mejores[s][0] for s in nodos]
+            fila_h[nodos] = [mejores[s][1] for s in nodos]
+    
+    def aplicar_restauracion(self, indice: int):
+        """Reincorporar un nodo: toda ruta nueva pasa por él, d'(s, t) = min(d(s, t), d(s, r) + d(r, t))"""
+        self.compacto.activos[indice] = 1
+        _, distancias_r, padres_r = _filas_rutas([indice], self.compacto)[0]
+        n = len(self.compacto)
+        # Primer salto desde r hacia cada nodo: el hijo de r en la rama que lo contiene
+        primero = array('i', [-1]) * n
+        primero[indice] = indice
+        for v in sorted((v for v in range(n) if padres_r[v] >= 0), key=distancias_r.__getitem__):
+            padre = padres_r[v]
+            primero[v] = v if padre == indice else primero[padre]
+        
+        if np is not None:
+            d_r = np.frombuffer(distancias_r, dtype=np.float32)
+            via = d_r[:, None] + d_r[None, :]
+            mejora = via < self.distancias
+            np.copyto(self.distancias, via, where=mejora)
+            # Si la ruta nueva s -> t pasa por r, desde s se sale hacia r
+            np.copyto(self.hacia, np.frombuffer(padres_r, dtype=np.int32)[None, :], where=mejora)
+            self.distancias[indice] = d_r
+            self.distancias[:, indice] = d_r
+            self.hacia[indice] = np.frombuffer(padres_r, dtype=np.int32)
+            self.hacia[:, indice] = np.frombuffer(primero, dtype=np.int32)
+        else:
+            alcanzables = [v for v in range(n) if distancias_r[v] < math.inf]
+            for t in alcanzables:
+                fila_d, fila_h, d_t = self.distancias[t], self.hacia[t], distancias_r[t]
+                for s in alcanzables:
+                    if d_t + distancias_r[s] < fila_d[s]:
+                        fila_d[s] = d_t + distancias_r[s]
+                        fila_h[s] = padres_r[s]
+                fila_d[indice] = d_t
+                fila_h[indice] = primero[t]
+            self.distancias[indice] = array('f', distancias_r)
+            self.hacia[indice] = array('i', padres_r)
+        self.hacia[indice][indice] = indice
+
+# Grafo CSR de cada proceso trabajador de TablaRutasCompleta (lo fija el inicializador del pool)
+_GRAFO_TRABAJADOR: Optional[GrafoCompacto] = None
+
+def _iniciar_trabajador_rutas(offsets, destinos, pesos, activos):
+    global _GRAFO_TRABAJADOR
+    _GRAFO_TRABAJADOR = GrafoCompacto(list(range(len(offsets) - 1)), offsets, destinos, pesos, bytearray(activos))
+
+def _filas_rutas(destinos: List[int], compacto: Optional[GrafoCompacto] = None) -> List[Tuple[int, array, array]]:
+    """Dijkstra desde cada destino dado: (destino, distancias float32, padres int32)"""
+    compacto = compacto or _GRAFO_TRABAJADOR
+    filas = []
+    for t in destinos:
+        distancias, padres, _ = compacto.dijkstra(t)
+        filas.append((t, array('f', distancias), padres))
+    return filas
+
+class ConectividadIncremental:
+    """Union-find (unión por tamaño y compresión por mitades) sobre los ids de las estaciones
+    
+    Solo admite uniones: al fallar un nodo que no es punto de articulación las demás
+    componentes no cambian y basta con ignorarlo; si lo es, el simulador la reconstruye.
+    """
+    
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+        self.padre: List[int] = []
+        self.tamaño: List[int] = []
+    
+    @classmethod
+    def desde_etiquetas(cls, ids: List[str], etiquetas: List[int]) -> 'ConectividadIncremental':
+        """Cargar de una vez componentes ya calculadas (etiqueta = índice de un representante)"""
+        conectividad = cls()
+        conectividad.indices = {id_nodo: i for i, id_nodo in enumerate(ids)}
+        conectividad.padre = list(etiquetas)
+        conectividad.tamaño = [0] * len(ids)
+        for etiqueta in etiquetas:
+            conectividad.tamaño[etiqueta] += 1
+        return conectividad
+    
+    def agregar(self, id_nodo: str) -> int:
+        if id_nodo not in self.indices:
+            self.indices[id_nodo] = len(self.padre)
+            self.padre.append(len(self.padre))
+            self.tamaño.append(1)
+        return self.indices[id_nodo]
+    
+    def encontrar(self, i: int) -> int:
+        padre = self.padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+    
+    def unir(self, a: str, b: str) -> bool:
+        """Unir las componentes de a y b; False si ya estaban juntas"""
+        raiz_a, raiz_b = self.encontrar(self.agregar(a)), self.encontrar(self.agregar(b))
+        if raiz_a == raiz_b:
+            return False
+        if self.tamaño[raiz_a] < self.tamaño[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.padre[raiz_b] = raiz_a
+        self.tamaño[raiz_a] += self.tamaño[raiz_b]
+        return True
+    
+    def conectados(self, a: str, b: str) -> bool:
+        if a not in self.indices or b not in self.indices:
+            return False
+        return self.encontrar(self.indices[a]) == self.encontrar(self.indices[b])
+
+class PropagacionDatos:
+    """Propagación de los datos de cada emergencia hasta destinos fijos por tablas de siguiente salto
+    
+    Los mensajes se acumulan y salen por lotes: hacia cada destino, los que comparten un
+    enlace viajan en una sola transmisión (una cabecera y la suma de las cargas). El
+    siguiente salto de u hacia d es el padre de u en el árbol de caminos mínimos con raíz d
+    (el grafo es no dirigido), tomado de la caché de rutas del simulador, que ya se repara
+    ante fallas: cada salto es una consulta O(1) y no hay un Dijkstra por mensaje. La
+    latencia de un enlace es su peso más los bytes del lote / ancho_banda.
+    """
+    
+    CABECERA = 40  # Bytes por transmisión en un enlace, sin importar cuántos mensajes lleve
+    
+    def __init__(self, simulador: 'SimuladorRedLAN', destinos=None,
+                 ancho_banda: Optional[float] = None, tamaño_lote: int = 1024):
+        self.sim = simulador
+        # Lista de ids, predicado sobre Nodo o None para todos los nodos con recurso 'servidor'
+        self.destinos = destinos if destinos is not None else self.es_servidor
+        self.ancho_banda = ancho_banda  # Bytes por unidad de peso; None = sin límite
+        self.tamaño_lote = tamaño_lote
+        self.pendientes: Dict[str, List[int]] = {}  # {origen: [bytes, mensajes]} aún sin enviar
+        self._mensajes_pendientes = 0
+        self.enlaces: Dict[Tuple[str, str], List] = {}  # {(u, v): [bytes, transmisiones, mensajes, latencia]}
+        self.por_nodo: Dict[str, Dict] = defaultdict(
+            lambda: {'enviados': 0, 'recibidos': 0, 'mensajes': 0, 'entregados': 0, 'latencia': 0.0}
+        )
+        self.sketch_latencia = SketchPercentiles()
+        self.estadisticas = {
+            'mensajes': 0,
+            'entregas': 0,
+            'sin_ruta': 0,
+            'lotes': 0,
+            'transmisiones': 0,
+            'bytes_enlaces': 0
+        }
+    
+    @staticmethod
+    def es_servidor(nodo: Nodo) -> bool:
+        return any(recurso.tipo == 'servidor' for recurso in nodo.recursos)
+    
+    def ids_destino(self) -> List[str]:
+        if callable(self.destinos):
+            return [id_nodo for id_nodo, nodo in self.sim.nodos.items() if self.destinos(nodo)]
+        return [id_nodo for id_nodo in self.destinos if id_nodo in self.sim.nodos]
+    
+    def encolar(self, origen: str, cantidad_bytes: int):
+        """Acumular un mensaje; el lote sale al llegar a tamaño_lote o al llamar a vaciar"""
+        acumulado = self.pendientes.get(origen)
+        if acumulado is None:
+            self.pendientes[origen] = [cantidad_bytes, 1]
+        else:
+            acumulado[0] += cantidad_bytes
+            acumulado[1] += 1
+        self._mensajes_pendientes += 1
+        if self._mensajes_pendientes >= self.tamaño_lote:
+            self.vaciar()
+    
+    def vaciar(self) -> int:
+        """Enviar todos los mensajes acumulados a cada destino; devuelve las transmisiones hechas"""
+        if not self.pendientes:
+            return 0
+        pendientes, self.pendientes = self.pendientes, {}
+        mensajes_lote, self._mensajes_pendientes = self._mensajes_pendientes, 0
+        self.estadisticas['lotes'] += 1
+        transmisiones = 0
+        
+        for destino in self.ids_destino():
+            self.estadisticas['mensajes'] += mensajes_lote
+            if not self.sim.nodos[destino].activo:
+                self.estadisticas['sin_ruta'] += mensajes_lote
+                self.sim._emitir(NivelEvento.ADVERTENCIA, 'mensajes_sin_ruta',
+                                 cantidad=mensajes_lote, destino=destino)
+                continue
+            transmisiones += self._enviar_a(destino, pendientes)
+        return transmisiones
+    
+    def _enviar_a(self, destino: str, pendientes: Dict[str, List[int]]) -> int:
+        """Subir las cargas por el árbol de rutas del destino, de la hoja más lejana hacia él
+        
+        Al procesar en orden de distancia decreciente, cuando un nodo transmite ya recibió
+        todo lo que pasa por él, así cada enlace se usa una vez por lote y destino.
+        """
+        arbol = self.sim._obtener_arbol_rutas(destino)
+        padres, distancias = arbol.padres, arbol.distancias
+        grafo = self.sim.grafo
+        carga: Dict[str, List[int]] = {}
+        frente = []  # Max-heap por distancia al destino
+        sin_ruta = 0
+        
+        for origen, (cantidad_bytes, mensajes) in pendientes.items():
+            if origen not in distancias:
+                sin_ruta += mensajes
+            elif origen in carga:
+                carga[origen][0] += cantidad_bytes
+                carga[origen][1] += mensajes
+            else:
+                carga[origen] = [cantidad_bytes, mensajes]
+                heapq.heappush(frente, (-distancias[origen], origen))
+        
+        saltos = []  # (u, latencia del enlace u -> padre) en el orden en que se transmitió
+        while frente:
+            _, u = heapq.heappop(frente)
+            if u == destino:
+                continue
+            cantidad_bytes, mensajes = carga.pop(u)
+            padre = padres[u]
+            tamaño = cantidad_bytes + self.CABECERA
+            latencia = grafo[u][padre]
+            if self.ancho_banda:
+                latencia += tamaño / self.ancho_banda
+            saltos.append((u, padre, latencia))
+            
+            enlace = self.enlaces.get((u, padre))
+            if enlace is None:
+                self.enlaces[(u, padre)] = [tamaño, 1, mensajes, latencia]
+            else:
+                enlace[0] += tamaño
+                enlace[1] += 1
+                enlace[2] += mensajes
+                enlace[3] += latencia
+            self.por_nodo[u]['enviados'] += tamaño
+            self.por_nodo[padre]['recibidos'] += tamaño
+            self.sim.nodos[u].datos_transmitidos += tamaño
+            self.sim.estadisticas['datos_transmitidos_total'] += tamaño
+            self.estadisticas['bytes_enlaces'] += tamaño
+            
+            # Con pesos nulos un padre puede salir antes que su hijo: se vuelve a encolar
+            acumulado = carga.get(padre)
+            if acumulado is None:
+                carga[padre] = [cantidad_bytes, mensajes]
+                heapq.heappush(frente, (-distancias[padre], padre))
+            else:
+                acumulado[0] += cantidad_bytes
+                acumulado[1] += mensajes
+        
+        # Latencia de cada origen hasta el destino, del destino hacia afuera
+        hasta_destino = {destino: 0.0}
+        for u, padre, latencia in reversed(saltos):
+            hasta_destino[u] = latencia + hasta_destino[padre]
+        
+        entregados = 0
+        for origen, (_, mensajes) in pendientes.items():
+            if origen not in distancias:
+                continue
+            latencia = hasta_destino[origen]
+            registro = self.por_nodo[origen]
+            registro['mensajes'] += mensajes
+            registro['latencia'] += latencia * mensajes
+            for _ in range(mensajes):
+                self.sketch_latencia.agregar(latencia)
+            entregados += mensajes
+        self.por_nodo[destino]['entregados'] += entregados
+        self.estadisticas['entregas'] += entregados
+        self.estadisticas['transmisiones'] += len(saltos)
+        if sin_ruta:
+            self.estadisticas['sin_ruta'] += sin_ruta
+            self.sim._emitir(NivelEvento.ADVERTENCIA, 'mensajes_sin_ruta', cantidad=sin_ruta, destino=destino)
+        return len(saltos)
+    
+    def resumen(self, enlaces_destacados: int = 10) -> Dict:
+        """Contadores globales, latencia de entrega y los enlaces con más bytes (vacía el lote en curso)"""
+        self.vaciar()
+        cargados = heapq.nlargest(enlaces_destacados, self.enlaces.items(), key=lambda item: item[1][0])
+        return {
+            **self.estadisticas,
+            'latencia': self.sketch_latencia.resumen(),
+            'enlaces_mas_cargados': [
+                {'enlace': enlace, 'bytes': cantidad_bytes, 'transmisiones': transmisiones,
+                 'mensajes': mensajes, 'latencia_promedio': latencia / transmisiones}
+                for enlace, (cantidad_bytes, transmisiones, mensajes, latencia) in cargados
+            ]
+        }
+
+def vecinos_mas_cercanos(puntos, k: int, consultas=None, tamaño_bloque: int = 1 << 16):
+    """k vecinos más cercanos exactos con una rejilla espacial vectorizada (requiere NumPy)
+    
+    puntos y consultas son arrays (n, 2). Sin consultas se buscan los vecinos de cada punto
+    excluyéndose a sí mismo. Devuelve (indices, distancias) de forma (m, k), ordenados por
+    distancia y rellenos con -1 / inf si hay menos de k puntos. La celda se dimensiona para
+    contener unos (k + 1) / 2 puntos: se examinan las celdas a distancia R y las consultas cuyo
+    k-ésimo vecino pueda estar más lejos se repiten con R doble, así el resultado es exacto.
+    """
+    puntos = np.asarray(puntos, dtype=np.float64)
+    propias = consultas is None
+    consultas = puntos if propias else np.asarray(consultas, dtype=np.float64)
+    n, m = len(puntos), len(consultas)
+    indices = np.full((m, k), -1, dtype=np.int64)
+    distancias = np.full((m, k), np.inf)
+    if n == 0 or m == 0 or k <= 0:
+        return indices, distancias
+    
+    minimo = puntos.min(axis=0)
+    extension = np.maximum(puntos.max(axis=0) - minimo, 1e-12)
+    lado = max(math.sqrt(extension[0] * extension[1] * max(1.0, (k + 1) / 2) / n), extension.max() / 4096)
+    ancho, alto = (extension // lado).astype(np.int64) + 1
+    
+    # Puntos ordenados por celda (fila a fila): las celdas contiguas de una fila son un tramo
+    celda_x = ((puntos[:, 0] - minimo[0]) // lado).astype(np.int64)
+    celda_y = ((puntos[:, 1] - minimo[1]) // lado).astype(np.int64)
+    orden = np.argsort(celda_y * ancho + celda_x, kind='stable')
+    inicios = np.zeros(ancho * alto + 1, dtype=np.int64)
+    np.cumsum(np.bincount(celda_y * ancho + celda_x, minlength=ancho * alto), out=inicios[1:])
+    ordenados = puntos[orden]
+    
+    q_x = np.clip(((consultas[:, 0] - minimo[0]) // lado).astype(np.int64), 0, ancho - 1)
+    q_y = np.clip(((consultas[:, 1] - minimo[1]) // lado).astype(np.int64), 0, alto - 1)
+    if propias:
+        posicion_propia = np.empty(n, dtype=np.int64)
+        posicion_propia[orden] = np.arange(n)
+        pendientes = orden
+    else:
+        pendientes = np.argsort(q_y * ancho + q_x, kind='stable')
+    # Las consultas se recorren por celda para que los candidatos de un bloque estén contiguos en memoria
+    posiciones = np.full((m, k), -1, dtype=np.int64)
+    radio = 1
+    while len(pendientes):
+        for inicio in range(0, len(pendientes), tamaño_bloque):
+            bloque = pendientes[inicio:inicio + tamaño_bloque]
+            filas = np.arange(-radio, radio + 1)
+            fila = q_y[bloque, None] + filas
+            valida = (fila >= 0) & (fila < alto)
+            fila = np.clip(fila, 0, alto - 1)
+            desde = inicios[fila * ancho + np.maximum(q_x[bloque] - radio, 0)[:, None]]
+            hasta = inicios[fila * ancho + np.minimum(q_x[bloque] + radio, ancho - 1)[:, None] + 1]
+            longitudes = np.where(valida, hasta - desde, 0)
+            
+            # Expandir los tramos a una lista plana (consulta, candidato)
+            por_consulta = longitudes.sum(axis=1)
+            total = int(por_consulta.sum())
+            tramos = longitudes.ravel()
+            posicion = np.arange(total) + np.repeat(desde.ravel() - (np.cumsum(tramos) - tramos), tramos)
+            consulta = np.repeat(np.arange(len(bloque)), por_consulta)
+            diferencia = ordenados[posicion] - consultas[bloque][consulta]
+            d2 = np.einsum('ij,ij->i', diferencia, diferencia)
+            if propias:
+                d2[posicion == posicion_propia[bloque][consulta]] = np.inf
+            
+            # Matriz rellena (consulta, candidato) y selección parcial de los k menores por fila
+            columna = np.arange(total) - np.repeat(np.cumsum(por_consulta) - por_consulta, por_consulta)
+            ancho_matriz = max(int(por_consulta.max()), k)
+            matriz_d2 = np.full((len(bloque), ancho_matriz), np.inf)
+            matriz_id = np.full((len(bloque), ancho_matriz), -1, dtype=np.int64)
+            matriz_d2[consulta, columna] = d2
+            matriz_id[consulta, columna] = posicion
+            mejores = np.argpartition(matriz_d2, k - 1, axis=1)[:, :k]
+            mejores_d2 = np.take_along_axis(matriz_d2, mejores, axis=1)
+            por_distancia = np.argsort(mejores_d2, axis=1, kind='stable')
+            distancias[bloque] = np.take_along_axis(mejores_d2, por_distancia, axis=1)
+            posiciones[bloque] = np.take_along_axis(np.take_along_axis(matriz_id, mejores, axis=1),
+                                                    por_distancia, axis=1)
+        
+        # Exacto si el k-ésimo vecino está dentro del radio cubierto o ya se cubrió toda la rejilla
+        if radio >= max(ancho, alto):
+            break
+        cubierto = (radio * lado) ** 2
+        pendientes = pendientes[~(distancias[pendientes, -1] <= cubierto)]
+        radio *= 2
+    
+    encontrados = np.isfinite(distancias)
+    indices[encontrados] = orden[posiciones[encontrados]]
+    return indices, np.sqrt(distancias)
+
+def etiquetar_componentes(n: int, origenes, destinos):
+    """Componente conexa de cada nodo (etiqueta = menor índice de la componente), con NumPy
+    
+    Enganche por mínimo y salto de punteros sobre todas las aristas a la vez: cada ronda
+    cuesta O(n + m) vectorizado y en grafos geográficos bastan unas pocas rondas.
+    """
+    padre = np.arange(n)
+    origenes = np.asarray(origenes, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    while True:
+        raiz_origen, raiz_destino = padre[origenes], padre[destinos]
+        menor = np.minimum(raiz_origen, raiz_destino)
+        nuevo = padre.copy()
+        np.minimum.at(nuevo, raiz_origen, menor)
+        np.minimum.at(nuevo, raiz_destino, menor)
+        while True:
+            saltado = nuevo[nuevo]
+            if np.array_equal(saltado, nuevo):
+                break
+            nuevo = saltado
+        if np.array_equal(nuevo, padre):
+            return padre
+        padre = nuevo
+
+class NivelEvento(Enum):
+    DEBUG = 10
+    INFO = 20
+    ADVERTENCIA = 30
+    ERROR = 40
+
+class SumideroEventos:
+    """Destino de los eventos estructurados del simulador
+    
+    Cada evento es (instante, nivel, tipo, datos) con datos como dict de valores simples.
+    Solo se entregan eventos con nivel >= nivel_minimo; el formateo, si lo hay, ocurre
+    dentro del sumidero y nunca en el simulador.
+    """
+    
+    def __init__(self, nivel_minimo: Optional[NivelEvento] = NivelEvento.DEBUG):
+        self.nivel_minimo = nivel_minimo  # None = no acepta ningún evento
+    
+    def emitir(self, instante: float, nivel: NivelEvento, tipo: str, datos: Dict):
+        raise NotImplementedError
+    
+    def cerrar(self):
+        pass
+
+class SumideroNulo(SumideroEventos):
+    """Descarta todo; el simulador ni siquiera construye los eventos"""
+    
     def __init__(self):
+        super().__init__(None)
+    
+    def emitir(self, instante, nivel, tipo, datos):
+        pass
+
+class SumideroMemoria(SumideroEventos):
+    """Buffer circular acotado con los últimos eventos"""
+    
+    def __init__(self, capacidad: int = 10000, nivel_minimo: NivelEvento = NivelEvento.DEBUG):
+        super().__init__(nivel_minimo)
+        self.eventos = deque(maxlen=capacidad)
+    
+    def emitir(self, instante, nivel, tipo, datos):
+        self.eventos.append((instante, nivel, tipo, datos))
+
+class SumideroNDJSON(SumideroEventos):
+    """Escritor NDJSON con buffer: una línea JSON por evento, volcadas en bloques"""
+    
+    def __init__(self, destino, tamaño_buffer: int = 1000, nivel_minimo: NivelEvento = NivelEvento.DEBUG):
+        super().__init__(nivel_minimo)
+        self._propio = isinstance(destino, str)
+        self.archivo = open(destino, 'a', encoding='utf-8') if self._propio else destino
+        self.tamaño_buffer = tamaño_buffer
+        self.buffer = []
+    
+    def emitir(self, instante, nivel, tipo, datos):
+        registro = {'t': instante, 'nivel': nivel.name, 'tipo': tipo}
+        registro.update(datos)
+        self.buffer.append(json.dumps(registro, ensure_ascii=False))
+        if len(self.buffer) >= self.tamaño_buffer:
+            self.volcar()
+    
+    def volcar(self):
+        if self.buffer:
+            self.archivo.write('\n'.join(self.buffer) + '\n')
+            self.buffer.clear()
+            self.archivo.flush()
+    
+    def cerrar(self):
+        self.volcar()
+        if self._propio:
+            self.archivo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+class SumideroConsola(SumideroEventos):
+    """Reproduce los mensajes de consola originales del simulador"""
+    
+    MENSAJES = {
+        'nodo_agregado': "Nodo {id} ({nombre}) agregado en ubicación {ubicacion}",
+        'conexion_agregada': "Conexión agregada: {nodo1} <-> {nodo2} (peso: {peso})",
+        'nodos_inexistentes': "Error: Uno o ambos nodos no existen",
+        'motor_desconocido': "Error: Motor de rutas desconocido '{motor}'",
+        'emergencia_asignada': "Emergencia {id} asignada a nodo {nodo}",
+        'sin_nodos_activos': "Error: No hay nodos activos para atender la emergencia",
+        'lote_sin_nodos_activos': "Error: No hay nodos activos para atender {cantidad} emergencias",
+        'emergencia_atendida': "Emergencia {id} atendida por {recurso} desde nodo {nodo}",
+        'emergencia_redistribuida': "Emergencia {id} redistribuida de {origen} a {destino}",
+        'nodo_inactivo': "Nodo {id} marcado como inactivo",
+        'nodo_restaurado': "Nodo {id} restaurado",
+        'emergencias_en_espera': "Error: No hay nodos activos para {cantidad} emergencias de {origen}; quedan en espera",
+        'topologia_cargada': "Topología cargada desde {archivo}",
+        'archivo_no_encontrado': "Archivo {archivo} no encontrado",
+        'json_invalido': "Error al decodificar JSON en {archivo}",
+        'cargando_packet_tracer': "Cargando topología desde Packet Tracer...",
+        'topologia_packet_tracer_cargada':
+            "Topología de Packet Tracer cargada: {dispositivos} dispositivos, {conexiones} conexiones",
+        'configuracion_pt_generada':
+            "Archivo de configuración ejemplo generado: {archivo}\n"
+            "Modifica este archivo con los datos de tu topología de Packet Tracer",
+        'topologia_generada': "Topología automática generada con {nodos} nodos",
+        'ids_existentes': "Error: {cantidad} ids con prefijo '{prefijo}' ya existen (p. ej. {ejemplo})",
+        'snapshot_exportado': "Snapshot exportado a {archivo}: {nodos} nodos, {aristas} conexiones",
+        'snapshot_cargado': "Snapshot cargado desde {archivo}: {nodos} nodos, {aristas} conexiones",
+        'snapshot_invalido': "Error: {archivo} no es un snapshot válido",
+        'snapshot_en_simulador_no_vacio': "Error: El snapshot {archivo} solo se puede cargar en un simulador vacío",
+        'registro_invalido': "Registro inválido ignorado: {linea}",
+        'contrapresion_agotada': "Colas por encima de {limite} tras esperar {espera} s; se continúa la ingesta",
+        'checkpoint_guardado': "Checkpoint {modo} guardado en {archivo}: {nodos} nodos, {emergencias} emergencias",
+        'checkpoint_restaurado': "Checkpoint {secuencia} restaurado desde {directorio}: {nodos} nodos",
+        'mensajes_sin_ruta': "Advertencia: {cantidad} mensajes sin ruta hacia {destino}",
+        'rutas_precalculadas': "Rutas entre {nodos} nodos precalculadas con {metodo} en {segundos} s",
+    }
+    
+    def emitir(self, instante, nivel, tipo, datos):
+        plantilla = self.MENSAJES.get(tipo)
+        if plantilla is None:
+            print(f"[{nivel.name}] {tipo}: {datos}")
+        else:
+            print(plantilla.format(**datos))
+
+def _exclusivo_en_concurrencia(metodo):
+    """En modo concurrente, serializar el método con el cerrojo de topología del simulador"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        cerrojo = self._cerrojo_topologia
+        if cerrojo is None:
+            return metodo(self, *args, **kwargs)
+        with cerrojo:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+class SimuladorRedLAN:
+    MOTORES_RUTAS = ('dijkstra', 'astar', 'bidireccional')
+    
+    def __init__(self, capacidad_cache_rutas: int = 64, motor_rutas: str = 'dijkstra',
+                 usar_grafo_compacto: bool = False, semilla: Optional[int] = None,
+                 sumideros: Optional[List[SumideroEventos]] = None):
+        # Sumideros de eventos: por defecto la salida de consola de siempre
+        self.sumideros: List[SumideroEventos] = [SumideroConsola()] if sumideros is None else list(sumideros)
+        self._recalcular_nivel_eventos()
         self.nodos: Dict[str, Nodo] = {}
         self.grafo = defaultdict(dict)  # {nodo_origen: {nodo_destino: peso}}
         self.arbol_geografico = ArbolBusquedaGeografica()
         self.tabla_emergencias = TablaHashEmergencias()
         self.historial_rutas = []
+        # Generador aleatorio propio: sin semilla se inicializa desde el sistema y nunca toca el
+        # estado del módulo random global
+        self.rng = random.Random(semilla)
         self.estadisticas = {
             'emergencias_totales': 0,
             'emergencias_atendidas': 0,
             'tiempo_respuesta_promedio': 0.0,
             'datos_transmitidos_total': 0
         }
+        # Caché LRU de árboles de caminos mínimos por origen
+        self.cache_rutas: "OrderedDict[str, ArbolRutas]" = OrderedDict()
+        self.capacidad_cache_rutas = capacidad_cache_rutas
+        self.estadisticas_cache_rutas = {
+            'aciertos': 0,
+            'fallos': 0,
+            'reparaciones': 0,
+            'desalojos': 0
+        }
+        # Torneo global: cada hoja es un nodo con clave (prioridad, timestamp) de su emergencia
+        # más urgente, o VACIO si está inactivo, sin recursos libres o sin pendientes
+        self.torneo = ArbolTorneo()
+        self.hoja_torneo: Dict[str, int] = {}
+        self.ids_torneo: List[str] = []
+        # Ciclo de vida de recursos: reloj, modelo de servicio y min-heap de liberaciones
+        # (instante, secuencia, id_nodo, recurso)
+        self.reloj: Callable[[], float] = time.time
+        self.modelo_servicio = ModeloServicio()
+        self.liberaciones: List[Tuple[float, int, str, Recurso]] = []
+        # Emergencias sin estación activa a la que redistribuirlas (heap); se reparten al restaurar
+        self.en_espera: List[Emergencia] = []
+        self._secuencia_liberacion = 0
+        # Agregados de tiempo de respuesta actualizados al atender cada emergencia
+        self.sketch_respuesta = SketchPercentiles()
+        self.sketch_por_tipo: Dict[TipoEmergencia, SketchPercentiles] = defaultdict(SketchPercentiles)
+        self.sketch_por_nodo: Dict[str, SketchPercentiles] = defaultdict(SketchPercentiles)
+        # Motor de enrutamiento usado por calcular_ruta y nodos expandidos por cada motor
+        self.motor_rutas = motor_rutas
+        self.estadisticas_motores = {
+            motor: {'consultas': 0, 'nodos_expandidos': 0} for motor in self.MOTORES_RUTAS
+        }
+        self._factor_heuristica: Optional[float] = None
+        # Backend CSR opcional; se reconstruye de forma perezosa tras cambios de topología
+        self.usar_grafo_compacto = usar_grafo_compacto
+        self._grafo_compacto: Optional[GrafoCompacto] = None
+        # Archivo de snapshot mapeado en memoria (cargar_snapshot), del que lee el backend CSR
+        self._snapshot_mmap: Optional[mmap.mmap] = None
+        # Cambios desde el último checkpoint (None mientras no se haga seguimiento); los dicts
+        # funcionan como conjuntos ordenados para conservar el orden de alta de los nodos
+        self._nodos_modificados: Optional[Dict[str, None]] = None
+        self._emergencias_modificadas: Optional[Dict[str, Emergencia]] = None
+        self._nodos_en_checkpoint = 0
+        # Análisis de puntos críticos y union-find de alcanzabilidad (None = recalcular al consultar)
+        self._analisis_fallas: Optional[Tuple] = None
+        self._conectividad: Optional[ConectividadIncremental] = None
+        # Modo concurrente (ver activar_concurrencia); _cerrojos_nodo es None fuera de él
+        self._cerrojos_nodo: Optional[Dict[str, threading.Lock]] = None
+        self._cerrojo_topologia: Optional[threading.RLock] = None
+        self._contador_registros: Optional[ContadorAtomico] = None
+        self._torneo_pendiente: Optional[Set[str]] = None
+        self._arbol_lectura: Optional[ArbolBusquedaGeografica] = None
+        # Propagación multi-salto de los datos (None = solo se contabiliza el primer salto)
+        self.propagacion: Optional[PropagacionDatos] = None
+        # Rutas entre todos los pares (ver precalcular_rutas); se descarta al cambiar la topología
+        self.tabla_rutas: Optional[TablaRutasCompleta] = None
+    
+    def agregar_sumidero(self, sumidero: SumideroEventos):
+        self.sumideros.append(sumidero)
+        self._recalcular_nivel_eventos()
     
-    def agregar_nodo(self, id: str, nombre: str, ubicacion: Tuple[float, float]):
+    def quitar_sumidero(self, sumidero: SumideroEventos):
+        self.sumideros.remove(sumidero)
+        self._recalcular_nivel_eventos()
+    
+    def _recalcular_nivel_eventos(self):
+        niveles = [s.nivel_minimo.value for s in self.sumideros if s.nivel_minimo is not None]
+        # Nivel mínimo que algún sumidero acepta; por debajo de él _emitir retorna de inmediato
+        self._nivel_eventos = min(niveles) if niveles else float('inf')
+    
+    def _emitir(self, nivel: NivelEvento, tipo: str, **datos):
+        if nivel.value < self._nivel_eventos:
+            return
+        instante = self.reloj()
+        for sumidero in self.sumideros:
+            if sumidero.nivel_minimo is not None and nivel.value >= sumidero.nivel_minimo.value:
+                sumidero.emitir(instante, nivel, tipo, datos)
+    
+    @_exclusivo_en_concurrencia
+    def agregar_nodo(self, id: str, nombre: str, ubicacion: Tuple[float, float], indexar: bool = True):
         """Agregar un nodo (estación) a la red"""
         nodo = Nodo(id, nombre, ubicacion)
+        if self._cerrojos_nodo is not None:
+            self._cerrojos_nodo[id] = threading.Lock()
         self.nodos[id] = nodo
-        self.arbol_geografico.insertar(nodo)
-        print(f"Nodo {id} ({nombre}) agregado en ubicación {ubicacion}")
+        # La lista de adyacencia del grafo y las conexiones del nodo son el mismo dict
+        self.grafo[id] = nodo.conexiones
+        if id not in self.hoja_torneo:
+            self.hoja_torneo[id] = len(self.ids_torneo)
+            self.ids_torneo.append(id)
+        nodo.al_cambiar = self._actualizar_torneo
+        self._actualizar_torneo(nodo)
+        self._grafo_compacto = None
+        self.tabla_rutas = None
+        self._analisis_fallas = None
+        if self._conectividad is not None:
+            self._conectividad.agregar(id)
+        # En cargas masivas el índice se construye una sola vez al final (ver reindexar_geografia)
+        if indexar:
+            self.arbol_geografico.insertar(nodo)
+            self._arbol_lectura = None
+        self._factor_heuristica = None
+        self._emitir(NivelEvento.DEBUG, 'nodo_agregado', id=id, nombre=nombre, ubicacion=ubicacion)
     
+    @_exclusivo_en_concurrencia
     def agregar_conexion(self, nodo1: str, nodo2: str, peso: float):
         """Agregar conexión bidireccional entre nodos con peso (latencia/distancia)"""
         if nodo1 in self.nodos and nodo2 in self.nodos:
+            peso_anterior = self.grafo[nodo1].get(nodo2)
             self.grafo[nodo1][nodo2] = peso
             self.grafo[nodo2][nodo1] = peso
-            self.nodos[nodo1].conexiones[nodo2] = peso
-            self.nodos[nodo2].conexiones[nodo1] = peso
-            print(f"Conexión agregada: {nodo1} <-> {nodo2} (peso: {peso})")
+            self._grafo_compacto = None
+            self.tabla_rutas = None
+            self._analisis_fallas = None
+            if self._conectividad is not None and self.nodos[nodo1].activo and self.nodos[nodo2].activo:
+                self._conectividad.unir(nodo1, nodo2)
+            if self._nodos_modificados is not None:
+                self._nodos_modificados[nodo1] = None
+                self._nodos_modificados[nodo2] = None
+            self._actualizar_cache_conexion(nodo1, nodo2, peso, peso_anterior)
+            self._factor_heuristica = None
+            self._emitir(NivelEvento.DEBUG, 'conexion_agregada', nodo1=nodo1, nodo2=nodo2, peso=peso)
         else:
-            print("Error: Uno o ambos nodos no existen")
+            self._emitir(NivelEvento.ERROR, 'nodos_inexistentes', nodo1=nodo1, nodo2=nodo2)
+    
+    @_exclusivo_en_concurrencia
+    def reindexar_geografia(self):
+        """Reconstruir el árbol geográfico balanceado con todos los nodos de la red"""
+        self.arbol_geografico.construir(self.nodos.values())
+        self._arbol_lectura = None
+    
+    def activar_concurrencia(self, franjas: int = 64):
+        """Permitir que varios hilos registren emergencias a la vez de forma segura
+        
+        La tabla de emergencias pasa a cerrojos por franja, cada cola de nodo tiene su
+        cerrojo, el total de emergencias se cuenta con un contador atómico y la búsqueda del
+        nodo más cercano usa una copia de solo lectura del árbol geográfico que se vuelve a
+        publicar tras cada cambio. Las hojas del torneo solo se marcan y se recalculan al
+        desactivar el modo. Fallas, restauraciones y altas de nodos y conexiones se serializan
+        entre sí sin frenar los registros; despachos, rutas, checkpoints y cargas masivas
+        deben hacerse fuera del modo.
+        
+        El GIL sigue ejecutando un registro a la vez: el modo da corrección con productores en
+        varios hilos (p. ej. ingesta que espera E/S), no más rendimiento. Medido con 300 nodos:
+        ~24k registros/s sin el modo, ~17k con 1 hilo y ~19k con 8 hilos.
+        """
+        if self._cerrojos_nodo is not None:
+            return
+        tabla = TablaHashConcurrente(franjas, max(len(self.tabla_emergencias), 1000))
+        tabla.insertar_lote(list(self.tabla_emergencias))
+        self.tabla_emergencias = tabla
+        self._cerrojo_topologia = threading.RLock()
+        self._contador_registros = ContadorAtomico(self.estadisticas, 'emergencias_totales')
+        self._torneo_pendiente = set()
+        self._arbol_lectura = self.arbol_geografico.copiar()
+        self._cerrojos_nodo = {id_nodo: threading.Lock() for id_nodo in self.nodos}
+    
+    def desactivar_concurrencia(self):
+        """Volver al modo de un solo hilo; los hilos productores deben haber terminado"""
+        if self._cerrojos_nodo is None:
+            return
+        self._cerrojos_nodo = None
+        pendientes, self._torneo_pendiente = self._torneo_pendiente, None
+        for id_nodo in pendientes:
+            self._actualizar_torneo(self.nodos[id_nodo])
+        tabla = TablaHashEmergencias(max(len(self.tabla_emergencias), 1000))
+        tabla.insertar_lote(list(self.tabla_emergencias))
+        self.tabla_emergencias = tabla
+        self._cerrojo_topologia = None
+        self._contador_registros = None
+        self._arbol_lectura = None
+    
+    @contextmanager
+    def modo_concurrente(self, franjas: int = 64):
+        """Contexto con el modo concurrente activo (ver activar_concurrencia)"""
+        self.activar_concurrencia(franjas)
+        try:
+            yield self
+        finally:
+            self.desactivar_concurrencia()
+    
+    def _cerrojo_cola(self, id_nodo: str):
+        """Cerrojo de la cola del nodo en modo concurrente (contexto nulo fuera de él)"""
+        return nullcontext() if self._cerrojos_nodo is None else self._cerrojos_nodo[id_nodo]
+    
+    def _arbol_para_lectura(self) -> ArbolBusquedaGeografica:
+        """Instantánea del árbol geográfico, publicada de nuevo si un cambio la invalidó"""
+        arbol = self._arbol_lectura
+        if arbol is None:
+            with self._cerrojo_topologia:
+                if self._arbol_lectura is None:
+                    self._arbol_lectura = self.arbol_geografico.copiar()
+                arbol = self._arbol_lectura
+        return arbol
     
     def dijkstra(self, origen: str, destino: str) -> Tuple[List[str], float]:
-        """Implementación del algoritmo de Dijkstra para encontrar la ruta más corta"""
+        """Ruta más corta con Dijkstra, reutilizando el árbol de caminos mínimos del origen
+        
+        Si hay una tabla precalculada (precalcular_rutas) la ruta sale de ella sin búsqueda y
+        el costo se suma en float64 sobre self.grafo, no desde la tabla float32. Ante empates
+        la tabla puede devolver otra ruta igual de corta que la de Dijkstra.
+        """
         if origen not in self.nodos or destino not in self.nodos:
             return [], float('inf')
         
         if not self.nodos[origen].activo or not self.nodos[destino].activo:
             return [], float('inf')
         
-        distancias = {nodo: float('inf') for nodo in self.nodos}
-        distancias[origen] = 0
-        padres = {nodo: None for nodo in self.nodos}
-        visitados = set()
+        if self.tabla_rutas is not None:
+            ruta, _ = self.tabla_rutas.ruta(origen, destino)
+            if not ruta:
+                return [], float('inf')
+            return ruta, sum(self.grafo[u][v] for u, v in zip(ruta, ruta[1:]))
         
-        # Cola de prioridad: (distancia, nodo)
-        cola = [(0, origen)]
+        arbol = self._obtener_arbol_rutas(origen)
+        ruta = arbol.ruta_hasta(destino)
+        if not ruta:
+            return [], float('inf')
+        
+        return ruta, arbol.distancias[destino]
+    
+    def precalcular_rutas(self, metodo: str = 'auto', procesos: Optional[int] = None) -> TablaRutasCompleta:
+        """Precalcular distancias y siguiente salto entre todos los pares de estaciones
+        
+        metodo 'auto' elige Floyd-Warshall vectorizado para grafos chicos y densos y Dijkstra
+        repetido en paralelo para los grandes y dispersos. La tabla se parchea en cada falla
+        o restauración y se descarta al agregar nodos o conexiones.
+        """
+        inicio = time.perf_counter()
+        self.tabla_rutas = TablaRutasCompleta.construir(self.obtener_grafo_compacto(), metodo, procesos)
+        self._emitir(NivelEvento.INFO, 'rutas_precalculadas', nodos=len(self.tabla_rutas),
+                     metodo=self.tabla_rutas.metodo, segundos=round(time.perf_counter() - inicio, 3))
+        return self.tabla_rutas
+    
+    def _obtener_arbol_rutas(self, origen: str) -> ArbolRutas:
+        """Árbol de caminos mínimos del origen desde la caché LRU (o calculado si no está)"""
+        arbol = self.cache_rutas.get(origen)
+        if arbol is not None:
+            self.cache_rutas.move_to_end(origen)
+            self.estadisticas_cache_rutas['aciertos'] += 1
+            return arbol
+        
+        self.estadisticas_cache_rutas['fallos'] += 1
+        if self.usar_grafo_compacto:
+            arbol, expandidos = self._arbol_rutas_compacto(origen)
+        else:
+            arbol = ArbolRutas(origen)
+            expandidos = self._relajar_arbol(arbol, [(0, origen)])
+        self.estadisticas_motores['dijkstra']['nodos_expandidos'] += expandidos
+        
+        if self.capacidad_cache_rutas > 0:
+            self.cache_rutas[origen] = arbol
+            while len(self.cache_rutas) > self.capacidad_cache_rutas:
+                self.cache_rutas.popitem(last=False)
+                self.estadisticas_cache_rutas['desalojos'] += 1
+        return arbol
+    
+    def obtener_grafo_compacto(self) -> GrafoCompacto:
+        """Backend CSR del grafo, reconstruido solo si la topología cambió desde la última vez"""
+        if self._grafo_compacto is None:
+            self._grafo_compacto = GrafoCompacto.desde_grafo(self.nodos, self.grafo)
+        return self._grafo_compacto
+    
+    def _arbol_rutas_compacto(self, origen: str) -> Tuple[ArbolRutas, int]:
+        """Calcular el árbol de caminos mínimos sobre el backend CSR"""
+        compacto = self.obtener_grafo_compacto()
+        distancias, padres, expandidos = compacto.dijkstra(compacto.indices[origen])
+        
+        arbol = ArbolRutas(origen)
+        ids = compacto.ids
+        for i, padre in enumerate(padres):
+            if padre >= 0:
+                arbol.fijar_padre(ids[i], ids[padre], distancias[i])
+        return arbol, expandidos
+    
+    def _relajar_arbol(self, arbol: ArbolRutas, cola: List[Tuple[float, str]]) -> int:
+        """Dijkstra sobre nodos activos a partir de las entradas de la cola (cálculo completo o reparación)"""
+        heapq.heapify(cola)
+        distancias = arbol.distancias
+        expandidos = 0
         
         while cola:
             dist_actual, nodo_actual = heapq.heappop(cola)
             
-            if nodo_actual in visitados:
+            # Entrada obsoleta: el nodo ya se alcanzó con menor distancia
+            if dist_actual > distancias.get(nodo_actual, float('inf')):
                 continue
             
-            visitados.add(nodo_actual)
+            expandidos += 1
+            # Explorar vecinos
+            for vecino, peso in self.grafo[nodo_actual].items():
+                if self.nodos[vecino].activo:
+                    nueva_distancia = dist_actual + peso
+                    
+                    if nueva_distancia < distancias.get(vecino, float('inf')):
+                        arbol.fijar_padre(vecino, nodo_actual, nueva_distancia)
+                        heapq.heappush(cola, (nueva_distancia, vecino))
+        
+        return expandidos
+    
+    def calcular_ruta(self, origen: str, destino: str, motor: Optional[str] = None) -> Tuple[List[str], float]:
+        """Ruta más corta con el motor indicado (por defecto self.motor_rutas)"""
+        motor = motor or self.motor_rutas
+        if motor not in self.MOTORES_RUTAS:
+            self._emitir(NivelEvento.ERROR, 'motor_desconocido', motor=motor)
+            return [], float('inf')
+        
+        if motor == 'dijkstra':
+            self.estadisticas_motores['dijkstra']['consultas'] += 1
+            return self.dijkstra(origen, destino)
+        
+        if origen not in self.nodos or destino not in self.nodos:
+            return [], float('inf')
+        
+        if not self.nodos[origen].activo or not self.nodos[destino].activo:
+            return [], float('inf')
+        
+        if motor == 'astar':
+            ruta, distancia, expandidos = self._a_estrella(origen, destino)
+        else:
+            ruta, distancia, expandidos = self._dijkstra_bidireccional(origen, destino)
+        
+        self.estadisticas_motores[motor]['consultas'] += 1
+        self.estadisticas_motores[motor]['nodos_expandidos'] += expandidos
+        return ruta, distancia
+    
+    def factor_heuristica(self) -> float:
+        """Factor f tal que f·(distancia euclidiana) nunca sobreestima el costo real de una arista
+        
+        f = mín(peso / distancia euclidiana) sobre todas las conexiones. Con f >= 1 la
+        distancia en línea recta es admisible tal cual (p. ej. generar_topologia_automatica);
+        con pesos arbitrarios (Packet Tracer: 1.0/5.0) se escala para seguir siendo admisible.
+        """
+        if self._factor_heuristica is None:
+            factor = float('inf')
+            for nodo1, vecinos in self.grafo.items():
+                x1, y1 = self.nodos[nodo1].ubicacion
+                for nodo2, peso in vecinos.items():
+                    x2, y2 = self.nodos[nodo2].ubicacion
+                    distancia = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+                    if distancia > 0:
+                        factor = min(factor, peso / distancia)
+            # Sin aristas con longitud geográfica no hay información útil: A* se reduce a Dijkstra
+            self._factor_heuristica = factor if factor != float('inf') else 0.0
+        return self._factor_heuristica
+    
+    def heuristica_admisible(self) -> bool:
+        """Indica si la distancia en línea recta sin escalar es admisible para la topología actual"""
+        return self.factor_heuristica() >= 1.0
+    
+    def _a_estrella(self, origen: str, destino: str) -> Tuple[List[str], float, int]:
+        """A* con heurística geográfica escalada por factor_heuristica()"""
+        factor = self.factor_heuristica()
+        meta_x, meta_y = self.nodos[destino].ubicacion
+        
+        def heuristica(id_nodo):
+            x, y = self.nodos[id_nodo].ubicacion
+            return factor * math.sqrt((x - meta_x) ** 2 + (y - meta_y) ** 2)
+        
+        distancias = {origen: 0}
+        padres = {origen: None}
+        cerrados = set()
+        cola = [(heuristica(origen), 0, origen)]
+        
+        while cola:
+            _, dist_actual, nodo_actual = heapq.heappop(cola)
+            if nodo_actual in cerrados:
+                continue
+            cerrados.add(nodo_actual)
             
             if nodo_actual == destino:
                 break
             
-            # Explorar vecinos
             for vecino, peso in self.grafo[nodo_actual].items():
-                if vecino not in visitados and self.nodos[vecino].activo:
+                if vecino not in cerrados and self.nodos[vecino].activo:
                     nueva_distancia = dist_actual + peso
-                    
-                    if nueva_distancia < distancias[vecino]:
+                    if nueva_distancia < distancias.get(vecino, float('inf')):
                         distancias[vecino] = nueva_distancia
                         padres[vecino] = nodo_actual
-                        heapq.heappush(cola, (nueva_distancia, vecino))
+                        heapq.heappush(cola, (nueva_distancia + heuristica(vecino), nueva_distancia, vecino))
+        
+        if destino not in cerrados:
+            return [], float('inf'), len(cerrados)
         
-        # Reconstruir ruta
         ruta = []
         nodo_actual = destino
         while nodo_actual is not None:
             ruta.append(nodo_actual)
             nodo_actual = padres[nodo_actual]
+        ruta.reverse()
+        return ruta, distancias[destino], len(cerrados)
+    
+    def _dijkstra_bidireccional(self, origen: str, destino: str) -> Tuple[List[str], float, int]:
+        """Dijkstra simultáneo desde ambos extremos; termina cuando los frentes no pueden mejorar la mejor ruta"""
+        if origen == destino:
+            return [origen], 0, 1
+        
+        distancias = ({origen: 0}, {destino: 0})
+        padres = ({origen: None}, {destino: None})
+        cerrados = (set(), set())
+        colas = ([(0, origen)], [(0, destino)])
+        mejor_distancia = float('inf')
+        punto_encuentro = None
         
+        while colas[0] and colas[1]:
+            # Criterio de parada: ningún camino restante puede ser más corto que el mejor encontrado
+            if colas[0][0][0] + colas[1][0][0] >= mejor_distancia:
+                break
+            
+            # Avanzar el frente con la cola más pequeña
+            lado = 0 if len(colas[0]) <= len(colas[1]) else 1
+            dist_actual, nodo_actual = heapq.heappop(colas[lado])
+            if nodo_actual in cerrados[lado]:
+                continue
+            cerrados[lado].add(nodo_actual)
+            
+            otras_distancias = distancias[1 - lado]
+            for vecino, peso in self.grafo[nodo_actual].items():
+                if vecino in cerrados[lado] or not self.nodos[vecino].activo:
+                    continue
+                nueva_distancia = dist_actual + peso
+                if nueva_distancia < distancias[lado].get(vecino, float('inf')):
+                    distancias[lado][vecino] = nueva_distancia
+                    padres[lado][vecino] = nodo_actual
+                    heapq.heappush(colas[lado], (nueva_distancia, vecino))
+                if vecino in otras_distancias:
+                    total = distancias[lado][vecino] + otras_distancias[vecino]
+                    if total < mejor_distancia:
+                        mejor_distancia = total
+                        punto_encuentro = vecino
+        
+        expandidos = len(cerrados[0]) + len(cerrados[1])
+        if punto_encuentro is None:
+            return [], float('inf'), expandidos
+        
+        # Unir la mitad origen -> encuentro con la mitad encuentro -> destino
+        ruta = []
+        nodo_actual = punto_encuentro
+        while nodo_actual is not None:
+            ruta.append(nodo_actual)
+            nodo_actual = padres[0][nodo_actual]
         ruta.reverse()
+        nodo_actual = padres[1][punto_encuentro]
+        while nodo_actual is not None:
+            ruta.append(nodo_actual)
+            nodo_actual = padres[1][nodo_actual]
+        return ruta, mejor_distancia, expandidos
+    
+    def invalidar_cache_rutas(self):
+        """Vaciar la caché de rutas (necesario si se modifica el grafo fuera del simulador)"""
+        self.cache_rutas.clear()
+    
+    def _desalojar_ruta(self, origen: str):
+        del self.cache_rutas[origen]
+        self.estadisticas_cache_rutas['desalojos'] += 1
+    
+    def _actualizar_cache_conexion(self, nodo1: str, nodo2: str, peso: float, peso_anterior: Optional[float]):
+        """Reparar o desalojar solo los árboles afectados por una conexión nueva o modificada"""
+        if not self.nodos[nodo1].activo or not self.nodos[nodo2].activo:
+            return
+        
+        for origen, arbol in list(self.cache_rutas.items()):
+            padres = arbol.padres
+            # Si una arista del árbol empeora, sus descendientes pueden tener otra ruta mejor
+            if peso_anterior is not None and peso > peso_anterior and (
+                padres.get(nodo2) == nodo1 or padres.get(nodo1) == nodo2
+            ):
+                self._desalojar_ruta(origen)
+                continue
+            
+            # Si la arista mejora alguna distancia, propagar la mejora desde ese extremo
+            cola = []
+            for u, v in ((nodo1, nodo2), (nodo2, nodo1)):
+                if u in arbol.distancias:
+                    nueva_distancia = arbol.distancias[u] + peso
+                    if nueva_distancia < arbol.distancias.get(v, float('inf')):
+                        arbol.fijar_padre(v, u, nueva_distancia)
+                        cola.append((nueva_distancia, v))
+            if cola:
+                self._relajar_arbol(arbol, cola)
+                self.estadisticas_cache_rutas['reparaciones'] += 1
+    
+    def _actualizar_cache_falla(self, id_nodo: str):
+        """Desalojar los árboles cuyas rutas pasan por el nodo caído; en los demás es solo una hoja"""
+        for origen, arbol in list(self.cache_rutas.items()):
+            if id_nodo == origen or arbol.hijos.get(id_nodo, 0) > 0:
+                self._desalojar_ruta(origen)
+            elif id_nodo in arbol.distancias:
+                arbol.quitar_hoja(id_nodo)
+    
+    def _actualizar_cache_restauracion(self, id_nodo: str):
+        """Reincorporar el nodo restaurado a cada árbol y propagar las rutas que abre"""
+        for arbol in self.cache_rutas.values():
+            mejor = None
+            for vecino, peso in self.grafo[id_nodo].items():
+                if vecino in arbol.distancias and self.nodos[vecino].activo:
+                    distancia = arbol.distancias[vecino] + peso
+                    if mejor is None or distancia < mejor[0]:
+                        mejor = (distancia, vecino)
+            
+            if mejor is not None and mejor[0] < arbol.distancias.get(id_nodo, float('inf')):
+                arbol.fijar_padre(id_nodo, mejor[1], mejor[0])
+                self._relajar_arbol(arbol, [(mejor[0], id_nodo)])
+                self.estadisticas_cache_rutas['reparaciones'] += 1
+    
+    def registrar_emergencia(self, emergencia: Emergencia):
+        """Registrar una nueva emergencia en el sistema"""
+        nodo = self._registrar(emergencia)
+        if nodo:
+            self._emitir(NivelEvento.DEBUG, 'emergencia_asignada', id=emergencia.id, nodo=nodo.id)
+            return nodo.id
+        
+        self._emitir(NivelEvento.ERROR, 'sin_nodos_activos', id=emergencia.id)
+        return None
+    
+    def _registrar(self, emergencia: Emergencia) -> Optional[Nodo]:
+        """Registrar la emergencia y encolarla en el nodo activo más cercano (sin mensajes)"""
+        if self._cerrojos_nodo is not None:
+            return self._registrar_concurrente(emergencia)
+        self.tabla_emergencias.insertar(emergencia)
+        self.estadisticas['emergencias_totales'] += 1
+        if self._emergencias_modificadas is not None:
+            self._emergencias_modificadas[emergencia.id] = emergencia
+        
+        # Encontrar el nodo activo más cercano
+        cercanos = self.arbol_geografico.k_mas_cercanos(
+            emergencia.ubicacion, 1, filtro=lambda n: n.activo
+        )
+        
+        if cercanos:
+            cercanos[0].agregar_emergencia(emergencia)
+            return cercanos[0]
+        return None
+    
+    def _registrar_concurrente(self, emergencia: Emergencia) -> Optional[Nodo]:
+        """_registrar seguro entre hilos: cerrojo de franja, contador atómico y cerrojo de la cola"""
+        self.tabla_emergencias.insertar(emergencia)
+        self._contador_registros.sumar()
+        if self._emergencias_modificadas is not None:
+            self._emergencias_modificadas[emergencia.id] = emergencia
+        
+        filtro = lambda n: n.activo
+        while True:
+            cercanos = self._arbol_para_lectura().k_mas_cercanos(emergencia.ubicacion, 1, filtro=filtro)
+            if not cercanos:
+                return None
+            nodo = cercanos[0]
+            with self._cerrojos_nodo[nodo.id]:
+                # Si falló entre la búsqueda y el cerrojo su cola ya se repartió: buscar otro
+                if nodo.activo:
+                    nodo.agregar_emergencia(emergencia)
+                    return nodo
+    
+    # Con más estaciones activas que esto, la búsqueda por árbol supera a la fuerza bruta vectorizada
+    UMBRAL_FUERZA_BRUTA = 20000
+    # Elementos máximos de cada matriz de distancias intermedia (acota la memoria por bloque)
+    TAMAÑO_BLOQUE = 1 << 22
+    
+    def asignar_nodos_lote(self, coordenadas) -> List[Optional[str]]:
+        """Nodo activo más cercano para cada coordenada (lista de tuplas o array NumPy de forma (n, 2))"""
+        activos = [nodo for nodo in self.nodos.values() if nodo.activo]
+        if not activos:
+            return [None] * len(coordenadas)
+        
+        if np is None or len(activos) > self.UMBRAL_FUERZA_BRUTA:
+            filtro = lambda n: n.activo
+            asignaciones = []
+            for ubicacion in coordenadas:
+                cercanos = self.arbol_geografico.k_mas_cercanos(tuple(ubicacion), 1, filtro=filtro)
+                asignaciones.append(cercanos[0].id if cercanos else None)
+            return asignaciones
+        
+        puntos = np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2)
+        estaciones = np.array([nodo.ubicacion for nodo in activos], dtype=np.float64)
+        lat, lon = estaciones[:, 0], estaciones[:, 1]
+        indices = np.empty(len(puntos), dtype=np.intp)
+        
+        bloque = max(1, self.TAMAÑO_BLOQUE // len(activos))
+        for inicio in range(0, len(puntos), bloque):
+            fragmento = puntos[inicio:inicio + bloque]
+            distancias = (fragmento[:, 0, None] - lat) ** 2
+            distancias += (fragmento[:, 1, None] - lon) ** 2
+            indices[inicio:inicio + bloque] = distancias.argmin(axis=1)
+        
+        ids_activos = [nodo.id for nodo in activos]
+        return [ids_activos[i] for i in indices.tolist()]
+    
+    def registrar_emergencias_lote(self, emergencias: List[Emergencia], coordenadas=None) -> List[Optional[str]]:
+        """Registrar muchas emergencias a la vez; devuelve el id del nodo asignado a cada una"""
+        emergencias = list(emergencias)
+        if self._cerrojos_nodo is not None:
+            # En modo concurrente cada emergencia sigue el camino con cerrojos de _registrar
+            asignaciones = [self._registrar_concurrente(emergencia) for emergencia in emergencias]
+            sin_asignar = asignaciones.count(None)
+            if sin_asignar:
+                self._emitir(NivelEvento.ERROR, 'lote_sin_nodos_activos', cantidad=sin_asignar)
+            return [nodo.id if nodo is not None else None for nodo in asignaciones]
+        if coordenadas is None:
+            coordenadas = [emergencia.ubicacion for emergencia in emergencias]
+        asignaciones = self.asignar_nodos_lote(coordenadas)
+        
+        self.tabla_emergencias.insertar_lote(emergencias)
+        self.estadisticas['emergencias_totales'] += len(emergencias)
+        if self._emergencias_modificadas is not None:
+            self._emergencias_modificadas.update((emergencia.id, emergencia) for emergencia in emergencias)
+        
+        # Agrupar por nodo para insertar cada cola de una sola vez
+        por_nodo = defaultdict(list)
+        sin_asignar = 0
+        for emergencia, id_nodo in zip(emergencias, asignaciones):
+            if id_nodo is None:
+                sin_asignar += 1
+            else:
+                por_nodo[id_nodo].append(emergencia)
+        
+        for id_nodo, lote in por_nodo.items():
+            self.nodos[id_nodo].agregar_emergencias(lote)
+        
+        if sin_asignar:
+            self._emitir(NivelEvento.ERROR, 'lote_sin_nodos_activos', cantidad=sin_asignar)
+        return asignaciones
+    
+    def procesar_emergencias(self, drenar: bool = False, prioridad_global: bool = False) -> Dict:
+        """Procesar emergencias pendientes en todos los nodos
+        
+        Por defecto atiende como máximo una emergencia por nodo. Con drenar=True vacía la
+        cola de cada nodo hasta agotar sus recursos libres y no imprime nada por emergencia.
+        Los nodos sin recursos libres se omiten sin tocar su cola. Con prioridad_global=True
+        drena toda la red en orden de prioridad global (ver despachar_global).
+        Devuelve un resumen del lote.
+        """
+        if prioridad_global:
+            return self.despachar_global()
+        
+        resumen = {
+            'despachadas': 0,
+            'por_nodo': defaultdict(int),
+            'por_recurso': defaultdict(int),
+            'nodos_sin_recursos': 0
+        }
+        instante = self.reloj()
+        self.liberar_recursos(instante)
+        
+        for nodo in self.nodos.values():
+            if not nodo.activo or not nodo.emergencias_pendientes:
+                continue
+            
+            if nodo.num_recursos_disponibles == 0:
+                resumen['nodos_sin_recursos'] += 1
+                continue
+            
+            if drenar:
+                self._drenar_nodo(nodo, resumen, instante)
+                continue
+            
+            emergencia = nodo.obtener_emergencia_prioritaria()
+            if emergencia and not emergencia.atendida:
+                # Asignar recurso
+                recurso = nodo.tomar_recurso(emergencia.tipo)
+                self._registrar_atencion(nodo, emergencia, instante, recurso)
+                resumen['despachadas'] += 1
+                resumen['por_nodo'][nodo.id] += 1
+                resumen['por_recurso'][recurso.tipo] += 1
+                
+                self._emitir(NivelEvento.DEBUG, 'emergencia_atendida',
+                             id=emergencia.id, recurso=recurso.tipo, nodo=nodo.id)
+                
+                # Simular transmisión de datos
+                self._simular_transmision_datos(nodo, emergencia)
+        
+        self._vaciar_propagacion()
+        resumen['por_nodo'] = dict(resumen['por_nodo'])
+        resumen['por_recurso'] = dict(resumen['por_recurso'])
+        return resumen
+    
+    @staticmethod
+    def _clave_torneo(nodo: Nodo) -> Tuple:
+        if nodo.activo and nodo.num_recursos_disponibles and nodo.emergencias_pendientes:
+            cabeza = nodo.emergencias_pendientes[0]
+            return (cabeza.prioridad.value, cabeza.timestamp)
+        return ArbolTorneo.VACIO
+    
+    def _actualizar_torneo(self, nodo: Nodo):
+        """Recalcular la hoja del nodo en el torneo global (se llama en cada cambio del nodo)"""
+        if self._torneo_pendiente is not None:
+            # Modo concurrente: el torneo es compartido; se recalcula al desactivar el modo
+            self._torneo_pendiente.add(nodo.id)
+        else:
+            self.torneo.actualizar(self.hoja_torneo[nodo.id], self._clave_torneo(nodo))
+        if self._nodos_modificados is not None:
+            self._nodos_modificados[nodo.id] = None
+    
+    def emergencia_mas_urgente(self) -> Optional[Tuple[str, Emergencia]]:
+        """Emergencia más prioritaria de toda la red con un recurso local libre, en O(1)"""
+        clave, hoja = self.torneo.minimo()
+        if clave == ArbolTorneo.VACIO:
+            return None
+        nodo = self.nodos[self.ids_torneo[hoja]]
+        return nodo.id, nodo.emergencias_pendientes[0]
+    
+    def despachar_global(self, max_despachos: Optional[int] = None) -> Dict:
+        """Atender emergencias en orden de prioridad global (y antigüedad) entre todos los nodos
+        
+        Cada despacho cuesta O(log nodos): se toma el ganador del torneo, se atiende con un
+        recurso de su nodo y la hoja de ese nodo se actualiza al cambiar su cola o sus recursos.
+        """
+        resumen = {
+            'despachadas': 0,
+            'por_nodo': defaultdict(int),
+            'por_recurso': defaultdict(int)
+        }
+        instante = self.reloj()
+        self.liberar_recursos(instante)
+        
+        while max_despachos is None or resumen['despachadas'] < max_despachos:
+            clave, hoja = self.torneo.minimo()
+            if clave == ArbolTorneo.VACIO:
+                break
+            
+            nodo = self.nodos[self.ids_torneo[hoja]]
+            emergencia = nodo.obtener_emergencia_prioritaria()
+            if emergencia.atendida:
+                continue
+            
+            recurso = nodo.tomar_recurso(emergencia.tipo)
+            self._registrar_atencion(nodo, emergencia, instante, recurso)
+            self._simular_transmision_datos(nodo, emergencia)
+            resumen['despachadas'] += 1
+            resumen['por_nodo'][nodo.id] += 1
+            resumen['por_recurso'][recurso.tipo] += 1
+        
+        self._vaciar_propagacion()
+        resumen['por_nodo'] = dict(resumen['por_nodo'])
+        resumen['por_recurso'] = dict(resumen['por_recurso'])
+        return resumen
+    
+    def _drenar_nodo(self, nodo: Nodo, resumen: Dict, instante: float) -> List[Emergencia]:
+        """Atender emergencias del nodo mientras queden recursos libres; devuelve las atendidas"""
+        atendidas = []
+        cola = nodo.emergencias_pendientes
+        while cola and nodo.num_recursos_disponibles:
+            emergencia = heapq.heappop(cola)
+            if emergencia.atendida:
+                continue
+            
+            recurso = nodo.tomar_recurso(emergencia.tipo)
+            self._registrar_atencion(nodo, emergencia, instante, recurso)
+            self._simular_transmision_datos(nodo, emergencia)
+            resumen['despachadas'] += 1
+            resumen['por_nodo'][nodo.id] += 1
+            resumen['por_recurso'][recurso.tipo] += 1
+            atendidas.append(emergencia)
+        self._actualizar_torneo(nodo)
+        return atendidas
+    
+    def liberar_recursos(self, instante: Optional[float] = None) -> int:
+        """Devolver a su nodo los recursos cuyo servicio terminó antes del instante dado"""
+        if instante is None:
+            instante = self.reloj()
+        liberados = 0
+        while self.liberaciones and self.liberaciones[0][0] <= instante:
+            self._liberar_siguiente()
+            liberados += 1
+        return liberados
+    
+    def _liberar_siguiente(self) -> Tuple[float, str]:
+        """Liberar el próximo recurso programado; devuelve (instante, id_nodo)"""
+        fin, _, id_nodo, recurso = heapq.heappop(self.liberaciones)
+        self.nodos[id_nodo].liberar_recurso(recurso)
+        return fin, id_nodo
+    
+    def proxima_liberacion(self) -> Optional[float]:
+        return self.liberaciones[0][0] if self.liberaciones else None
+    
+    def _programar_liberacion(self, nodo: Nodo, recurso: Recurso, emergencia: Emergencia, instante: float):
+        self._secuencia_liberacion += 1
+        fin = instante + self.modelo_servicio.duracion(emergencia.tipo, self.rng)
+        heapq.heappush(self.liberaciones, (fin, self._secuencia_liberacion, nodo.id, recurso))
+    
+    def _registrar_atencion(self, nodo: Nodo, emergencia: Emergencia, instante: float,
+                            recurso: Optional[Recurso] = None):
+        """Marcar la emergencia como atendida, programar la liberación del recurso y actualizar los agregados"""
+        if recurso is not None:
+            self._programar_liberacion(nodo, recurso, emergencia, instante)
+        self.tabla_emergencias.marcar_atendida(emergencia)
+        emergencia.tiempo_respuesta = instante - emergencia.timestamp
+        if self._emergencias_modificadas is not None:
+            self._emergencias_modificadas[emergencia.id] = emergencia
+        nodo.emergencias_atendidas += 1
+        self.estadisticas['emergencias_atendidas'] += 1
+        
+        self.sketch_respuesta.agregar(emergencia.tiempo_respuesta)
+        self.sketch_por_tipo[emergencia.tipo].agregar(emergencia.tiempo_respuesta)
+        self.sketch_por_nodo[nodo.id].agregar(emergencia.tiempo_respuesta)
+        self.estadisticas['tiempo_respuesta_promedio'] = self.sketch_respuesta.promedio()
+    
+    def _simular_transmision_datos(self, nodo: Nodo, emergencia: Emergencia):
+        """Simular transmisión de datos sobre la emergencia"""
+        # Simular envío a nodos conectados
+        datos_enviados = len(emergencia.descripcion) + 100  # Bytes base
+        if self.propagacion is not None:
+            self.propagacion.encolar(nodo.id, datos_enviados)
+            return
+        
+        if self.usar_grafo_compacto:
+            compacto = self.obtener_grafo_compacto()
+            receptores = len(compacto.vecinos_activos(compacto.indices[nodo.id]))
+        else:
+            receptores = sum(1 for vecino in nodo.conexiones if self.nodos[vecino].activo)
+        
+        nodo.datos_transmitidos += datos_enviados * receptores
+        self.estadisticas['datos_transmitidos_total'] += datos_enviados * receptores
+    
+    def configurar_propagacion(self, destinos=None, ancho_banda: Optional[float] = None,
+                               tamaño_lote: int = 1024) -> PropagacionDatos:
+        """Enviar los datos de cada emergencia atendida hasta los destinos por rutas multi-salto
         
-        if len(ruta) == 1 and ruta[0] != origen:
-            return [], float('inf')
+        destinos es una lista de ids, un predicado sobre Nodo o None para los servidores. Los
+        bytes se acreditan a cada nodo que transmite por un enlace, incluidos los reenvíos.
+        """
+        self.propagacion = PropagacionDatos(self, destinos, ancho_banda, tamaño_lote)
+        # Un árbol de rutas por destino: que la caché los retenga todos entre lotes
+        self.capacidad_cache_rutas = max(self.capacidad_cache_rutas, len(self.propagacion.ids_destino()))
+        return self.propagacion
+    
+    def _vaciar_propagacion(self):
+        if self.propagacion is not None:
+            self.propagacion.vaciar()
+    
+    # Estaciones activas más cercanas al nodo caído entre las que se reparten sus emergencias
+    CANDIDATOS_REDISTRIBUCION = 8
+    # Penalización (en unidades de distancia) por cada emergencia ya encolada en la estación
+    PESO_CARGA_REDISTRIBUCION = 0.5
+    
+    @_exclusivo_en_concurrencia
+    def simular_falla_nodo(self, id_nodo: str) -> Dict[str, int]:
+        """Simular falla de un nodo y redistribuir sus emergencias; devuelve {id_destino: cantidad}"""
+        if id_nodo not in self.nodos:
+            return {}
+        nodo = self.nodos[id_nodo]
+        if nodo.activo:
+            self._actualizar_cache_falla(id_nodo)
+            self._actualizar_conectividad_falla(id_nodo)
+            if self.tabla_rutas is not None:
+                self.tabla_rutas.aplicar_falla(self.tabla_rutas.indices[id_nodo])
+        with self._cerrojo_cola(id_nodo):
+            nodo.activo = False
+            if self._grafo_compacto is not None:
+                self._grafo_compacto.activos[self._grafo_compacto.indices[id_nodo]] = 0
+            
+            # La cola se toma entera (ya está en orden de heap); las atendidas eran entradas obsoletas
+            pendientes = [emergencia for emergencia in nodo.emergencias_pendientes if not emergencia.atendida]
+            nodo.emergencias_pendientes = []
+            self._actualizar_torneo(nodo)
         
-        return ruta, distancias[destino]
+        destinos = self._redistribuir(pendientes, nodo.ubicacion, id_nodo)
+        self._emitir(NivelEvento.ADVERTENCIA, 'nodo_inactivo', id=id_nodo)
+        return destinos
     
-    def registrar_emergencia(self, emergencia: Emergencia):
-        """Registrar una nueva emergencia en el sistema"""
-        self.tabla_emergencias.insertar(emergencia)
-        self.estadisticas['emergencias_totales'] += 1
+    def _redistribuir(self, emergencias: List[Emergencia], centro: Tuple[float, float],
+                      origen: str) -> Dict[str, int]:
+        """Repartir emergencias huérfanas entre las estaciones activas cercanas a centro
         
-        # Encontrar el nodo más cercano
-        nodos_cercanos = self.arbol_geografico.buscar_nodos_cercanos(
-            emergencia.ubicacion, 5.0  # Radio de búsqueda
+        Las candidatas se buscan una sola vez en el árbol geográfico; cada emergencia, de la
+        más urgente a la menos, va a la candidata que minimiza distancia + PESO_CARGA × cola,
+        contando lo ya asignado. Cada destino recibe su lote de una vez (agregar_emergencias).
+        Si no hay estaciones activas las emergencias esperan en self.en_espera.
+        """
+        if not emergencias:
+            return {}
+        candidatas = self.arbol_geografico.k_mas_cercanos(
+            centro, self.CANDIDATOS_REDISTRIBUCION, filtro=lambda n: n.activo
         )
+        if not candidatas:
+            for emergencia in emergencias:
+                heapq.heappush(self.en_espera, emergencia)
+            self._emitir(NivelEvento.ERROR, 'emergencias_en_espera', cantidad=len(emergencias), origen=origen)
+            return {}
         
-        if nodos_cercanos:
-            # Seleccionar el nodo más cercano activo
-            nodo_mas_cercano = min(
-                [n for n in nodos_cercanos if n.activo],
-                key=lambda n: math.sqrt(
-                    (n.ubicacion[0] - emergencia.ubicacion[0]) ** 2 +
-                    (n.ubicacion[1] - emergencia.ubicacion[1]) ** 2
-                ),
-                default=None
+        cargas = [len(candidata.emergencias_pendientes) for candidata in candidatas]
+        lotes = [[] for _ in candidatas]
+        peso = self.PESO_CARGA_REDISTRIBUCION
+        for emergencia in sorted(emergencias):
+            x, y = emergencia.ubicacion
+            mejor = min(
+                range(len(candidatas)),
+                key=lambda i: math.hypot(candidatas[i].ubicacion[0] - x, candidatas[i].ubicacion[1] - y)
+                + peso * cargas[i]
             )
-            
-            if nodo_mas_cercano:
-                nodo_mas_cercano.agregar_emergencia(emergencia)
-                print(f"Emergencia {emergencia.id} asignada a nodo {nodo_mas_cercano.id}")
-                return nodo_mas_cercano.id
+            lotes[mejor].append(emergencia)
+            cargas[mejor] += 1
         
-        # Si no hay nodos cercanos, asignar al primer nodo activo
-        for nodo in self.nodos.values():
-            if nodo.activo:
-                nodo.agregar_emergencia(emergencia)
-                print(f"Emergencia {emergencia.id} asignada por defecto a nodo {nodo.id}")
-                return nodo.id
+        destinos = {}
+        for candidata, lote in zip(candidatas, lotes):
+            if not lote:
+                continue
+            with self._cerrojo_cola(candidata.id):
+                candidata.agregar_emergencias(lote)
+            destinos[candidata.id] = len(lote)
+            for emergencia in lote:
+                self._emitir(NivelEvento.DEBUG, 'emergencia_redistribuida',
+                             id=emergencia.id, origen=origen, destino=candidata.id)
+        return destinos
+    
+    @_exclusivo_en_concurrencia
+    def restaurar_nodo(self, id_nodo: str) -> Dict[str, int]:
+        """Restaurar un nodo previamente fallido; reparte las emergencias en espera si las hay"""
+        if id_nodo not in self.nodos:
+            return {}
+        nodo = self.nodos[id_nodo]
+        if not nodo.activo:
+            nodo.activo = True
+            self._actualizar_torneo(nodo)
+            if self._grafo_compacto is not None:
+                self._grafo_compacto.activos[self._grafo_compacto.indices[id_nodo]] = 1
+            self._actualizar_cache_restauracion(id_nodo)
+            self._actualizar_conectividad_restauracion(id_nodo)
+            if self.tabla_rutas is not None:
+                self.tabla_rutas.aplicar_restauracion(self.tabla_rutas.indices[id_nodo])
+        self._emitir(NivelEvento.INFO, 'nodo_restaurado', id=id_nodo)
         
-        print("Error: No hay nodos activos para atender la emergencia")
-        return None
+        en_espera, self.en_espera = self.en_espera, []
+        return self._redistribuir(en_espera, nodo.ubicacion, 'en_espera')
     
-    def procesar_emergencias(self):
-        """Procesar emergencias pendientes en todos los nodos"""
-        for nodo in self.nodos.values():
-            if not nodo.activo:
+    def analizar_puntos_criticos(self) -> Dict:
+        """Puntos de articulación y puentes de la red activa en O(n + m) (Tarjan iterativo sobre CSR)
+        
+        Devuelve {'puntos_articulacion': {id: tamaños de las piezas en que se parte su
+        componente si falla}, 'puentes': [(id1, id2), ...]}. El resultado se guarda hasta el
+        próximo cambio de topología o de estado de un nodo.
+        """
+        if self._analisis_fallas is not None:
+            return self._analisis_fallas[0]
+        
+        compacto = self.obtener_grafo_compacto()
+        offsets, destinos, activos = compacto.offsets, compacto.destinos, compacto.activos
+        n = len(compacto)
+        descubrimiento = [-1] * n
+        bajo = [0] * n
+        padre = [-1] * n
+        tamaño_subarbol = [1] * n
+        orden = []  # Índices en orden de descubrimiento: cada subárbol es un tramo contiguo
+        componente = [0] * n  # Inicio del tramo de la componente de cada nodo en orden
+        piezas = defaultdict(list)  # {v: [(inicio, tamaño) de cada subárbol que se separa]}
+        puentes = []
+        
+        for raiz in range(n):
+            if not activos[raiz] or descubrimiento[raiz] != -1:
                 continue
-            
-            emergencia = nodo.obtener_emergencia_prioritaria()
-            if emergencia and not emergencia.atendida:
-                # Simular procesamiento
-                recursos_disponibles = nodo.recursos_disponibles()
-                
-                if recursos_disponibles:
-                    # Asignar recurso
-                    recurso = recursos_disponibles[0]
-                    recurso.disponible = False
-                    
-                    emergencia.atendida = True
-                    emergencia.tiempo_respuesta = time.time() - emergencia.timestamp
-                    nodo.emergencias_atendidas += 1
-                    self.estadisticas['emergencias_atendidas'] += 1
-                    
-                    print(f"Emergencia {emergencia.id} atendida por {recurso.tipo} desde nodo {nodo.id}")
-                    
-                    # Simular transmisión de datos
-                    self._simular_transmision_datos(nodo, emergencia)
+            inicio = len(orden)
+            descubrimiento[raiz] = bajo[raiz] = inicio
+            orden.append(raiz)
+            pila = [(raiz, offsets[raiz])]
+            while pila:
+                v, posicion = pila[-1]
+                fin = offsets[v + 1]
+                while posicion < fin:
+                    w = destinos[posicion]
+                    posicion += 1
+                    if not activos[w]:
+                        continue
+                    if descubrimiento[w] == -1:
+                        break
+                    if w != padre[v] and descubrimiento[w] < bajo[v]:
+                        bajo[v] = descubrimiento[w]
                 else:
-                    # Re-agregar a la cola si no hay recursos
-                    nodo.agregar_emergencia(emergencia)
+                    # Todos los vecinos de v explorados: propagar al padre
+                    pila.pop()
+                    componente[v] = inicio
+                    u = padre[v]
+                    if u >= 0:
+                        if bajo[v] < bajo[u]:
+                            bajo[u] = bajo[v]
+                        tamaño_subarbol[u] += tamaño_subarbol[v]
+                        if bajo[v] > descubrimiento[u]:
+                            puentes.append((compacto.ids[u], compacto.ids[v]))
+                        if bajo[v] >= descubrimiento[u]:
+                            piezas[u].append((descubrimiento[v], tamaño_subarbol[v]))
+                    continue
+                
+                pila[-1] = (v, posicion)
+                padre[w] = v
+                descubrimiento[w] = bajo[w] = len(orden)
+                orden.append(w)
+                pila.append((w, offsets[w]))
+            
+            # La raíz solo es de articulación si tiene al menos dos hijos en el árbol DFS
+            if len(piezas.get(raiz, ())) < 2:
+                piezas.pop(raiz, None)
+        
+        puntos = {}
+        for v, separadas in piezas.items():
+            tamaño_componente = tamaño_subarbol[orden[componente[v]]]
+            resto = tamaño_componente - 1 - sum(tamaño for _, tamaño in separadas)
+            tamaños = [tamaño for _, tamaño in separadas] + ([resto] if resto else [])
+            puntos[compacto.ids[v]] = sorted(tamaños, reverse=True)
+        
+        resultado = {'puntos_articulacion': puntos, 'puentes': puentes}
+        self._analisis_fallas = (resultado, compacto, orden, componente, tamaño_subarbol, piezas)
+        return resultado
     
-    def _simular_transmision_datos(self, nodo: Nodo, emergencia: Emergencia):
-        """Simular transmisión de datos sobre la emergencia"""
-        # Simular envío a nodos conectados
-        datos_enviados = len(emergencia.descripcion) + 100  # Bytes base
+    def impacto_falla(self, id_nodo: str) -> Dict:
+        """Qué se rompe si falla id_nodo: estaciones que quedarían separadas de la pieza mayor"""
+        puntos = self.analizar_puntos_criticos()['puntos_articulacion']
+        if id_nodo not in puntos:
+            return {'articulacion': False, 'piezas': [], 'desconectados': []}
         
-        for nodo_conectado in nodo.conexiones:
-            if self.nodos[nodo_conectado].activo:
-                nodo.datos_transmitidos += datos_enviados
-                self.estadisticas['datos_transmitidos_total'] += datos_enviados
+        _, compacto, orden, componente, tamaño_subarbol, piezas = self._analisis_fallas
+        v = compacto.indices[id_nodo]
+        inicio = componente[v]
+        tramo_componente = orden[inicio:inicio + tamaño_subarbol[orden[inicio]]]
+        grupos = [orden[d:d + tamaño] for d, tamaño in piezas[v]]
+        separados = {w for grupo in grupos for w in grupo}
+        separados.add(v)
+        resto = [w for w in tramo_componente if w not in separados]
+        if resto:
+            grupos.append(resto)
+        grupos.sort(key=len, reverse=True)
+        return {
+            'articulacion': True,
+            'piezas': [len(grupo) for grupo in grupos],
+            'desconectados': [compacto.ids[w] for grupo in grupos[1:] for w in grupo]
+        }
     
-    def simular_falla_nodo(self, id_nodo: str):
-        """Simular falla de un nodo y redistribuir emergencias"""
-        if id_nodo in self.nodos:
-            nodo = self.nodos[id_nodo]
-            nodo.activo = False
-            
-            # Redistribuir emergencias pendientes
-            emergencias_pendientes = []
-            while nodo.emergencias_pendientes:
-                emergencias_pendientes.append(heapq.heappop(nodo.emergencias_pendientes))
-            
-            # Redistribuir a nodos vecinos activos
-            for emergencia in emergencias_pendientes:
-                nodos_vecinos = [
-                    self.nodos[vecino] for vecino in nodo.conexiones 
-                    if self.nodos[vecino].activo
-                ]
-                
-                if nodos_vecinos:
-                    nodo_destino = random.choice(nodos_vecinos)
-                    nodo_destino.agregar_emergencia(emergencia)
-                    print(f"Emergencia {emergencia.id} redistribuida de {id_nodo} a {nodo_destino.id}")
-            
-            print(f"Nodo {id_nodo} marcado como inactivo")
+    def _obtener_conectividad(self) -> ConectividadIncremental:
+        if self._conectividad is None and np is not None:
+            # Carga masiva vectorizada: componentes de las aristas entre nodos activos
+            compacto = self.obtener_grafo_compacto()
+            offsets = np.frombuffer(compacto.offsets, dtype=np.int64)
+            destinos = np.frombuffer(compacto.destinos, dtype=np.int32)
+            activos = np.frombuffer(compacto.activos, dtype=np.uint8).astype(bool)
+            origenes = np.repeat(np.arange(len(compacto)), np.diff(offsets))
+            validas = activos[origenes] & activos[destinos]
+            etiquetas = etiquetar_componentes(len(compacto), origenes[validas], destinos[validas])
+            self._conectividad = ConectividadIncremental.desde_etiquetas(compacto.ids, etiquetas.tolist())
+        elif self._conectividad is None:
+            conectividad = ConectividadIncremental()
+            for id_nodo, nodo in self.nodos.items():
+                if nodo.activo:
+                    conectividad.agregar(id_nodo)
+                    for vecino in nodo.conexiones:
+                        if self.nodos[vecino].activo:
+                            conectividad.unir(id_nodo, vecino)
+            self._conectividad = conectividad
+        return self._conectividad
+    
+    def estan_conectados(self, origen: str, destino: str) -> bool:
+        """Si existe algún camino entre dos estaciones activas, en O(α(n)) amortizado"""
+        if origen not in self.nodos or destino not in self.nodos:
+            return False
+        if not (self.nodos[origen].activo and self.nodos[destino].activo):
+            return False
+        return self._obtener_conectividad().conectados(origen, destino)
+    
+    def _actualizar_conectividad_falla(self, id_nodo: str):
+        # Sin el análisis al día no se sabe si la falla parte una componente: reconstruir al consultar
+        if self._conectividad is not None and (
+                self._analisis_fallas is None or
+                id_nodo in self._analisis_fallas[0]['puntos_articulacion']):
+            self._conectividad = None
+        self._analisis_fallas = None
     
-    def restaurar_nodo(self, id_nodo: str):
-        """Restaurar un nodo previamente fallido"""
-        if id_nodo in self.nodos:
-            self.nodos[id_nodo].activo = True
-            print(f"Nodo {id_nodo} restaurado")
+    def _actualizar_conectividad_restauracion(self, id_nodo: str):
+        if self._conectividad is not None:
+            self._conectividad.agregar(id_nodo)
+            for vecino in self.nodos[id_nodo].conexiones:
+                if self.nodos[vecino].activo:
+                    self._conectividad.unir(id_nodo, vecino)
+        self._analisis_fallas = None
     
     def obtener_estadisticas(self) -> Dict:
-        """Obtener estadísticas de rendimiento de la red"""
-        # Calcular tiempo de respuesta promedio
-        emergencias_atendidas = [
-            em for em in self.tabla_emergencias.obtener_todas() 
-            if em.atendida and em.tiempo_respuesta
-        ]
-        
-        if emergencias_atendidas:
-            tiempo_promedio = sum(em.tiempo_respuesta for em in emergencias_atendidas) / len(emergencias_atendidas)
-            self.estadisticas['tiempo_respuesta_promedio'] = tiempo_promedio
-        
+        """Obtener estadísticas de rendimiento de la red (O(nodos), sin recorrer el historial)"""
+        self._vaciar_propagacion()
         # Estadísticas por nodo
         stats_nodos = {}
         for id_nodo, nodo in self.nodos.items():
@@ -371,13 +2929,376 @@ class SimuladorRedLAN:
                 'datos_transmitidos': nodo.datos_transmitidos,
                 'emergencias_pendientes': len(nodo.emergencias_pendientes),
                 'activo': nodo.activo,
-                'recursos_disponibles': len(nodo.recursos_disponibles())
+                'recursos_disponibles': nodo.num_recursos_disponibles
             }
+            if id_nodo in self.sketch_por_nodo:
+                stats_nodos[id_nodo]['tiempo_respuesta'] = self.sketch_por_nodo[id_nodo].resumen()
+            if self.propagacion is not None and id_nodo in self.propagacion.por_nodo:
+                stats_nodos[id_nodo]['propagacion'] = dict(self.propagacion.por_nodo[id_nodo])
         
-        return {
+        estadisticas = {
             'general': self.estadisticas,
+            'tiempo_respuesta': {
+                'general': self.sketch_respuesta.resumen(),
+                'por_tipo': {
+                    tipo.value: sketch.resumen() for tipo, sketch in self.sketch_por_tipo.items()
+                }
+            },
             'nodos': stats_nodos
         }
+        if self.propagacion is not None:
+            estadisticas['propagacion'] = self.propagacion.resumen()
+        return estadisticas
+    
+    # Formato de snapshot binario: cabecera + secciones alineadas a 8 bytes en orden nativo
+    MAGIA_SNAPSHOT = b'SRLANSN1'
+    CABECERA_SNAPSHOT = struct.Struct('<8s16Q')
+    ATRIBUTOS_EXTRA = ('ip', 'tipo_dispositivo', 'modelo')
+    
+    def exportar_snapshot(self, ruta: str):
+        """Guardar la topología en un snapshot binario compacto (nodos, CSR, recursos e índice espacial)
+        
+        Los arreglos se escriben en el orden de bytes de la máquina, por lo que el snapshot
+        está pensado para cargarse en la misma arquitectura que lo generó.
+        """
+        compacto = GrafoCompacto.desde_grafo(self.nodos, self.grafo)
+        ids = compacto.ids
+        
+        coordenadas = array('d')
+        cadenas = []
+        extras = {}
+        recursos_nodo = array('i')
+        for i, nodo in enumerate(self.nodos.values()):
+            coordenadas.extend(nodo.ubicacion)
+            cadenas.append(nodo.id)
+            cadenas.append(nodo.nombre)
+            atributos = {a: getattr(nodo, a) for a in self.ATRIBUTOS_EXTRA if hasattr(nodo, a)}
+            if atributos:
+                extras[i] = atributos
+        for i, nodo in enumerate(self.nodos.values()):
+            for recurso in nodo.recursos:
+                recursos_nodo.append(i)
+                cadenas.append(recurso.id)
+                cadenas.append(recurso.tipo)
+        
+        orden, tamaños_izquierda, ejes = self.arbol_geografico.a_preorden(compacto.indices)
+        
+        secciones = [
+            coordenadas.tobytes(),
+            bytes(compacto.activos),
+            compacto.offsets.tobytes(),
+            compacto.destinos.tobytes(),
+            compacto.pesos.tobytes(),
+            recursos_nodo.tobytes(),
+            orden.tobytes(),
+            tamaños_izquierda.tobytes(),
+            bytes(ejes),
+            '\0'.join(cadenas).encode('utf-8'),
+            json.dumps(extras, ensure_ascii=False).encode('utf-8'),
+        ]
+        
+        posiciones = []
+        posicion = self.CABECERA_SNAPSHOT.size
+        for seccion in secciones:
+            posicion += -posicion % 8
+            posiciones.append(posicion)
+            posicion += len(seccion)
+        
+        cabecera = self.CABECERA_SNAPSHOT.pack(
+            self.MAGIA_SNAPSHOT, len(ids), len(compacto.destinos), len(recursos_nodo),
+            len(secciones[9]), len(secciones[10]), *posiciones
+        )
+        with open(ruta, 'wb') as f:
+            f.write(cabecera)
+            for posicion, seccion in zip(posiciones, secciones):
+                f.write(b'\0' * (posicion - f.tell()))
+                f.write(seccion)
+        
+        self._emitir(NivelEvento.INFO, 'snapshot_exportado', archivo=ruta, nodos=len(ids),
+                     aristas=len(compacto.destinos) // 2)
+    
+    def cargar_snapshot(self, ruta: str) -> bool:
+        """Cargar un snapshot binario con mmap en un simulador vacío
+        
+        Los arreglos CSR quedan respaldados por las páginas del archivo (de solo lectura y
+        compartidas entre procesos que carguen el mismo snapshot) y el índice espacial se
+        reconstruye en O(n) sin ordenar ni insertar nodo a nodo.
+        """
+        if self.nodos:
+            self._emitir(NivelEvento.ERROR, 'snapshot_en_simulador_no_vacio', archivo=ruta)
+            return False
+        
+        with open(ruta, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.CABECERA_SNAPSHOT.size:
+                self._emitir(NivelEvento.ERROR, 'snapshot_invalido', archivo=ruta)
+                return False
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(mapa)
+        (magia, n, m, r, len_cadenas, len_extras, p_coords, p_activos, p_offsets, p_destinos,
+         p_pesos, p_recursos, p_orden, p_izquierda, p_ejes, p_cadenas, p_extras) = \
+            self.CABECERA_SNAPSHOT.unpack_from(mapa, 0)
+        # Cada sección declarada en la cabecera debe caber en el archivo (truncado o corrupto si no)
+        secciones = (
+            (p_coords, 16 * n), (p_activos, n), (p_offsets, 8 * (n + 1)), (p_destinos, 4 * m),
+            (p_pesos, 8 * m), (p_recursos, 4 * r), (p_orden, 4 * n), (p_izquierda, 4 * n),
+            (p_ejes, n), (p_cadenas, len_cadenas), (p_extras, len_extras)
+        )
+        if magia != self.MAGIA_SNAPSHOT or any(
+            posicion < self.CABECERA_SNAPSHOT.size or posicion + longitud > len(mapa)
+            for posicion, longitud in secciones
+        ):
+            vista.release()
+            mapa.close()
+            self._emitir(NivelEvento.ERROR, 'snapshot_invalido', archivo=ruta)
+            return False
+        
+        coordenadas = vista[p_coords:p_coords + 16 * n].cast('d')
+        activos = vista[p_activos:p_activos + n]
+        offsets = vista[p_offsets:p_offsets + 8 * (n + 1)].cast('q')
+        destinos = vista[p_destinos:p_destinos + 4 * m].cast('i')
+        pesos = vista[p_pesos:p_pesos + 8 * m].cast('d')
+        recursos_nodo = vista[p_recursos:p_recursos + 4 * r].cast('i')
+        cadenas = bytes(vista[p_cadenas:p_cadenas + len_cadenas]).decode('utf-8').split('\0')
+        extras = json.loads(bytes(vista[p_extras:p_extras + len_extras]))
+        
+        # Se crean cientos de miles de objetos contenedor: pausar el GC evita recorridos inútiles
+        with gc_pausado():
+            nodos = self._crear_desde_snapshot(
+                n, r, cadenas, extras, coordenadas, activos, offsets, destinos, pesos, recursos_nodo
+            )
+            self.arbol_geografico.desde_preorden(
+                nodos,
+                vista[p_orden:p_orden + 4 * n].cast('i'),
+                vista[p_izquierda:p_izquierda + 4 * n].cast('i'),
+                vista[p_ejes:p_ejes + n]
+            )
+        
+        # El backend CSR usa directamente las páginas mapeadas; solo la máscara de activos se copia
+        self._grafo_compacto = GrafoCompacto(cadenas[0:2 * n:2], offsets, destinos, pesos, bytearray(activos))
+        self._cerrar_snapshot()
+        self._snapshot_mmap = mapa
+        self._factor_heuristica = None
+        self._analisis_fallas = None
+        self._conectividad = None
+        
+        self._emitir(NivelEvento.INFO, 'snapshot_cargado', archivo=ruta, nodos=n, aristas=m // 2)
+        return True
+    
+    def _cerrar_snapshot(self):
+        """Cerrar el mapeo del snapshot anterior; si algo aún lee de él se deja al recolector"""
+        if self._snapshot_mmap is None:
+            return
+        try:
+            self._snapshot_mmap.close()
+        except BufferError:
+            pass
+        self._snapshot_mmap = None
+    
+    def _crear_desde_snapshot(self, n, r, cadenas, extras, coordenadas, activos,
+                              offsets, destinos, pesos, recursos_nodo) -> List[Nodo]:
+        """Materializa nodos, adyacencia y recursos a partir de las secciones del snapshot"""
+        ids = cadenas[0:2 * n:2]
+        nombres = cadenas[1:2 * n:2]
+        nodos = []
+        for i in range(n):
+            nodo = Nodo(ids[i], nombres[i], (coordenadas[2 * i], coordenadas[2 * i + 1]))
+            nodo.activo = bool(activos[i])
+            nodos.append(nodo)
+            self.nodos[nodo.id] = nodo
+            self.grafo[nodo.id] = nodo.conexiones
+            self.hoja_torneo[nodo.id] = len(self.ids_torneo)
+            self.ids_torneo.append(nodo.id)
+        for i, atributos in extras.items():
+            for atributo, valor in atributos.items():
+                setattr(nodos[int(i)], atributo, valor)
+        
+        # Adyacencia en dicts (fuente de verdad para ediciones) a partir de los tramos CSR
+        for i, nodo in enumerate(nodos):
+            inicio, fin = offsets[i], offsets[i + 1]
+            nodo.conexiones.update(zip([ids[j] for j in destinos[inicio:fin]], pesos[inicio:fin]))
+        
+        for k in range(r):
+            nodo = nodos[recursos_nodo[k]]
+            id_recurso, tipo = cadenas[2 * n + 2 * k], cadenas[2 * n + 2 * k + 1]
+            nodo.agregar_recurso(Recurso(id_recurso, tipo, nodo.ubicacion))
+        
+        # Sin emergencias pendientes todas las hojas del torneo siguen vacías: basta con enlazar el aviso
+        for nodo in nodos:
+            nodo.al_cambiar = self._actualizar_torneo
+        return nodos
+    
+    def iniciar_seguimiento_cambios(self):
+        """Empezar (o reiniciar) el registro de nodos y emergencias modificados"""
+        self._nodos_modificados = {}
+        self._emergencias_modificadas = {}
+        self._nodos_en_checkpoint = len(self.nodos)
+    
+    def capturar_estado(self, solo_cambios: bool = False) -> Dict:
+        """Estado completo del simulador como estructuras serializables con pickle
+        
+        Con solo_cambios=True (y el seguimiento activo) solo incluye los nodos y emergencias
+        modificados desde iniciar_seguimiento_cambios; el estado global (contadores, sketches,
+        liberaciones pendientes y generador aleatorio) se incluye siempre, y la forma del
+        índice geográfico solo si cambió el conjunto de nodos. Las colas guardan ids de
+        emergencia y las liberaciones la posición del recurso en su nodo, así se conserva la
+        identidad de los objetos compartidos al restaurar.
+        """
+        with gc_pausado():
+            return self._capturar_estado(solo_cambios and self._nodos_modificados is not None)
+    
+    def _capturar_estado(self, solo_cambios: bool) -> Dict:
+        if solo_cambios:
+            ids_nodos = self._nodos_modificados
+            emergencias = self._emergencias_modificadas.values()
+        else:
+            ids_nodos = self.nodos
+            pendientes = itertools.chain(
+                self.en_espera, (e for nodo in self.nodos.values() for e in nodo.emergencias_pendientes)
+            )
+            emergencias = {e.id: e for e in itertools.chain(pendientes, self.tabla_emergencias)}.values()
+        
+        estado = {
+            'completo': not solo_cambios,
+            'global': self._estado_global(),
+            'nodos': {id_nodo: self._estado_nodo(self.nodos[id_nodo]) for id_nodo in ids_nodos},
+            # Tuplas en el orden de los campos: mucho más rápidas de serializar que los objetos
+            'emergencias': {
+                e.id: (e.id, e.tipo, e.prioridad, e.ubicacion, e.descripcion, e.timestamp,
+                       e.atendida, e.tiempo_respuesta)
+                for e in emergencias
+            }
+        }
+        if not solo_cambios or len(self.nodos) != self._nodos_en_checkpoint:
+            indices = {id_nodo: i for i, id_nodo in enumerate(self.nodos)}
+            estado['indice_geografico'] = self.arbol_geografico.a_preorden(indices)
+        return estado
+    
+    def _estado_nodo(self, nodo: Nodo) -> Dict:
+        posiciones = {id(recurso): i for i, recurso in enumerate(nodo.recursos)}
+        return {
+            'nombre': nodo.nombre,
+            'ubicacion': nodo.ubicacion,
+            'activo': nodo.activo,
+            'pendientes': [emergencia.id for emergencia in nodo.emergencias_pendientes],
+            'recursos': [
+                (recurso.id, recurso.tipo, recurso.ubicacion, recurso.disponible, recurso.capacidad)
+                for recurso in nodo.recursos
+            ],
+            # Se conserva el orden de los recursos libres: decide cuál toma el próximo despacho
+            'libres': [
+                (tipo, [posiciones[id(recurso)] for recurso in libres.values()])
+                for tipo, libres in nodo.recursos_libres.items()
+            ],
+            'datos_transmitidos': nodo.datos_transmitidos,
+            'emergencias_atendidas': nodo.emergencias_atendidas,
+            'conexiones': dict(nodo.conexiones),
+            'extras': {a: getattr(nodo, a) for a in self.ATRIBUTOS_EXTRA if hasattr(nodo, a)},
+            'sketch': self.sketch_por_nodo[nodo.id].exportar() if nodo.id in self.sketch_por_nodo else None
+        }
+    
+    def _estado_global(self) -> Dict:
+        posiciones = {}
+        liberaciones = []
+        for fin, secuencia, id_nodo, recurso in self.liberaciones:
+            if id(recurso) not in posiciones:
+                for i, otro in enumerate(self.nodos[id_nodo].recursos):
+                    posiciones[id(otro)] = i
+            liberaciones.append((fin, secuencia, id_nodo, posiciones[id(recurso)]))
+        
+        return {
+            'instante': self.reloj(),
+            'estadisticas': dict(self.estadisticas),
+            'historial_rutas': list(self.historial_rutas),
+            'rng': self.rng.getstate(),
+            'modelo_servicio': (dict(self.modelo_servicio.duraciones), self.modelo_servicio.variacion,
+                                self.modelo_servicio.escala),
+            'liberaciones': liberaciones,  # Ya en orden de heap
+            'en_espera': [emergencia.id for emergencia in self.en_espera],
+            'secuencia_liberacion': self._secuencia_liberacion,
+            'sketch_respuesta': self.sketch_respuesta.exportar(),
+            'sketch_por_tipo': {tipo: sketch.exportar() for tipo, sketch in self.sketch_por_tipo.items()},
+            'motor_rutas': self.motor_rutas,
+            'estadisticas_motores': {motor: dict(datos) for motor, datos in self.estadisticas_motores.items()},
+            'usar_grafo_compacto': self.usar_grafo_compacto,
+            'capacidad_cache_rutas': self.capacidad_cache_rutas
+        }
+    
+    @classmethod
+    def desde_estado(cls, estado: Dict, sumideros: Optional[List[SumideroEventos]] = None) -> 'SimuladorRedLAN':
+        """Construir un simulador a partir de un estado completo de capturar_estado
+        
+        Las cachés de rutas y el backend CSR se reconstruyen de forma perezosa; el reloj
+        vuelve a ser time.time (el instante del estado queda en estado['global']['instante']).
+        """
+        general = estado['global']
+        sim = cls(capacidad_cache_rutas=general['capacidad_cache_rutas'], motor_rutas=general['motor_rutas'],
+                  usar_grafo_compacto=general['usar_grafo_compacto'], sumideros=sumideros)
+        if general['rng'] is not None:  # Checkpoints anteriores sin generador propio
+            sim.rng.setstate(general['rng'])
+        with gc_pausado():
+            emergencias = {id_emergencia: Emergencia(*datos) for id_emergencia, datos in estado['emergencias'].items()}
+            for id_nodo, registro in estado['nodos'].items():
+                nodo = Nodo(id_nodo, registro['nombre'], registro['ubicacion'])
+                nodo.activo = registro['activo']
+                # Las colas se guardaron en orden de heap: no hace falta reordenarlas
+                nodo.emergencias_pendientes = [emergencias[i] for i in registro['pendientes']]
+                nodo.recursos = [Recurso(*datos) for datos in registro['recursos']]
+                for tipo, indices in registro['libres']:
+                    nodo.recursos_libres[tipo] = {
+                        nodo.recursos[i].id: nodo.recursos[i] for i in indices
+                    }
+                    nodo.num_recursos_disponibles += len(indices)
+                nodo.datos_transmitidos = registro['datos_transmitidos']
+                nodo.emergencias_atendidas = registro['emergencias_atendidas']
+                nodo.conexiones.update(registro['conexiones'])
+                for atributo, valor in registro['extras'].items():
+                    setattr(nodo, atributo, valor)
+                if registro['sketch'] is not None:
+                    sim.sketch_por_nodo[id_nodo] = SketchPercentiles.importar(registro['sketch'])
+                
+                sim.nodos[id_nodo] = nodo
+                sim.grafo[id_nodo] = nodo.conexiones
+                sim.hoja_torneo[id_nodo] = len(sim.ids_torneo)
+                sim.ids_torneo.append(id_nodo)
+                nodo.al_cambiar = sim._actualizar_torneo
+            
+            sim.torneo.cargar([sim._clave_torneo(nodo) for nodo in sim.nodos.values()])
+            sim.tabla_emergencias.insertar_lote(list(emergencias.values()))
+            forma = estado.get('indice_geografico')
+            if forma is not None and len(forma[0]) == len(sim.nodos):
+                sim.arbol_geografico.desde_preorden(list(sim.nodos.values()), *forma)
+            else:
+                sim.reindexar_geografia()
+        
+        sim.liberaciones = [
+            (fin, secuencia, id_nodo, sim.nodos[id_nodo].recursos[i])
+            for fin, secuencia, id_nodo, i in general['liberaciones']
+        ]
+        sim._secuencia_liberacion = general['secuencia_liberacion']
+        sim.en_espera = [emergencias[i] for i in general['en_espera']]
+        duraciones, variacion, escala = general['modelo_servicio']
+        sim.modelo_servicio = ModeloServicio(duraciones, variacion, escala)
+        sim.estadisticas = dict(general['estadisticas'])
+        sim.historial_rutas = list(general['historial_rutas'])
+        sim.sketch_respuesta = SketchPercentiles.importar(general['sketch_respuesta'])
+        for tipo, datos in general['sketch_por_tipo'].items():
+            sim.sketch_por_tipo[tipo] = SketchPercentiles.importar(datos)
+        for motor, datos in general['estadisticas_motores'].items():
+            sim.estadisticas_motores[motor] = dict(datos)
+        return sim
+    
+    def bifurcar(self, semilla: Optional[int] = None,
+                 sumideros: Optional[List[SumideroEventos]] = None) -> 'SimuladorRedLAN':
+        """Copia independiente del estado actual para explorar escenarios alternativos
+        
+        Con semilla la copia usa su propio generador aleatorio, así cada escenario diverge;
+        sin ella continúa exactamente la secuencia aleatoria del original.
+        """
+        # El estado capturado solo contiene copias y valores inmutables: no comparte nada con el original
+        sim = self.desde_estado(self.capturar_estado(), sumideros)
+        if semilla is not None:
+            sim.rng = random.Random(semilla)
+        return sim
     
     def cargar_topologia_desde_archivo(self, archivo: str):
         """Cargar topología de red desde archivo JSON"""
@@ -390,7 +3311,8 @@ class SimuladorRedLAN:
                 self.agregar_nodo(
                     nodo_data['id'],
                     nodo_data['nombre'],
-                    tuple(nodo_data['ubicacion'])
+                    tuple(nodo_data['ubicacion']),
+                    indexar=False
                 )
                 
                 # Agregar IP si está disponible
@@ -406,6 +3328,8 @@ class SimuladorRedLAN:
                     )
                     self.nodos[nodo_data['id']].agregar_recurso(recurso)
             
+            self.reindexar_geografia()
+            
             # Cargar conexiones
             for conexion in data.get('conexiones', []):
                 self.agregar_conexion(
@@ -414,16 +3338,16 @@ class SimuladorRedLAN:
                     conexion['peso']
                 )
             
-            print(f"Topología cargada desde {archivo}")
+            self._emitir(NivelEvento.INFO, 'topologia_cargada', archivo=archivo)
             
         except FileNotFoundError:
-            print(f"Archivo {archivo} no encontrado")
+            self._emitir(NivelEvento.ERROR, 'archivo_no_encontrado', archivo=archivo)
         except json.JSONDecodeError:
-            print(f"Error al decodificar JSON en {archivo}")
+            self._emitir(NivelEvento.ERROR, 'json_invalido', archivo=archivo)
     
     def cargar_topologia_packet_tracer(self, dispositivos: dict, conexiones: list):
         """Cargar topología directamente desde configuración de Packet Tracer"""
-        print("Cargando topología desde Packet Tracer...")
+        self._emitir(NivelEvento.INFO, 'cargando_packet_tracer')
         
         # Cargar dispositivos
         for dispositivo in dispositivos:
@@ -436,7 +3360,8 @@ class SimuladorRedLAN:
             self.agregar_nodo(
                 dispositivo['id'],
                 dispositivo['nombre'],
-                ubicacion
+                ubicacion,
+                indexar=False
             )
             
             # Agregar información adicional del dispositivo
@@ -455,6 +3380,8 @@ class SimuladorRedLAN:
                 recurso = Recurso(f"{dispositivo['id']}_servidor", "servidor", ubicacion)
                 nodo.agregar_recurso(recurso)
         
+        self.reindexar_geografia()
+        
         # Cargar conexiones
         for conexion in conexiones:
             # Peso basado en tipo de conexión o distancia
@@ -470,7 +3397,8 @@ class SimuladorRedLAN:
                 peso
             )
         
-        print(f"Topología de Packet Tracer cargada: {len(dispositivos)} dispositivos, {len(conexiones)} conexiones")
+        self._emitir(NivelEvento.INFO, 'topologia_packet_tracer_cargada',
+                     dispositivos=len(dispositivos), conexiones=len(conexiones))
     
     def generar_archivo_configuracion_pt(self, nombre_archivo: str = "topologia_pt.json"):
         """Generar archivo de configuración compatible con datos de Packet Tracer"""
@@ -553,8 +3481,7 @@ class SimuladorRedLAN:
         with open(nombre_archivo, 'w', encoding='utf-8') as f:
             json.dump(config_ejemplo, f, indent=2, ensure_ascii=False)
         
-        print(f"Archivo de configuración ejemplo generado: {nombre_archivo}")
-        print("Modifica este archivo con los datos de tu topología de Packet Tracer")
+        self._emitir(NivelEvento.INFO, 'configuracion_pt_generada', archivo=nombre_archivo)
     
     def generar_topologia_automatica(self, num_nodos: int = 10):
         """Generar topología de red automáticamente"""
@@ -563,21 +3490,23 @@ class SimuladorRedLAN:
             id_nodo = f"N{i+1:02d}"
             nombre = f"Estación {i+1}"
             ubicacion = (
-                random.uniform(-10, 10),  # Latitud simulada
-                random.uniform(-10, 10)   # Longitud simulada
+                self.rng.uniform(-10, 10),  # Latitud simulada
+                self.rng.uniform(-10, 10)   # Longitud simulada
             )
             
-            self.agregar_nodo(id_nodo, nombre, ubicacion)
+            self.agregar_nodo(id_nodo, nombre, ubicacion, indexar=False)
             
             # Agregar recursos aleatorios
             tipos_recursos = ['ambulancia', 'bombero', 'policia']
-            num_recursos = random.randint(1, 3)
+            num_recursos = self.rng.randint(1, 3)
             
             for j in range(num_recursos):
-                tipo = random.choice(tipos_recursos)
+                tipo = self.rng.choice(tipos_recursos)
                 recurso = Recurso(f"{id_nodo}_{tipo}_{j}", tipo, ubicacion)
                 self.nodos[id_nodo].agregar_recurso(recurso)
         
+        self.reindexar_geografia()
+        
         # Generar conexiones (red parcialmente conectada)
         nodos_ids = list(self.nodos.keys())
         for i, nodo1 in enumerate(nodos_ids):
@@ -591,7 +3520,165 @@ class SimuladorRedLAN:
                 
                 self.agregar_conexion(nodo1, nodo2, round(distancia, 2))
         
-        print(f"Topología automática generada con {num_nodos} nodos")
+        self._emitir(NivelEvento.INFO, 'topologia_generada', nodos=num_nodos)
+    
+    @_exclusivo_en_concurrencia
+    def generar_topologia_espacial(self, num_nodos: int, vecinos: int = 3,
+                                   limites: Tuple[float, float, float, float] = (-10, 10, -10, 10),
+                                   recursos_por_nodo: Tuple[int, int] = (1, 3), prefijo: str = "N") -> bool:
+        """Generar en bloque una red geográfica conexa de k vecinos más cercanos
+        
+        Los nodos se ubican uniformemente en limites = (lat_min, lat_max, lon_min, lon_max) y
+        cada uno se conecta con sus `vecinos` nodos más cercanos (peso = distancia euclidiana).
+        Las componentes que queden aisladas se unen a la principal por su par de nodos más
+        cercano, así la red siempre es conexa. Con NumPy la ubicación y la búsqueda de vecinos
+        son vectorizadas (rejilla espacial); sin él se usa el árbol k-d.
+        
+        Escribe los nodos en bloque sin pasar por agregar_nodo, así que no genera nada si
+        algún id ya existe (devuelve False); use otro prefijo para ampliar una red.
+        """
+        if num_nodos <= 0:
+            return True
+        lat_min, lat_max, lon_min, lon_max = limites
+        ids = [f"{prefijo}{i+1:02d}" for i in range(num_nodos)]
+        existentes = [id_nodo for id_nodo in ids if id_nodo in self.nodos]
+        if existentes:
+            self._emitir(NivelEvento.ERROR, 'ids_existentes', cantidad=len(existentes),
+                         prefijo=prefijo, ejemplo=existentes[0])
+            return False
+        tipos_recursos = ['ambulancia', 'bombero', 'policia']
+        
+        if np is not None:
+            generador = np.random.default_rng(self.rng.getrandbits(64))
+            puntos = np.column_stack((generador.uniform(lat_min, lat_max, num_nodos),
+                                      generador.uniform(lon_min, lon_max, num_nodos)))
+            ubicaciones = list(map(tuple, puntos.tolist()))
+            cantidades = generador.integers(recursos_por_nodo[0], recursos_por_nodo[1] + 1, num_nodos)
+            tipos = generador.integers(0, len(tipos_recursos), int(cantidades.sum())).tolist()
+            cantidades = cantidades.tolist()
+        else:
+            ubicaciones = [(self.rng.uniform(lat_min, lat_max), self.rng.uniform(lon_min, lon_max))
+                           for _ in range(num_nodos)]
+            cantidades = [self.rng.randint(*recursos_por_nodo) for _ in range(num_nodos)]
+            tipos = [self.rng.randrange(len(tipos_recursos)) for _ in range(sum(cantidades))]
+        
+        with gc_pausado():
+            nodos = []
+            siguiente_tipo = 0
+            for i, (id_nodo, ubicacion, cantidad) in enumerate(zip(ids, ubicaciones, cantidades)):
+                nodo = Nodo(id_nodo, f"Estación {i+1}", ubicacion)
+                nodos.append(nodo)
+                if self._cerrojos_nodo is not None:
+                    self._cerrojos_nodo[id_nodo] = threading.Lock()
+                self.nodos[id_nodo] = nodo
+                self.grafo[id_nodo] = nodo.conexiones
+                if id_nodo not in self.hoja_torneo:
+                    self.hoja_torneo[id_nodo] = len(self.ids_torneo)
+                    self.ids_torneo.append(id_nodo)
+                for j in range(cantidad):
+                    tipo = tipos_recursos[tipos[siguiente_tipo]]
+                    siguiente_tipo += 1
+                    nodo.agregar_recurso(Recurso(f"{id_nodo}_{tipo}_{j}", tipo, ubicacion))
+                nodo.al_cambiar = self._actualizar_torneo
+            self.reindexar_geografia()
+            
+            if np is not None:
+                origenes, destinos, pesos = self._aristas_knn_numpy(puntos, vecinos)
+                for i, (inicio, fin) in enumerate(zip(origenes[:-1], origenes[1:])):
+                    nodos[i].conexiones.update(zip([ids[j] for j in destinos[inicio:fin]], pesos[inicio:fin]))
+            else:
+                self._aristas_knn_arbol(nodos, vecinos)
+        
+        if self._torneo_pendiente is not None:
+            # Modo concurrente: las hojas nuevas se calculan al desactivar el modo, como las demás
+            self._torneo_pendiente.update(ids)
+        else:
+            self.torneo.cargar([self._clave_torneo(self.nodos[id_nodo]) for id_nodo in self.ids_torneo])
+        if self._nodos_modificados is not None:
+            self._nodos_modificados.update(dict.fromkeys(ids))
+        self._grafo_compacto = None
+        self.tabla_rutas = None
+        self._factor_heuristica = None
+        self._analisis_fallas = None
+        self._conectividad = None
+        self.invalidar_cache_rutas()
+        self._emitir(NivelEvento.INFO, 'topologia_generada', nodos=num_nodos,
+                     conexiones=sum(len(nodo.conexiones) for nodo in nodos) // 2)
+        return True
+    
+    @staticmethod
+    def _aristas_knn_numpy(puntos, vecinos: int) -> Tuple[List[int], List[int], List[float]]:
+        """Aristas del grafo k-NN más las de reconexión, en CSR simétrico (offsets, destinos, pesos)"""
+        n = len(puntos)
+        indices, distancias = vecinos_mas_cercanos(puntos, vecinos)
+        validos = indices >= 0
+        u = np.repeat(np.arange(n), vecinos)[validos.ravel()]
+        v = indices[validos]
+        w = distancias[validos]
+        
+        # Unir cada componente aislada con la principal por su par de nodos más cercano
+        etiquetas = etiquetar_componentes(n, u, v)
+        principal = np.bincount(etiquetas).argmax()
+        en_principal = etiquetas == principal
+        if not en_principal.all():
+            aislados = np.flatnonzero(~en_principal)
+            objetivos = np.flatnonzero(en_principal)
+            cercano, distancia = vecinos_mas_cercanos(puntos[objetivos], 1, puntos[aislados])
+            por_componente = np.lexsort((distancia[:, 0], etiquetas[aislados]))
+            componentes = etiquetas[aislados][por_componente]
+            primeros = por_componente[np.r_[True, componentes[1:] != componentes[:-1]]]
+            u = np.concatenate((u, aislados[primeros]))
+            v = np.concatenate((v, objetivos[cercano[primeros, 0]]))
+            w = np.concatenate((w, distancia[primeros, 0]))
+        
+        # Ambas direcciones, sin duplicados (un par puede ser vecino mutuo)
+        origen = np.concatenate((u, v))
+        destino = np.concatenate((v, u))
+        peso = np.concatenate((w, w))
+        clave = origen * n + destino
+        clave, unicos = np.unique(clave, return_index=True)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen[unicos], minlength=n), out=offsets[1:])
+        return offsets.tolist(), destino[unicos].tolist(), peso[unicos].tolist()
+    
+    def _aristas_knn_arbol(self, nodos: List[Nodo], vecinos: int):
+        """Versión sin NumPy: k-NN con el árbol geográfico y reconexión por BFS"""
+        def conectar(nodo1: Nodo, nodo2: Nodo):
+            distancia = math.dist(nodo1.ubicacion, nodo2.ubicacion)
+            nodo1.conexiones[nodo2.id] = distancia
+            nodo2.conexiones[nodo1.id] = distancia
+        
+        nuevos = {nodo.id for nodo in nodos}
+        for nodo in nodos:
+            for otro in self.arbol_geografico.k_mas_cercanos(
+                    nodo.ubicacion, vecinos, filtro=lambda n: n.id in nuevos and n is not nodo):
+                conectar(nodo, otro)
+        
+        componente = {}
+        miembros = []
+        for nodo in nodos:
+            if nodo.id in componente:
+                continue
+            actual = [nodo]
+            componente[nodo.id] = len(miembros)
+            for visitado in actual:
+                for vecino in visitado.conexiones:
+                    if vecino not in componente:
+                        componente[vecino] = len(miembros)
+                        actual.append(self.nodos[vecino])
+            miembros.append(actual)
+        
+        principal = max(range(len(miembros)), key=lambda c: len(miembros[c]))
+        for c, grupo in enumerate(miembros):
+            if c == principal:
+                continue
+            en_principal = lambda n: componente.get(n.id) == principal
+            par = min(
+                ((nodo, self.arbol_geografico.k_mas_cercanos(nodo.ubicacion, 1, filtro=en_principal)[0])
+                 for nodo in grupo),
+                key=lambda par: math.dist(par[0].ubicacion, par[1].ubicacion)
+            )
+            conectar(*par)
     
     def imprimir_estado_red(self):
         """Imprimir estado actual de la red"""
@@ -605,10 +3692,815 @@ class SimuladorRedLAN:
             print(f"  Ubicación: {nodo.ubicacion}")
             print(f"  Emergencias pendientes: {len(nodo.emergencias_pendientes)}")
             print(f"  Emergencias atendidas: {nodo.emergencias_atendidas}")
-            print(f"  Recursos disponibles: {len(nodo.recursos_disponibles())}/{len(nodo.recursos)}")
+            print(f"  Recursos disponibles: {nodo.num_recursos_disponibles}/{len(nodo.recursos)}")
             print(f"  Datos transmitidos: {nodo.datos_transmitidos} bytes")
             print(f"  Conexiones: {list(nodo.conexiones.keys())}")
 
+class TipoEvento(Enum):
+    LLEGADA = "llegada"
+    DESPACHO = "despacho"
+    TRANSMISION = "transmision"
+    LIBERACION = "liberacion"
+    FALLA = "falla"
+    RESTAURACION = "restauracion"
+
+def generar_emergencias_poisson(tasa: float, inicio: float, fin: float,
+                                limites: Tuple[float, float, float, float],
+                                rng=random, prefijo: str = "P"):
+    """Generador perezoso de llegadas de Poisson (tasa por unidad de tiempo) en un rectángulo
+    
+    limites = (lat_min, lat_max, lon_min, lon_max). Las emergencias salen ordenadas por timestamp.
+    """
+    tipos = list(TipoEmergencia)
+    prioridades = list(PrioridadEmergencia)
+    lat_min, lat_max, lon_min, lon_max = limites
+    instante = inicio
+    contador = 0
+    while True:
+        instante += rng.expovariate(tasa)
+        if instante >= fin:
+            return
+        contador += 1
+        yield Emergencia(
+            f"{prefijo}{contador:07d}",
+            rng.choice(tipos),
+            rng.choice(prioridades),
+            (rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)),
+            "Emergencia simulada",
+            timestamp=instante
+        )
+
+class MotorEventos:
+    """Simulación de eventos discretos sobre un SimuladorRedLAN con reloj virtual
+    
+    El reloj salta directamente al siguiente evento (llegadas, despachos, transmisiones,
+    liberaciones de recursos, fallas y restauraciones), así un día de tráfico se simula en
+    lo que tarde procesar sus eventos. Los tiempos de respuesta se miden en tiempo virtual
+    y la latencia de cada reporte es el costo de su ruta Dijkstra multiplicado por
+    factor_latencia.
+    """
+    
+    def __init__(self, simulador: SimuladorRedLAN, inicio: float = 0.0,
+                 destino_reportes: Optional[str] = None, factor_latencia: float = 1.0):
+        self.sim = simulador
+        self.ahora = inicio
+        self.cola: List[Tuple[float, int, TipoEvento, object]] = []
+        self._secuencia = 0
+        self.flujos = {}  # {id_flujo: iterador de emergencias ordenadas por timestamp}
+        self._despachos_programados: Set[str] = set()
+        self.destino_reportes = destino_reportes
+        self.factor_latencia = factor_latencia
+        self.eventos_procesados = 0
+        self.eventos_por_tipo = defaultdict(int)
+        self.reportes_entregados = 0
+        self.reportes_perdidos = 0
+        self.sketch_latencia = SketchPercentiles()
+        simulador.reloj = self.obtener_ahora
+    
+    def obtener_ahora(self) -> float:
+        return self.ahora
+    
+    def programar(self, instante: float, tipo: TipoEvento, datos=None):
+        self._secuencia += 1
+        heapq.heappush(self.cola, (max(instante, self.ahora), self._secuencia, tipo, datos))
+    
+    def programar_llegada(self, emergencia: Emergencia):
+        self.programar(emergencia.timestamp, TipoEvento.LLEGADA, emergencia)
+    
+    def programar_flujo(self, emergencias):
+        """Consumir de forma perezosa un iterable de emergencias ordenado por timestamp"""
+        iterador = iter(emergencias)
+        id_flujo = len(self.flujos)
+        self.flujos[id_flujo] = iterador
+        self._siguiente_del_flujo(id_flujo)
+    
+    def _siguiente_del_flujo(self, id_flujo: int):
+        emergencia = next(self.flujos[id_flujo], None)
+        if emergencia is None:
+            del self.flujos[id_flujo]
+        else:
+            self.programar(emergencia.timestamp, TipoEvento.LLEGADA, (id_flujo, emergencia))
+    
+    def programar_falla(self, id_nodo: str, instante: float, duracion: Optional[float] = None):
+        self.programar(instante, TipoEvento.FALLA, id_nodo)
+        if duracion is not None:
+            self.programar(instante + duracion, TipoEvento.RESTAURACION, id_nodo)
+    
+    def _programar_despacho(self, id_nodo: str):
+        if id_nodo not in self._despachos_programados:
+            self._despachos_programados.add(id_nodo)
+            self.programar(self.ahora, TipoEvento.DESPACHO, id_nodo)
+    
+    def ejecutar(self, hasta: Optional[float] = None, max_eventos: Optional[int] = None) -> Dict:
+        """Procesar eventos en orden temporal hasta agotar la cola, el instante o el máximo dado"""
+        inicio_real = time.perf_counter()
+        procesados = 0
+        sim = self.sim
+        resumen = {'despachadas': 0, 'por_nodo': defaultdict(int), 'por_recurso': defaultdict(int)}
+        
+        while max_eventos is None or procesados < max_eventos:
+            proximo = self.cola[0][0] if self.cola else None
+            liberacion = sim.proxima_liberacion()
+            
+            # Las liberaciones de recursos viven en el heap del simulador; se intercalan aquí
+            if liberacion is not None and (proximo is None or liberacion <= proximo):
+                if hasta is not None and liberacion > hasta:
+                    break
+                self.ahora = max(self.ahora, liberacion)
+                _, id_nodo = sim._liberar_siguiente()
+                self.eventos_por_tipo[TipoEvento.LIBERACION] += 1
+                self._programar_despacho(id_nodo)
+                procesados += 1
+                continue
+            
+            if proximo is None or (hasta is not None and proximo > hasta):
+                break
+            
+            instante, _, tipo, datos = heapq.heappop(self.cola)
+            self.ahora = instante
+            self.eventos_por_tipo[tipo] += 1
+            procesados += 1
+            
+            if tipo is TipoEvento.LLEGADA:
+                if isinstance(datos, tuple):
+                    id_flujo, emergencia = datos
+                    self._siguiente_del_flujo(id_flujo)
+                else:
+                    emergencia = datos
+                nodo = sim._registrar(emergencia)
+                if nodo is not None:
+                    self._programar_despacho(nodo.id)
+            
+            elif tipo is TipoEvento.DESPACHO:
+                self._despachos_programados.discard(datos)
+                nodo = sim.nodos[datos]
+                if nodo.activo and nodo.num_recursos_disponibles:
+                    for emergencia in sim._drenar_nodo(nodo, resumen, self.ahora):
+                        self._enviar_reporte(nodo, emergencia)
+            
+            elif tipo is TipoEvento.TRANSMISION:
+                enviado_en, id_destino = datos
+                if sim.nodos[id_destino].activo:
+                    self.reportes_entregados += 1
+                    self.sketch_latencia.agregar(self.ahora - enviado_en)
+                else:
+                    self.reportes_perdidos += 1
+            
+            elif tipo is TipoEvento.FALLA:
+                for id_destino in sim.simular_falla_nodo(datos):
+                    self._programar_despacho(id_destino)
+            
+            elif tipo is TipoEvento.RESTAURACION:
+                for id_destino in sim.restaurar_nodo(datos):
+                    self._programar_despacho(id_destino)
+                self._programar_despacho(datos)
+        
+        if hasta is not None and self.ahora < hasta and not self.cola:
+            self.ahora = hasta
+        sim._vaciar_propagacion()
+        
+        duracion_real = time.perf_counter() - inicio_real
+        self.eventos_procesados += procesados
+        return {
+            'eventos': procesados,
+            'reloj_virtual': self.ahora,
+            'duracion_real': duracion_real,
+            'eventos_por_segundo': procesados / duracion_real if duracion_real > 0 else 0.0,
+            'despachadas': resumen['despachadas'],
+            'eventos_por_tipo': {tipo.value: n for tipo, n in self.eventos_por_tipo.items()},
+            'reportes_entregados': self.reportes_entregados,
+            'reportes_perdidos': self.reportes_perdidos,
+            'latencia_reportes': self.sketch_latencia.resumen()
+        }
+    
+    def _enviar_reporte(self, nodo: Nodo, emergencia: Emergencia):
+        """Programar la entrega del reporte al destino tras la latencia de su ruta
+        
+        El grafo es no dirigido, así que todos los costos salen del único árbol de caminos
+        mínimos con raíz en el destino, que la caché repara en fallas y restauraciones.
+        """
+        if self.destino_reportes is None or self.destino_reportes == nodo.id:
+            return
+        if self.sim.nodos[self.destino_reportes].activo:
+            arbol = self.sim._obtener_arbol_rutas(self.destino_reportes)
+            costo = arbol.distancias.get(nodo.id, float('inf'))
+        else:
+            costo = float('inf')
+        if costo == float('inf'):
+            self.reportes_perdidos += 1
+            return
+        self.programar(
+            self.ahora + costo * self.factor_latencia,
+            TipoEvento.TRANSMISION,
+            (self.ahora, self.destino_reportes)
+        )
+
+class DespachadorAsincrono:
+    """Despacho concurrente con asyncio: cada nodo activo consume su cola en su propia tarea
+    
+    La cola de prioridad de cada nodo sigue siendo su heap; el despachador la vuelve esperable
+    enganchando Nodo.al_cambiar a un asyncio.Event por nodo, de modo que una llegada, una
+    redistribución o un recurso liberado despiertan a su consumidor. El reloj es virtual y
+    avanza escala_tiempo segundos reales por segundo simulado. Cada despacho envía el reporte
+    a los vecinos activos como una entrega esperable que tarda el peso del enlace por
+    factor_latencia; una falla cancela la tarea del nodo y sus envíos en curso y reparte su cola.
+    Una escala demasiado chica hace que la sobrecarga del bucle de eventos infle las latencias.
+    """
+    
+    def __init__(self, simulador: SimuladorRedLAN, escala_tiempo: float = 0.001,
+                 factor_latencia: float = 1.0, tiempo_despacho: float = 0.0, inicio: float = 0.0):
+        if escala_tiempo <= 0:
+            raise ValueError("escala_tiempo debe ser positiva")
+        self.sim = simulador
+        self.escala_tiempo = escala_tiempo
+        self.factor_latencia = factor_latencia
+        self.tiempo_despacho = tiempo_despacho  # Segundos virtuales que ocupa cada despacho
+        self.inicio = inicio
+        self._inicio_real: Optional[float] = None
+        self.consumidores: Dict[str, asyncio.Task] = {}
+        self.envios: Dict[str, Set[asyncio.Task]] = defaultdict(set)  # {id_origen: entregas en vuelo}
+        self.avisos: Dict[str, asyncio.Event] = {}
+        self.fallas_programadas: List[Tuple[float, str, Optional[float]]] = []
+        self._con_pendientes: Set[str] = set()
+        self._actividad: Optional[asyncio.Event] = None
+        self._cambio_liberaciones: Optional[asyncio.Event] = None
+        self.reportes_entregados = 0
+        self.reportes_perdidos = 0
+        self.envios_cancelados = 0
+        self.sketch_latencia = SketchPercentiles()
+        self.resumen = {'despachadas': 0, 'por_nodo': defaultdict(int), 'por_recurso': defaultdict(int)}
+    
+    def obtener_ahora(self) -> float:
+        if self._inicio_real is None:
+            return self.inicio
+        return self.inicio + (asyncio.get_running_loop().time() - self._inicio_real) / self.escala_tiempo
+    
+    async def dormir(self, segundos: float):
+        """Esperar una duración en tiempo virtual"""
+        await asyncio.sleep(max(segundos, 0.0) * self.escala_tiempo)
+    
+    def programar_falla(self, id_nodo: str, instante: float, duracion: Optional[float] = None):
+        self.fallas_programadas.append((instante, id_nodo, duracion))
+    
+    def _avisar(self, nodo: Nodo):
+        """Reemplazo de Nodo.al_cambiar mientras el despachador está en marcha"""
+        self.sim._actualizar_torneo(nodo)
+        if nodo.emergencias_pendientes:
+            self._con_pendientes.add(nodo.id)
+        else:
+            self._con_pendientes.discard(nodo.id)
+        aviso = self.avisos.get(nodo.id)
+        if aviso is not None:
+            aviso.set()
+        self._actividad.set()
+    
+    def _iniciar_consumidor(self, nodo: Nodo):
+        tarea = self.consumidores.get(nodo.id)
+        if tarea is None or tarea.done():
+            self.avisos.setdefault(nodo.id, asyncio.Event())
+            self.consumidores[nodo.id] = asyncio.create_task(self._consumir(nodo), name=f"consumidor-{nodo.id}")
+    
+    async def _consumir(self, nodo: Nodo):
+        """Tarea de un nodo: atender su emergencia más prioritaria en cuanto haya un recurso libre"""
+        aviso = self.avisos[nodo.id]
+        sim = self.sim
+        while nodo.activo:
+            if not (nodo.emergencias_pendientes and nodo.num_recursos_disponibles):
+                aviso.clear()
+                await aviso.wait()
+                continue
+            
+            emergencia = nodo.obtener_emergencia_prioritaria()
+            if emergencia.atendida:
+                continue
+            recurso = nodo.tomar_recurso(emergencia.tipo)
+            sim._registrar_atencion(nodo, emergencia, self.obtener_ahora(), recurso)
+            self._cambio_liberaciones.set()
+            self.resumen['despachadas'] += 1
+            self.resumen['por_nodo'][nodo.id] += 1
+            self.resumen['por_recurso'][recurso.tipo] += 1
+            self.transmitir(nodo, emergencia)
+            
+            if self.tiempo_despacho:
+                await self.dormir(self.tiempo_despacho)
+            else:
+                await asyncio.sleep(0)  # Ceder el turno a las demás estaciones
+    
+    def transmitir(self, nodo: Nodo, emergencia: Emergencia) -> List[asyncio.Task]:
+        """Enviar el reporte a cada vecino activo; devuelve las entregas en vuelo"""
+        self.sim._simular_transmision_datos(nodo, emergencia)
+        en_vuelo = self.envios[nodo.id]
+        entregas = []
+        for id_vecino, peso in nodo.conexiones.items():
+            if self.sim.nodos[id_vecino].activo:
+                entrega = asyncio.create_task(self._entregar(id_vecino, peso))
+                en_vuelo.add(entrega)
+                entrega.add_done_callback(en_vuelo.discard)
+                entregas.append(entrega)
+        return entregas
+    
+    async def _entregar(self, id_destino: str, peso: float):
+        enviado_en = self.obtener_ahora()
+        try:
+            await self.dormir(peso * self.factor_latencia)
+        except asyncio.CancelledError:
+            self.envios_cancelados += 1
+            raise
+        if self.sim.nodos[id_destino].activo:
+            self.reportes_entregados += 1
+            self.sketch_latencia.agregar(self.obtener_ahora() - enviado_en)
+        else:
+            self.reportes_perdidos += 1
+        self._actividad.set()
+    
+    async def _liberar(self):
+        """Devolver los recursos a su nodo cuando vence su servicio"""
+        sim = self.sim
+        while True:
+            self._cambio_liberaciones.clear()
+            proxima = sim.proxima_liberacion()
+            espera = None if proxima is None else (proxima - self.obtener_ahora()) * self.escala_tiempo
+            if espera is not None and espera <= 0:
+                sim.liberar_recursos(self.obtener_ahora())
+                continue
+            try:
+                await asyncio.wait_for(self._cambio_liberaciones.wait(), espera)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _llegadas(self, emergencias):
+        for emergencia in emergencias:
+            await self.dormir(emergencia.timestamp - self.obtener_ahora())
+            self.sim._registrar(emergencia)
+    
+    async def _falla_programada(self, instante: float, id_nodo: str, duracion: Optional[float]):
+        await self.dormir(instante - self.obtener_ahora())
+        self.fallar(id_nodo)
+        if duracion is not None:
+            await self.dormir(duracion)
+            self.restaurar(id_nodo)
+    
+    def fallar(self, id_nodo: str) -> Dict[str, int]:
+        """Cancelar las tareas del nodo y repartir su cola; los consumidores destino despiertan solos"""
+        tarea = self.consumidores.pop(id_nodo, None)
+        if tarea is not None:
+            tarea.cancel()
+        for entrega in list(self.envios.pop(id_nodo, ())):
+            entrega.cancel()
+        destinos = self.sim.simular_falla_nodo(id_nodo)
+        self._con_pendientes.discard(id_nodo)
+        self._actividad.set()
+        return destinos
+    
+    def restaurar(self, id_nodo: str) -> Dict[str, int]:
+        destinos = self.sim.restaurar_nodo(id_nodo)
+        nodo = self.sim.nodos.get(id_nodo)
+        if nodo is not None and nodo.activo:
+            self._iniciar_consumidor(nodo)
+        return destinos
+    
+    def _terminado(self, llegadas: asyncio.Task) -> bool:
+        return (llegadas.done() and not self._con_pendientes and not self.sim.en_espera
+                and not any(self.envios.values()))
+    
+    async def ejecutar(self, emergencias=(), hasta: Optional[float] = None) -> Dict:
+        """Correr las estaciones hasta atender todo lo pendiente o alcanzar el instante virtual dado
+        
+        emergencias es un iterable ordenado por timestamp que llega en tiempo virtual. Mientras
+        haya emergencias en espera de una estación restaurada la ejecución sólo termina al
+        llegar a hasta.
+        """
+        sim = self.sim
+        bucle = asyncio.get_running_loop()
+        inicio_real = time.perf_counter()
+        self._inicio_real = bucle.time()
+        reloj_previo = sim.reloj
+        sim.reloj = self.obtener_ahora
+        self._actividad = asyncio.Event()
+        self._cambio_liberaciones = asyncio.Event()
+        self._con_pendientes = {id_nodo for id_nodo, nodo in sim.nodos.items() if nodo.emergencias_pendientes}
+        for nodo in sim.nodos.values():
+            nodo.al_cambiar = self._avisar
+            if nodo.activo:
+                self._iniciar_consumidor(nodo)
+        
+        auxiliares = [asyncio.create_task(self._liberar())]
+        auxiliares += [asyncio.create_task(self._falla_programada(*falla)) for falla in self.fallas_programadas]
+        self.fallas_programadas = []
+        llegadas = asyncio.create_task(self._llegadas(emergencias))
+        llegadas.add_done_callback(lambda _: self._actividad.set())
+        
+        try:
+            while not self._terminado(llegadas):
+                self._actividad.clear()
+                espera = None if hasta is None else (hasta - self.obtener_ahora()) * self.escala_tiempo
+                if espera is not None and espera <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._actividad.wait(), espera)
+                except asyncio.TimeoutError:
+                    break
+            if llegadas.done() and not llegadas.cancelled() and llegadas.exception() is not None:
+                raise llegadas.exception()
+        finally:
+            tareas = [llegadas, *auxiliares, *self.consumidores.values()]
+            tareas += [entrega for en_vuelo in self.envios.values() for entrega in en_vuelo]
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            self.consumidores.clear()
+            self.envios.clear()
+            for nodo in sim.nodos.values():
+                nodo.al_cambiar = sim._actualizar_torneo
+            sim._vaciar_propagacion()
+            self.inicio = self.obtener_ahora()
+            self._inicio_real = None
+            sim.reloj = reloj_previo
+        
+        duracion_real = time.perf_counter() - inicio_real
+        return {
+            'reloj_virtual': self.inicio,
+            'duracion_real': duracion_real,
+            'despachadas': self.resumen['despachadas'],
+            'por_nodo': dict(self.resumen['por_nodo']),
+            'por_recurso': dict(self.resumen['por_recurso']),
+            'reportes_entregados': self.reportes_entregados,
+            'reportes_perdidos': self.reportes_perdidos,
+            'envios_cancelados': self.envios_cancelados,
+            'latencia_reportes': self.sketch_latencia.resumen()
+        }
+
+def emergencia_desde_registro(registro: Dict, reloj: Callable[[], float] = time.time) -> Emergencia:
+    """Construir una Emergencia desde un registro NDJSON
+    
+    Acepta tipo por valor ("incendio") o nombre ("INCENDIO"), prioridad por nombre ("CRITICA")
+    o valor (1), y ubicación como [lat, lon] o con claves lat/lon.
+    """
+    tipo = registro['tipo']
+    tipo = TipoEmergencia[tipo] if tipo in TipoEmergencia.__members__ else TipoEmergencia(tipo)
+    prioridad = registro['prioridad']
+    prioridad = PrioridadEmergencia[prioridad] if isinstance(prioridad, str) else PrioridadEmergencia(prioridad)
+    if 'ubicacion' in registro:
+        ubicacion = (float(registro['ubicacion'][0]), float(registro['ubicacion'][1]))
+    else:
+        ubicacion = (float(registro['lat']), float(registro['lon']))
+    return Emergencia(
+        str(registro['id']),
+        tipo,
+        prioridad,
+        ubicacion,
+        registro.get('descripcion', ''),
+        timestamp=float(registro['timestamp']) if 'timestamp' in registro else reloj()
+    )
+
+class IngestaEmergencias:
+    """Ingesta en streaming de emergencias NDJSON desde archivo, tubería o socket local
+    
+    Las líneas se leen y decodifican de forma perezosa y se registran en micro-lotes con
+    registrar_emergencias_lote. Si alguna cola de nodo supera limite_cola se deja de leer
+    (contrapresión) y se invoca aliviar (por defecto un despacho con drenado) hasta que
+    baje; si no hay progreso se espera en pausas cortas hasta max_espera segundos.
+    Con velocidad se reproduce el registro respetando sus timestamps acelerados por ese
+    factor, y retraso mide cuánto va la ingesta por detrás del calendario.
+    """
+    
+    def __init__(self, simulador: SimuladorRedLAN, fuente, tamaño_lote: int = 1000,
+                 limite_cola: int = 10000, velocidad: Optional[float] = None,
+                 aliviar: Optional[Callable[[], Dict]] = None,
+                 pausa: float = 0.01, max_espera: float = 1.0):
+        self.sim = simulador
+        self.fuente = fuente
+        self.tamaño_lote = tamaño_lote
+        self.limite_cola = limite_cola
+        self.velocidad = velocidad
+        self.aliviar = aliviar or (lambda: simulador.procesar_emergencias(drenar=True))
+        self.pausa = pausa
+        self.max_espera = max_espera
+        self.estadisticas = {
+            'leidos': 0,
+            'registrados': 0,
+            'errores': 0,
+            'lotes': 0,
+            'contrapresiones': 0,
+            'tiempo_en_contrapresion': 0.0,
+            'retraso_actual': 0.0,
+            'retraso_maximo': 0.0,
+            'tasa_ingesta': 0.0
+        }
+    
+    def _lineas(self):
+        """Iterar líneas de la fuente sin cargarla entera"""
+        fuente = self.fuente
+        if isinstance(fuente, str):
+            with open(fuente, 'r', encoding='utf-8') as archivo:
+                yield from archivo
+        elif hasattr(fuente, 'makefile'):  # Socket
+            with fuente.makefile('r', encoding='utf-8') as archivo:
+                yield from archivo
+        else:  # Archivo abierto, sys.stdin, tubería o cualquier iterable de líneas
+            yield from fuente
+    
+    def emergencias(self):
+        """Generador perezoso de emergencias válidas (útil también para MotorEventos.programar_flujo)"""
+        for linea in self._lineas():
+            linea = linea.strip()
+            if not linea:
+                continue
+            self.estadisticas['leidos'] += 1
+            try:
+                yield emergencia_desde_registro(json.loads(linea), self.sim.reloj)
+            except (ValueError, KeyError, TypeError, IndexError):
+                self.estadisticas['errores'] += 1
+                self.sim._emitir(NivelEvento.ADVERTENCIA, 'registro_invalido', linea=linea[:200])
+    
+    def _saturado(self, nodos: Set[str]) -> bool:
+        return any(len(self.sim.nodos[id_nodo].emergencias_pendientes) > self.limite_cola for id_nodo in nodos)
+    
+    def _contrapresion(self, nodos: Set[str]):
+        """Dejar de leer hasta que las colas afectadas vuelvan a estar por debajo del límite"""
+        self.estadisticas['contrapresiones'] += 1
+        inicio = time.perf_counter()
+        while self._saturado(nodos):
+            resumen = self.aliviar()
+            if resumen and resumen.get('despachadas'):
+                continue
+            if time.perf_counter() - inicio >= self.max_espera:
+                self.sim._emitir(NivelEvento.ADVERTENCIA, 'contrapresion_agotada',
+                                 limite=self.limite_cola, espera=self.max_espera)
+                break
+            time.sleep(self.pausa)
+        self.estadisticas['tiempo_en_contrapresion'] += time.perf_counter() - inicio
+    
+    def ejecutar(self, max_registros: Optional[int] = None) -> Dict:
+        """Consumir la fuente completa (o hasta max_registros) y devolver métricas de ingesta"""
+        inicio = time.perf_counter()
+        flujo = self.emergencias()
+        if max_registros is not None:
+            flujo = itertools.islice(flujo, max_registros)
+        primer_timestamp = None
+        
+        while True:
+            lote = list(itertools.islice(flujo, self.tamaño_lote))
+            if not lote:
+                break
+            
+            if self.velocidad:
+                # Esperar hasta el instante de calendario del último registro del lote
+                if primer_timestamp is None:
+                    primer_timestamp = lote[0].timestamp
+                objetivo = (lote[-1].timestamp - primer_timestamp) / self.velocidad
+                transcurrido = time.perf_counter() - inicio
+                if objetivo > transcurrido:
+                    time.sleep(objetivo - transcurrido)
+                retraso = max(0.0, time.perf_counter() - inicio - objetivo)
+                self.estadisticas['retraso_actual'] = retraso
+                self.estadisticas['retraso_maximo'] = max(self.estadisticas['retraso_maximo'], retraso)
+            
+            asignaciones = self.sim.registrar_emergencias_lote(lote)
+            self.estadisticas['lotes'] += 1
+            self.estadisticas['registrados'] += len(lote)
+            
+            nodos = {id_nodo for id_nodo in asignaciones if id_nodo is not None}
+            if self._saturado(nodos):
+                self._contrapresion(nodos)
+        
+        duracion = time.perf_counter() - inicio
+        self.estadisticas['duracion'] = duracion
+        self.estadisticas['tasa_ingesta'] = self.estadisticas['registrados'] / duracion if duracion > 0 else 0.0
+        return dict(self.estadisticas)
+
+class GestorCheckpoints:
+    """Checkpoints incrementales de un SimuladorRedLAN en un directorio
+    
+    El primer checkpoint es completo y los siguientes guardan solo los nodos y emergencias
+    modificados desde el anterior (más el estado global, que es pequeño). Cada
+    max_incrementales se escribe uno completo para acotar la cadena que hay que leer al
+    restaurar. Cada archivo se escribe en un temporal y se renombra, así una caída a mitad
+    de escritura nunca deja un checkpoint corrupto.
+    """
+    
+    PATRON = 'checkpoint_{:06d}_{}.pkl'
+    
+    def __init__(self, simulador: SimuladorRedLAN, directorio: str, max_incrementales: int = 16):
+        self.sim = simulador
+        self.directorio = directorio
+        self.max_incrementales = max_incrementales
+        os.makedirs(directorio, exist_ok=True)
+        existentes = self.listar(directorio)
+        self.secuencia = existentes[-1][0] if existentes else 0
+        self.incrementales: Optional[int] = None  # None hasta escribir el primer completo
+    
+    @classmethod
+    def listar(cls, directorio: str) -> List[Tuple[int, bool, str]]:
+        """Checkpoints del directorio como (secuencia, completo, ruta), en orden"""
+        checkpoints = []
+        for nombre in os.listdir(directorio):
+            partes = nombre[:-4].split('_') if nombre.endswith('.pkl') else []
+            if len(partes) == 3 and partes[0] == 'checkpoint' and partes[1].isdigit():
+                checkpoints.append((int(partes[1]), partes[2] == 'completo', os.path.join(directorio, nombre)))
+        return sorted(checkpoints)
+    
+    def guardar(self, completo: bool = False) -> str:
+        """Escribir un checkpoint (incremental salvo que toque uno completo); devuelve su ruta"""
+        completo = completo or self.incrementales is None or self.incrementales >= self.max_incrementales
+        estado = self.sim.capturar_estado(solo_cambios=not completo)
+        self.sim.iniciar_seguimiento_cambios()
+        
+        self.secuencia += 1
+        ruta = os.path.join(self.directorio,
+                            self.PATRON.format(self.secuencia, 'completo' if completo else 'incremental'))
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as f:
+            pickle.dump(estado, f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+        
+        self.incrementales = 0 if completo else self.incrementales + 1
+        self.sim._emitir(NivelEvento.INFO, 'checkpoint_guardado', archivo=ruta,
+                         modo='completo' if completo else 'incremental',
+                         nodos=len(estado['nodos']), emergencias=len(estado['emergencias']))
+        return ruta
+    
+    def compactar(self) -> str:
+        """Escribir un checkpoint completo y borrar todos los anteriores"""
+        ruta = self.guardar(completo=True)
+        for secuencia, _, anterior in self.listar(self.directorio):
+            if secuencia < self.secuencia:
+                os.remove(anterior)
+        return ruta
+    
+    @classmethod
+    def cargar_estado(cls, directorio: str, secuencia: Optional[int] = None) -> Optional[Dict]:
+        """Estado completo en el checkpoint dado (por defecto el último), o None si no hay
+        
+        Se parte del último checkpoint completo anterior y se aplican los incrementales
+        posteriores en orden; cada uno sustituye los nodos y emergencias que contiene.
+        """
+        cadena = []
+        for numero, completo, ruta in cls.listar(directorio):
+            if secuencia is not None and numero > secuencia:
+                break
+            if completo:
+                cadena = []
+            cadena.append(ruta)
+        if not cadena or not cadena[0].endswith('_completo.pkl'):
+            return None
+        
+        with open(cadena[0], 'rb') as f, gc_pausado():
+            estado = pickle.load(f)
+        for ruta in cadena[1:]:
+            with open(ruta, 'rb') as f, gc_pausado():
+                delta = pickle.load(f)
+            estado['nodos'].update(delta['nodos'])
+            estado['emergencias'].update(delta['emergencias'])
+            estado['global'] = delta['global']
+            if 'indice_geografico' in delta:
+                estado['indice_geografico'] = delta['indice_geografico']
+        estado['secuencia'] = int(os.path.basename(cadena[-1]).split('_')[1])
+        return estado
+    
+    @classmethod
+    def restaurar(cls, directorio: str, secuencia: Optional[int] = None,
+                  sumideros: Optional[List[SumideroEventos]] = None) -> Optional[SimuladorRedLAN]:
+        """Simulador independiente en el estado de un checkpoint (útil para bifurcar escenarios)"""
+        estado = cls.cargar_estado(directorio, secuencia)
+        if estado is None:
+            return None
+        sim = SimuladorRedLAN.desde_estado(estado, sumideros)
+        sim._emitir(NivelEvento.INFO, 'checkpoint_restaurado', directorio=directorio,
+                    secuencia=estado['secuencia'], nodos=len(sim.nodos))
+        return sim
+    
+    @classmethod
+    def reanudar(cls, directorio: str, max_incrementales: int = 16,
+                 sumideros: Optional[List[SumideroEventos]] = None) -> Optional['GestorCheckpoints']:
+        """Restaurar el último checkpoint y seguir la misma cadena (p. ej. tras una caída)"""
+        sim = cls.restaurar(directorio, sumideros=sumideros)
+        if sim is None:
+            return None
+        gestor = cls(sim, directorio, max_incrementales)
+        # El simulador restaurado coincide con el último checkpoint: el siguiente puede ser incremental
+        gestor.incrementales = sum(1 for _ in itertools.takewhile(
+            lambda checkpoint: not checkpoint[1], reversed(cls.listar(directorio))
+        ))
+        sim.iniciar_seguimiento_cambios()
+        return gestor
+
+# Valores críticos t de Student (dos colas, 95%) para 1..30 grados de libertad
+T_STUDENT_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+)
+
+def _ejecutar_replica(parametros: Dict) -> Dict:
+    """Una réplica independiente (se ejecuta en un proceso del pool); devuelve solo un resumen"""
+    rng = random.Random(parametros['semilla'])
+    
+    sim = SimuladorRedLAN(semilla=rng.getrandbits(64), sumideros=[SumideroNulo()])
+    sim.generar_topologia_automatica(parametros['num_nodos'])
+    ids = list(sim.nodos)
+    
+    # Los costos de reporte salen del árbol con raíz en ids[0]: una sola entrada de la caché
+    motor = MotorEventos(sim, destino_reportes=ids[0])
+    motor.programar_flujo(generar_emergencias_poisson(
+        parametros['tasa'], 0.0, parametros['duracion'], (-10, 10, -10, 10), rng
+    ))
+    for _ in range(parametros['fallas']):
+        motor.programar_falla(
+            rng.choice(ids),
+            rng.uniform(0, parametros['duracion']),
+            parametros['duracion_falla']
+        )
+    resultado_motor = motor.ejecutar(hasta=parametros['duracion'])
+    estadisticas = sim.obtener_estadisticas()
+    
+    general = estadisticas['general']
+    respuesta = estadisticas['tiempo_respuesta']['general']
+    totales = general['emergencias_totales']
+    return {
+        'replica': parametros['replica'],
+        'semilla': parametros['semilla'],
+        'metricas': {
+            'emergencias_totales': totales,
+            'emergencias_atendidas': general['emergencias_atendidas'],
+            'tasa_atencion': general['emergencias_atendidas'] / totales if totales else 0.0,
+            'tiempo_respuesta_promedio': general['tiempo_respuesta_promedio'],
+            'tiempo_respuesta_p50': respuesta['p50'] or 0.0,
+            'tiempo_respuesta_p95': respuesta['p95'] or 0.0,
+            'tiempo_respuesta_p99': respuesta['p99'] or 0.0,
+            'datos_transmitidos_total': general['datos_transmitidos_total'],
+            'emergencias_pendientes': sum(
+                nodo['emergencias_pendientes'] for nodo in estadisticas['nodos'].values()
+            ),
+            'reportes_perdidos': resultado_motor['reportes_perdidos']
+        },
+        'sketch_respuesta': sim.sketch_respuesta.exportar()
+    }
+
+def combinar_replicas(resultados: List[Dict]) -> Dict:
+    """Media, desviación estándar e intervalo de confianza del 95% de cada métrica"""
+    resumen = {}
+    n = len(resultados)
+    for metrica in resultados[0]['metricas'] if resultados else []:
+        valores = [resultado['metricas'][metrica] for resultado in resultados]
+        media = sum(valores) / n
+        desviacion = statistics.stdev(valores) if n > 1 else 0.0
+        t = T_STUDENT_95[n - 2] if 1 < n <= 31 else 1.96
+        margen = t * desviacion / math.sqrt(n) if n > 1 else 0.0
+        resumen[metrica] = {
+            'media': media,
+            'desviacion': desviacion,
+            'ic95': (media - margen, media + margen)
+        }
+    
+    # Los sketches se combinan para obtener percentiles sobre todas las réplicas juntas
+    sketch = SketchPercentiles()
+    for resultado in resultados:
+        sketch.combinar(SketchPercentiles.importar(resultado['sketch_respuesta']))
+    
+    return {
+        'replicas': n,
+        'metricas': resumen,
+        'tiempo_respuesta_global': sketch.resumen()
+    }
+
+def ejecutar_montecarlo(num_replicas: int = 100, semilla_maestra: int = 0,
+                        procesos: Optional[int] = None, num_nodos: int = 20,
+                        tasa: float = 0.01, duracion: float = 86400.0,
+                        fallas: int = 1, duracion_falla: float = 3600.0) -> Dict:
+    """Ejecutar réplicas independientes en un pool de procesos y combinar sus estadísticas
+    
+    Cada réplica recibe una semilla derivada de semilla_maestra, así que el resultado es
+    reproducible sin importar el número de procesos ni el orden en que terminen.
+    """
+    rng = random.Random(semilla_maestra)
+    tareas = [
+        {
+            'replica': i,
+            'semilla': rng.getrandbits(64),
+            'num_nodos': num_nodos,
+            'tasa': tasa,
+            'duracion': duracion,
+            'fallas': fallas,
+            'duracion_falla': duracion_falla
+        }
+        for i in range(num_replicas)
+    ]
+    
+    if procesos == 1:
+        resultados = [_ejecutar_replica(tarea) for tarea in tareas]
+    else:
+        procesos = procesos or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            bloque = max(1, num_replicas // (procesos * 4))
+            resultados = list(ejecutor.map(_ejecutar_replica, tareas, chunksize=bloque))
+    
+    combinado = combinar_replicas(resultados)
+    combinado['semilla_maestra'] = semilla_maestra
+    return combinado
+
 def demo_simulador():
     """Función de demostración del simulador"""
     print("Iniciando Demo del Simulador de Red LAN para Emergencias")
@@ -0,0 +1,130 @@
+import math
+import random
+
+import pytest
+
+import proyecto
+from proyecto import ArbolBusquedaGeografica, Nodo
+
+
+def _nodos(cantidad, rng, prefijo="N", rejilla=None):
+    """Nodos al azar; con rejilla las coordenadas son enteras y se repiten a menudo"""
+    if rejilla:
+        coordenada = lambda: float(rng.randint(0, rejilla))
+    else:
+        coordenada = lambda: rng.uniform(-10, 10)
+    return [Nodo(f"{prefijo}{i}", "", (coordenada(), coordenada())) for i in range(cantidad)]
+
+
+def _altura(raiz):
+    altura, pila = 0, [(raiz, 1)] if raiz else []
+    while pila:
+        nodo, profundidad = pila.pop()
+        altura = max(altura, profundidad)
+        pila.extend((hijo, profundidad + 1) for hijo in (nodo.izquierda, nodo.derecha) if hijo)
+    return altura
+
+
+def _en_radio(nodos, ubicacion, radio):
+    return sorted(n.id for n in nodos if math.dist(n.ubicacion, ubicacion) <= radio)
+
+
+def _comprobar_busquedas(arbol, nodos, rng, consultas=200):
+    for _ in range(consultas):
+        ubicacion, radio = (rng.uniform(-11, 11), rng.uniform(-11, 11)), rng.uniform(0, 4)
+        assert sorted(n.id for n in arbol.buscar_nodos_cercanos(ubicacion, radio)) == \
+            _en_radio(nodos, ubicacion, radio)
+
+
+@pytest.mark.parametrize("rejilla", [None, 20])
+def test_construccion_balanceada_coincide_con_fuerza_bruta(rejilla):
+    rng = random.Random(1)
+    nodos = _nodos(3000, rng, rejilla=rejilla)
+    arbol = ArbolBusquedaGeografica()
+    arbol.construir(nodos)
+    assert len(arbol) == 3000
+    assert _altura(arbol.raiz) <= math.ceil(math.log2(3001))
+    _comprobar_busquedas(arbol, nodos, rng)
+
+
+def test_construccion_numpy_y_python_dan_la_misma_forma(monkeypatch):
+    if proyecto.np is None:
+        pytest.skip("NumPy no está instalado")
+    rng = random.Random(2)
+    nodos = _nodos(ArbolBusquedaGeografica.UMBRAL_NUMPY + 500, rng, rejilla=30)
+    nodos += [Nodo(f"Z{i}", "", (0.0, 0.0)) for i in range(300)]
+    indices = {nodo.id: i for i, nodo in enumerate(nodos)}
+
+    con_numpy = ArbolBusquedaGeografica()
+    con_numpy.construir(nodos)
+    monkeypatch.setattr(proyecto, 'np', None)
+    sin_numpy = ArbolBusquedaGeografica()
+    sin_numpy.construir(nodos)
+    assert con_numpy.a_preorden(indices) == sin_numpy.a_preorden(indices)
+
+
+def test_inserciones_mantienen_altura_logaritmica():
+    rng = random.Random(3)
+    nodos = _nodos(5000, rng)
+    # Orden creciente por latitud: el peor caso de un árbol sin rebalanceo
+    nodos.sort(key=lambda nodo: nodo.ubicacion)
+    arbol = ArbolBusquedaGeografica()
+    for nodo in nodos:
+        arbol.insertar(nodo)
+    # Profundidad en aristas <= log_{1/alfa}(n) + 1, es decir altura en nodos <= + 2
+    assert _altura(arbol.raiz) <= arbol._altura_maxima() + 2
+    assert arbol.reconstrucciones > 0
+    _comprobar_busquedas(arbol, nodos, rng)
+
+
+def test_ubicaciones_repetidas_no_degeneran():
+    arbol = ArbolBusquedaGeografica()
+    nodos = [Nodo(f"D{i}", "", (0.0, 0.0)) for i in range(4000)]
+    for nodo in nodos:
+        arbol.insertar(nodo)
+    assert _altura(arbol.raiz) <= arbol._altura_maxima() + 2
+    # Con ids únicos ningún rebalanceo deja todos los iguales de un lado
+    assert arbol.reconstrucciones < 1000
+    assert len(arbol.buscar_nodos_cercanos((0.0, 0.0), 0.0)) == 4000
+
+
+def test_copia_de_solo_lectura_con_la_misma_forma():
+    rng = random.Random(4)
+    nodos = _nodos(800, rng)
+    arbol = ArbolBusquedaGeografica()
+    arbol.construir(nodos[:400])
+    for nodo in nodos[400:]:
+        arbol.insertar(nodo)
+    indices = {nodo.id: i for i, nodo in enumerate(nodos)}
+    copia = arbol.copiar()
+    assert copia.a_preorden(indices) == arbol.a_preorden(indices)
+    assert len(copia) == len(arbol)
+    _comprobar_busquedas(copia, nodos, rng, consultas=50)
+
+
+def test_k_mas_cercanos_coincide_con_fuerza_bruta():
+    rng = random.Random(5)
+    nodos = _nodos(2000, rng, rejilla=40)
+    arbol = ArbolBusquedaGeografica()
+    arbol.construir(nodos)
+    for _ in range(200):
+        ubicacion, k = (rng.uniform(-5, 45), rng.uniform(-5, 45)), rng.randint(1, 12)
+        resultado = arbol.k_mas_cercanos(ubicacion, k)
+        distancias = sorted(math.dist(n.ubicacion, ubicacion) for n in nodos)[:k]
+        assert [math.dist(n.ubicacion, ubicacion) for n in resultado] == pytest.approx(distancias)
+        assert len({n.id for n in resultado}) == k
+
+
+def test_k_mas_cercanos_con_filtro():
+    rng = random.Random(6)
+    nodos = _nodos(1000, rng)
+    arbol = ArbolBusquedaGeografica()
+    arbol.construir(nodos)
+    pares = lambda nodo: int(nodo.id[1:]) % 2 == 0
+    for _ in range(100):
+        ubicacion = (rng.uniform(-10, 10), rng.uniform(-10, 10))
+        resultado = arbol.k_mas_cercanos(ubicacion, 3, filtro=pares)
+        esperados = sorted((n for n in nodos if pares(n)), key=lambda n: math.dist(n.ubicacion, ubicacion))[:3]
+        assert [n.id for n in resultado] == [n.id for n in esperados]
+    assert arbol.k_mas_cercanos((0.0, 0.0), 3, filtro=lambda nodo: False) == []
+    assert arbol.k_mas_cercanos((0.0, 0.0), 0) == []
@@ -0,0 +1,35 @@
+import copy
+import json
+
+import benchmark
+
+
+def test_corrida_pequeña_y_comparacion(tmp_path):
+    resultados = benchmark.ejecutar_benchmark([100], semilla=1, repeticiones=1, mostrar=False)
+    assert set(resultados['resultados']) == set(benchmark.PRUEBAS)
+    for por_tamaño in resultados['resultados'].values():
+        assert por_tamaño['100']['operaciones'] > 0
+    json.dumps(resultados)
+
+    base = copy.deepcopy(resultados)
+    base['resultados']['dijkstra']['100']['us_por_op'] /= 2
+    base['resultados']['cola_enlazada']['100']['us_por_op'] *= 2
+    estados = {fila['prueba']: fila['estado'] for fila in benchmark.comparar(resultados, base, 0.25)}
+    assert estados['dijkstra'] == 'regresion'
+    assert estados['cola_enlazada'] == 'mejora'
+    assert estados['tabla_hash_buscar'] == 'igual'
+
+
+def test_main_sale_con_1_ante_una_regresion(tmp_path):
+    salida, base = tmp_path / "resultados.json", tmp_path / "base.json"
+    argumentos = ['--tamaños', '100', '--pruebas', 'tabla_hash_buscar', '--repeticiones', '1',
+                  '--salida', str(salida), '--base', str(base)]
+    assert benchmark.main(argumentos + ['--guardar-base']) == 0
+    documento = json.loads(base.read_text(encoding='utf-8'))
+    documento['resultados']['tabla_hash_buscar']['100']['us_por_op'] /= 1000
+    base.write_text(json.dumps(documento), encoding='utf-8')
+    assert benchmark.main(argumentos) == 1
+
+
+def test_tamaños_por_defecto_pequeños():
+    assert max(benchmark.TAMAÑOS) <= 10 ** 4
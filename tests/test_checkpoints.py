@@ -0,0 +1,128 @@
+import random
+
+from proyecto import (Emergencia, GestorCheckpoints, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo,
+                      TipoEmergencia)
+
+
+def _firma(sim):
+    return (
+        {
+            id_nodo: (nodo.activo, sorted(e.id for e in nodo.emergencias_pendientes),
+                      [(tipo, list(libres)) for tipo, libres in nodo.recursos_libres.items()],
+                      nodo.emergencias_atendidas, nodo.datos_transmitidos, dict(nodo.conexiones))
+            for id_nodo, nodo in sim.nodos.items()
+        },
+        sorted((e.id, e.atendida, e.tiempo_respuesta) for e in sim.tabla_emergencias),
+        [e.id for e in sim.en_espera],
+        sorted((fin, secuencia, id_nodo, recurso.id) for fin, secuencia, id_nodo, recurso in sim.liberaciones),
+        dict(sim.estadisticas), sim.sketch_respuesta.resumen(), sim.rng.getstate()
+    )
+
+
+def _paso(sim, reloj, rng, paso):
+    """Un tramo de actividad: llegadas, una falla o restauración, despacho y avance del reloj"""
+    ids = list(sim.nodos)
+    for i in range(30):
+        sim.registrar_emergencia(Emergencia(
+            f"E{paso}-{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+            (rng.uniform(-10, 10), rng.uniform(-10, 10)), "", timestamp=reloj[0]
+        ))
+    id_nodo = rng.choice(ids)
+    if sim.nodos[id_nodo].activo:
+        sim.simular_falla_nodo(id_nodo)
+    else:
+        sim.restaurar_nodo(id_nodo)
+    if paso % 3 == 0:
+        sim.agregar_conexion(rng.choice(ids), rng.choice(ids), rng.uniform(1, 5))
+    sim.procesar_emergencias(drenar=True)
+    reloj[0] += 1500.0
+
+
+def _simulador():
+    sim = SimuladorRedLAN(semilla=5, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(25)
+    reloj = [0.0]
+    sim.reloj = lambda: reloj[0]
+    return sim, reloj
+
+
+def _con_reloj(sim, instante):
+    reloj = [instante]
+    sim.reloj = lambda: reloj[0]
+    return reloj
+
+
+def test_cadena_de_checkpoints_restaura_cada_estado(tmp_path):
+    sim, reloj = _simulador()
+    gestor = GestorCheckpoints(sim, str(tmp_path), max_incrementales=3)
+    rng = random.Random(0)
+    firmas = {}
+    for paso in range(9):
+        _paso(sim, reloj, rng, paso)
+        gestor.guardar()
+        firmas[gestor.secuencia] = _firma(sim)
+
+    completos = [secuencia for secuencia, completo, _ in GestorCheckpoints.listar(str(tmp_path)) if completo]
+    assert completos == [1, 5, 9]
+    for secuencia, firma in firmas.items():
+        restaurado = GestorCheckpoints.restaurar(str(tmp_path), secuencia, sumideros=[SumideroNulo()])
+        assert _firma(restaurado) == firma
+    assert GestorCheckpoints.cargar_estado(str(tmp_path))['secuencia'] == 9
+
+
+def test_restaurado_continua_igual_que_el_original(tmp_path):
+    sim, reloj = _simulador()
+    gestor = GestorCheckpoints(sim, str(tmp_path))
+    rng = random.Random(1)
+    for paso in range(4):
+        _paso(sim, reloj, rng, paso)
+        gestor.guardar()
+
+    restaurado = GestorCheckpoints.restaurar(str(tmp_path), sumideros=[SumideroNulo()])
+    reloj_restaurado = _con_reloj(restaurado, reloj[0])
+    estado_rng = rng.getstate()
+    for paso in range(4, 8):
+        _paso(sim, reloj, rng, paso)
+    rng.setstate(estado_rng)
+    for paso in range(4, 8):
+        _paso(restaurado, reloj_restaurado, rng, paso)
+    assert _firma(restaurado) == _firma(sim)
+
+
+def test_reanudar_y_compactar(tmp_path):
+    sim, reloj = _simulador()
+    gestor = GestorCheckpoints(sim, str(tmp_path), max_incrementales=4)
+    rng = random.Random(2)
+    for paso in range(3):
+        _paso(sim, reloj, rng, paso)
+        gestor.guardar()
+
+    reanudado = GestorCheckpoints.reanudar(str(tmp_path), max_incrementales=4, sumideros=[SumideroNulo()])
+    assert reanudado.secuencia == 3 and reanudado.incrementales == 2
+    reloj_reanudado = _con_reloj(reanudado.sim, reloj[0])
+    _paso(reanudado.sim, reloj_reanudado, rng, 3)
+    assert reanudado.guardar().endswith('_incremental.pkl')
+    assert _firma(GestorCheckpoints.restaurar(str(tmp_path), sumideros=[SumideroNulo()])) == _firma(reanudado.sim)
+
+    reanudado.compactar()
+    assert [(secuencia, completo) for secuencia, completo, _ in GestorCheckpoints.listar(str(tmp_path))] == \
+        [(5, True)]
+    (tmp_path / "vacio").mkdir()
+    assert GestorCheckpoints.restaurar(str(tmp_path / "vacio")) is None
+
+
+def test_bifurcar_es_independiente():
+    sim, reloj = _simulador()
+    rng = random.Random(3)
+    for paso in range(3):
+        _paso(sim, reloj, rng, paso)
+    firma = _firma(sim)
+
+    copia = sim.bifurcar(sumideros=[SumideroNulo()])
+    assert _firma(copia) == firma
+    _paso(copia, _con_reloj(copia, reloj[0]), random.Random(4), 3)
+    assert _firma(sim) == firma
+
+    # Sin semilla la copia sigue la misma secuencia aleatoria; con semilla diverge
+    igual, distinta = sim.bifurcar(), sim.bifurcar(semilla=99)
+    assert igual.rng.random() == sim.rng.random() != distinta.rng.random()
@@ -0,0 +1,103 @@
+import random
+import threading
+import time
+from collections import defaultdict
+
+from proyecto import Emergencia, PrioridadEmergencia, SimuladorRedLAN, TablaHashConcurrente, TipoEmergencia
+
+
+def _lotes(num_hilos, emergencias_por_hilo, rng):
+    return [
+        [
+            Emergencia(f"H{hilo}-{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+                       (rng.uniform(-10, 10), rng.uniform(-10, 10)), "estres")
+            for i in range(emergencias_por_hilo)
+        ]
+        for hilo in range(num_hilos)
+    ]
+
+
+def _estres(num_hilos=8, emergencias_por_hilo=2000, num_nodos=300, num_fallas=30, semilla=0):
+    """Registrar desde varios hilos mientras otro hace fallar, restaura y agrega nodos"""
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[])
+    sim.generar_topologia_espacial(num_nodos)
+    lotes = _lotes(num_hilos, emergencias_por_hilo, random.Random(semilla))
+    sin_estacion = []
+    barrera = threading.Barrier(num_hilos + 1)
+
+    def productor(lote):
+        barrera.wait()
+        for emergencia in lote:
+            if sim.registrar_emergencia(emergencia) is None:
+                sin_estacion.append(emergencia.id)
+
+    def saboteador():
+        azar = random.Random(semilla + 1)
+        ids = list(sim.nodos)
+        barrera.wait()
+        for i in range(num_fallas):
+            id_nodo = azar.choice(ids)
+            sim.simular_falla_nodo(id_nodo)
+            time.sleep(0.001)
+            sim.restaurar_nodo(id_nodo)
+            if i % 10 == 0:
+                nuevo = f"X{i}"
+                sim.agregar_nodo(nuevo, f"Estación {nuevo}", (azar.uniform(-10, 10), azar.uniform(-10, 10)))
+                sim.agregar_conexion(nuevo, azar.choice(ids), azar.uniform(1, 10))
+
+    with sim.modo_concurrente():
+        hilos = [threading.Thread(target=productor, args=(lote,)) for lote in lotes]
+        hilos.append(threading.Thread(target=saboteador))
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    return sim, lotes, sin_estacion
+
+
+def test_registro_concurrente_sin_perdidas_ni_duplicados():
+    num_hilos, por_hilo = 8, 2000
+    sim, lotes, sin_estacion = _estres(num_hilos, por_hilo)
+
+    total = num_hilos * por_hilo
+    apariciones = defaultdict(int)
+    for nodo in sim.nodos.values():
+        for emergencia in nodo.emergencias_pendientes:
+            apariciones[emergencia.id] += 1
+    for emergencia in sim.en_espera:
+        apariciones[emergencia.id] += 1
+    esperadas = {emergencia.id for lote in lotes for emergencia in lote} - set(sin_estacion)
+
+    assert len(sim.tabla_emergencias) == total
+    assert sim.estadisticas['emergencias_totales'] == total
+    assert esperadas == set(apariciones)
+    assert all(cuenta == 1 for cuenta in apariciones.values())
+
+
+def test_torneo_recalculado_al_salir_del_modo():
+    sim, _, _ = _estres(num_hilos=4, emergencias_por_hilo=1000, num_fallas=10, semilla=3)
+    assert not isinstance(sim.tabla_emergencias, TablaHashConcurrente)
+    for id_nodo, hoja in sim.hoja_torneo.items():
+        assert sim.torneo.claves[hoja] == sim._clave_torneo(sim.nodos[id_nodo])
+
+
+def test_tabla_concurrente_coincide_con_dict():
+    tabla = TablaHashConcurrente(franjas=8, tamaño=64)
+    lotes = _lotes(4, 3000, random.Random(5))
+
+    def trabajar(lote):
+        for emergencia in lote:
+            tabla.insertar(emergencia)
+        for emergencia in lote[::2]:
+            tabla.eliminar(emergencia.id)
+
+    hilos = [threading.Thread(target=trabajar, args=(lote,)) for lote in lotes]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    quedan = {emergencia.id: emergencia for lote in lotes for emergencia in lote[1::2]}
+    assert len(tabla) == len(quedan)
+    assert all(tabla.buscar(id_emergencia) is emergencia for id_emergencia, emergencia in quedan.items())
+    assert tabla.buscar(lotes[0][0].id) is None
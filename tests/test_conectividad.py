@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+import proyecto
+from proyecto import SimuladorRedLAN, SumideroNulo
+
+
+def _red_dispersa(num_nodos, semilla):
+    """Bosque aleatorio más unos pocos ciclos: muchos puntos de articulación y puentes"""
+    rng = random.Random(semilla)
+    sim = SimuladorRedLAN(sumideros=[SumideroNulo()])
+    ids = [f"N{i:03d}" for i in range(num_nodos)]
+    for id_nodo in ids:
+        sim.agregar_nodo(id_nodo, id_nodo, (rng.uniform(-10, 10), rng.uniform(-10, 10)))
+    for i in range(1, num_nodos):
+        if rng.random() < 0.9:
+            sim.agregar_conexion(ids[i], ids[rng.randrange(i)], rng.uniform(1, 5))
+    for _ in range(num_nodos // 10):
+        u, v = rng.sample(ids, 2)
+        sim.agregar_conexion(u, v, rng.uniform(1, 5))
+    return sim, rng
+
+
+def _componentes(sim, sin_nodo=None, sin_arista=None):
+    """Componentes de los nodos activos por recorrido simple"""
+    vistos, componentes = set(), []
+    for inicio, nodo in sim.nodos.items():
+        if inicio in vistos or not nodo.activo or inicio == sin_nodo:
+            continue
+        componente, pila = [], [inicio]
+        vistos.add(inicio)
+        while pila:
+            u = pila.pop()
+            componente.append(u)
+            for v in sim.grafo[u]:
+                if v in vistos or v == sin_nodo or not sim.nodos[v].activo or {u, v} == sin_arista:
+                    continue
+                vistos.add(v)
+                pila.append(v)
+        componentes.append(componente)
+    return componentes
+
+
+def _piezas_sin(sim, id_nodo):
+    """Piezas en que queda la componente de id_nodo si se lo quita"""
+    propia = set(next(c for c in _componentes(sim) if id_nodo in c))
+    return [c for c in _componentes(sim, sin_nodo=id_nodo) if set(c) <= propia], propia
+
+
+def _comprobar_analisis(sim):
+    base = len(_componentes(sim))
+    analisis = sim.analizar_puntos_criticos()
+    activos = [id_nodo for id_nodo, nodo in sim.nodos.items() if nodo.activo]
+    esperados = {}
+    for id_nodo in activos:
+        piezas, _ = _piezas_sin(sim, id_nodo)
+        if len(piezas) > 1:
+            esperados[id_nodo] = sorted((len(pieza) for pieza in piezas), reverse=True)
+    assert analisis['puntos_articulacion'] == esperados
+
+    puentes = {
+        frozenset((u, v)) for u in activos for v in sim.grafo[u]
+        if u < v and sim.nodos[v].activo and len(_componentes(sim, sin_arista={u, v})) > base
+    }
+    assert {frozenset(puente) for puente in analisis['puentes']} == puentes
+    assert len(analisis['puentes']) == len(puentes)
+
+    for id_nodo in list(esperados)[:10]:
+        impacto = sim.impacto_falla(id_nodo)
+        assert impacto['articulacion'] and impacto['piezas'] == esperados[id_nodo]
+        piezas, propia = _piezas_sin(sim, id_nodo)
+        assert set(impacto['desconectados']) == propia - set(max(piezas, key=len)) - {id_nodo}
+
+
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_puntos_de_articulacion_y_puentes_contra_fuerza_bruta(semilla):
+    sim, rng = _red_dispersa(120, semilla)
+    _comprobar_analisis(sim)
+    assert sim.analizar_puntos_criticos()['puntos_articulacion'] and sim.analizar_puntos_criticos()['puentes']
+    for id_nodo in rng.sample(list(sim.nodos), 10):
+        sim.simular_falla_nodo(id_nodo)
+    _comprobar_analisis(sim)
+    assert sim.impacto_falla("N999") == {'articulacion': False, 'piezas': [], 'desconectados': []}
+
+
+@pytest.mark.parametrize("con_numpy", [True, False])
+def test_alcanzabilidad_incremental(con_numpy, monkeypatch):
+    if con_numpy and proyecto.np is None:
+        pytest.skip("NumPy no está instalado")
+    if not con_numpy:
+        monkeypatch.setattr(proyecto, 'np', None)
+    sim, rng = _red_dispersa(150, 3)
+    ids = list(sim.nodos)
+    for paso in range(200):
+        accion = rng.random()
+        id_nodo = rng.choice(ids)
+        if accion < 0.3:
+            if sim.nodos[id_nodo].activo:
+                if paso % 2:
+                    sim.analizar_puntos_criticos()  # Con el análisis al día se conserva el union-find
+                sim.simular_falla_nodo(id_nodo)
+            else:
+                sim.restaurar_nodo(id_nodo)
+        elif accion < 0.4:
+            sim.agregar_conexion(id_nodo, rng.choice(ids), rng.uniform(1, 5))
+
+        componente = {u: i for i, c in enumerate(_componentes(sim)) for u in c}
+        for _ in range(5):
+            a, b = rng.choice(ids), rng.choice(ids)
+            esperado = a in componente and b in componente and componente[a] == componente[b]
+            assert sim.estan_conectados(a, b) == esperado
+    assert not sim.estan_conectados("N000", "NXX")
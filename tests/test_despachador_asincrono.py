@@ -0,0 +1,101 @@
+import asyncio
+import random
+
+import pytest
+
+from proyecto import (DespachadorAsincrono, Emergencia, ModeloServicio, PrioridadEmergencia, Recurso,
+                      SimuladorRedLAN, SumideroNulo, TipoEmergencia, generar_emergencias_poisson)
+
+
+def _simulador(num_nodos=20, semilla=0):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos)
+    # Servicios de pocos segundos virtuales: con escala 0.001 son milisegundos reales
+    sim.modelo_servicio = ModeloServicio(escala=0.001)
+    return sim
+
+
+def _atendidas_en_orden(sim):
+    orden = []
+    original = sim._registrar_atencion
+
+    def registrar(nodo, emergencia, instante, recurso=None):
+        orden.append((nodo.id, emergencia))
+        original(nodo, emergencia, instante, recurso)
+    sim._registrar_atencion = registrar
+    return orden
+
+
+def test_escala_invalida():
+    with pytest.raises(ValueError):
+        DespachadorAsincrono(_simulador(num_nodos=2), escala_tiempo=0)
+
+
+def test_un_recurso_atiende_en_orden_de_prioridad():
+    sim = SimuladorRedLAN(semilla=1, sumideros=[SumideroNulo()])
+    sim.agregar_nodo("N1", "Uno", (0.0, 0.0))
+    sim.nodos["N1"].agregar_recurso(Recurso("R1", 'ambulancia', (0.0, 0.0)))
+    sim.modelo_servicio = ModeloServicio(escala=0.001)
+    rng = random.Random(1)
+    for i in range(30):
+        sim.registrar_emergencia(Emergencia(f"E{i}", TipoEmergencia.MEDICA, rng.choice(list(PrioridadEmergencia)),
+                                            (0.0, 0.0), "", timestamp=float(rng.randint(0, 5))))
+    clave = lambda emergencia: (emergencia.prioridad.value, emergencia.timestamp)
+    esperado = sorted(map(clave, sim.nodos["N1"].emergencias_pendientes))
+    orden = _atendidas_en_orden(sim)
+
+    resultado = asyncio.run(DespachadorAsincrono(sim, escala_tiempo=0.001).ejecutar())
+    assert resultado['despachadas'] == 30
+    assert [clave(emergencia) for _, emergencia in orden] == esperado
+
+
+def test_llegadas_en_tiempo_virtual_y_limpieza():
+    sim = _simulador()
+    llegadas = list(generar_emergencias_poisson(0.5, 0.0, 200.0, (-10, 10, -10, 10), rng=random.Random(2)))
+    orden = _atendidas_en_orden(sim)
+    reloj_previo = sim.reloj
+    despachador = DespachadorAsincrono(sim, escala_tiempo=0.0005, factor_latencia=0.1)
+
+    resultado = asyncio.run(despachador.ejecutar(llegadas))
+
+    ids = [emergencia.id for _, emergencia in orden]
+    assert len(ids) == len(set(ids)) == len(llegadas) == resultado['despachadas']
+    assert all(emergencia.tiempo_respuesta >= 0 for _, emergencia in orden)
+    assert resultado['reloj_virtual'] >= llegadas[-1].timestamp
+    assert resultado['reportes_entregados'] > 0
+    assert resultado['latencia_reportes']['p50'] >= 0.1 * min(
+        peso for conexiones in sim.grafo.values() for peso in conexiones.values()
+    ) * 0.99
+    # Al terminar el simulador vuelve a su reloj y a sus avisos de siempre
+    assert sim.reloj is reloj_previo
+    assert all(nodo.al_cambiar == sim._actualizar_torneo for nodo in sim.nodos.values())
+    assert not despachador.consumidores and not despachador.envios
+
+
+def test_falla_cancela_al_consumidor_y_reparte_su_cola():
+    sim = _simulador(semilla=3)
+    llegadas = list(generar_emergencias_poisson(2.0, 0.0, 100.0, (-10, 10, -10, 10), rng=random.Random(3)))
+    orden = _atendidas_en_orden(sim)
+    despachador = DespachadorAsincrono(sim, escala_tiempo=0.0005, tiempo_despacho=1.0, factor_latencia=5.0)
+    despachador.programar_falla("N01", 30.0, duracion=40.0)
+    despachador.programar_falla("N02", 50.0)
+    cambios = {}
+    for nombre in ('fallar', 'restaurar'):
+        def registrar(id_nodo, original=getattr(despachador, nombre), nombre=nombre):
+            cambios[nombre, id_nodo] = despachador.obtener_ahora()
+            return original(id_nodo)
+        setattr(despachador, nombre, registrar)
+
+    resultado = asyncio.run(despachador.ejecutar(llegadas, hasta=2000.0))
+
+    assert not sim.nodos["N02"].activo and sim.nodos["N01"].activo
+    ids = [emergencia.id for _, emergencia in orden]
+    assert len(ids) == len(set(ids)) == len(llegadas)
+    # Entre su falla y su restauración (o para siempre) el nodo no despacha nada
+    caido = (cambios['fallar', "N01"], cambios['restaurar', "N01"])
+    assert 30.0 <= caido[0] < caido[1]
+    for id_nodo, emergencia in orden:
+        instante = emergencia.timestamp + emergencia.tiempo_respuesta
+        assert not (id_nodo == "N01" and caido[0] < instante < caido[1])
+        assert not (id_nodo == "N02" and instante > cambios['fallar', "N02"])
+    assert resultado['envios_cancelados'] > 0
@@ -0,0 +1,78 @@
+import random
+
+from proyecto import Emergencia, Nodo, PrioridadEmergencia, Recurso, SimuladorRedLAN, SumideroNulo, TipoEmergencia
+
+
+def _comprobar_libres(nodo):
+    libres = {r.id for lista in nodo.recursos_libres.values() for r in lista.values()}
+    assert libres == {r.id for r in nodo.recursos if r.disponible}
+    assert nodo.num_recursos_disponibles == len(libres)
+
+
+def test_tomar_recurso_prefiere_el_tipo_adecuado():
+    nodo = Nodo("N1", "", (0.0, 0.0))
+    for i, tipo in enumerate(['ambulancia', 'bombero', 'policia'] * 2):
+        nodo.agregar_recurso(Recurso(f"R{i}", tipo, (0.0, 0.0)))
+
+    assert nodo.tomar_recurso(TipoEmergencia.INCENDIO).tipo == 'bombero'
+    assert nodo.tomar_recurso(TipoEmergencia.INCENDIO).tipo == 'bombero'
+    # Sin bomberos libres se usa cualquier otro recurso
+    assert nodo.tomar_recurso(TipoEmergencia.INCENDIO).tipo in ('ambulancia', 'policia')
+    _comprobar_libres(nodo)
+    assert nodo.tomar_recurso(TipoEmergencia.ROBO).tipo == 'policia'
+    while nodo.tomar_recurso(TipoEmergencia.MEDICA):
+        pass
+    assert nodo.num_recursos_disponibles == 0 and not nodo.recursos_disponibles()
+
+    nodo.liberar_recurso(nodo.recursos[1])
+    nodo.liberar_recurso(nodo.recursos[1])  # Liberar dos veces no cuenta doble
+    _comprobar_libres(nodo)
+    assert nodo.tomar_recurso(TipoEmergencia.MEDICA) is nodo.recursos[1]
+
+
+def _simulador(semilla):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(30)
+    sim.reloj = lambda: 0.0
+    rng = random.Random(semilla)
+    for nodo in sim.nodos.values():
+        for i in range(rng.randint(0, 8)):
+            sim.registrar_emergencia(Emergencia(
+                f"{nodo.id}-{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+                nodo.ubicacion, "", timestamp=-rng.uniform(0, 100)
+            ))
+    return sim
+
+
+def test_drenar_atiende_las_mas_prioritarias_de_cada_nodo():
+    sim = _simulador(1)
+    pendientes = {id_nodo: sorted(nodo.emergencias_pendientes) for id_nodo, nodo in sim.nodos.items()}
+    libres = {id_nodo: nodo.num_recursos_disponibles for id_nodo, nodo in sim.nodos.items()}
+    # Un nodo con cola y sin recursos libres se omite sin tocar su cola
+    sin_recursos = next(nodo for nodo in sim.nodos.values() if len(nodo.emergencias_pendientes) > 1)
+    while sin_recursos.tomar_recurso():
+        pass
+    libres[sin_recursos.id] = 0
+    cola_intacta = list(sin_recursos.emergencias_pendientes)
+
+    resumen = sim.procesar_emergencias(drenar=True)
+
+    assert sin_recursos.emergencias_pendientes == cola_intacta
+    assert resumen['nodos_sin_recursos'] >= 1
+    for id_nodo, cola in pendientes.items():
+        esperadas = cola[:libres[id_nodo]]
+        assert resumen['por_nodo'].get(id_nodo, 0) == len(esperadas)
+        assert all(e.atendida for e in esperadas)
+        assert not any(e.atendida for e in cola[len(esperadas):])
+        _comprobar_libres(sim.nodos[id_nodo])
+    assert resumen['despachadas'] == sum(resumen['por_nodo'].values()) == sum(resumen['por_recurso'].values())
+
+
+def test_drenar_equivale_a_procesar_de_a_una():
+    drenado, de_a_una = _simulador(2), _simulador(2)
+    drenado.procesar_emergencias(drenar=True)
+    while de_a_una.procesar_emergencias()['despachadas']:
+        pass
+    atendidas = lambda sim: {e.id for e in sim.tabla_emergencias if e.atendida}
+    assert atendidas(drenado) == atendidas(de_a_una)
+    assert drenado.estadisticas['emergencias_atendidas'] == de_a_una.estadisticas['emergencias_atendidas']
@@ -0,0 +1,47 @@
+import random
+
+from proyecto import Emergencia, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo, TipoEmergencia
+
+
+def _clave(emergencia):
+    return (emergencia.prioridad.value, emergencia.timestamp)
+
+
+def test_cabeza_del_heap_es_la_mas_antigua_a_igual_prioridad():
+    sim = SimuladorRedLAN(semilla=1, sumideros=[SumideroNulo()])
+    sim.agregar_nodo("N1", "Estación 1", (0.0, 0.0))
+    # Llegan en orden inverso de antigüedad y todas con la misma prioridad
+    for i in range(50):
+        sim.registrar_emergencia(Emergencia(f"E{i}", TipoEmergencia.ROBO, PrioridadEmergencia.ALTA,
+                                            (0.0, 0.0), "", timestamp=100.0 - i))
+    assert sim.nodos["N1"].emergencias_pendientes[0].id == "E49"
+
+
+def test_despacho_global_por_prioridad_y_antiguedad():
+    sim = SimuladorRedLAN(semilla=2, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(30)
+    rng = random.Random(2)
+    ubicaciones = [nodo.ubicacion for nodo in sim.nodos.values()]
+    for i in range(400):
+        lat, lon = rng.choice(ubicaciones)
+        sim.registrar_emergencia(Emergencia(
+            f"E{i}", rng.choice(list(TipoEmergencia)),
+            rng.choice([PrioridadEmergencia.CRITICA, PrioridadEmergencia.ALTA]),
+            (lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.01, 0.01)), "",
+            timestamp=rng.uniform(0, 1000)
+        ))
+
+    despachadas = 0
+    while True:
+        candidatas = [
+            emergencia
+            for nodo in sim.nodos.values() if nodo.activo and nodo.num_recursos_disponibles
+            for emergencia in nodo.emergencias_pendientes if not emergencia.atendida
+        ]
+        if not candidatas:
+            break
+        esperada = min(candidatas, key=_clave)
+        assert sim.despachar_global(max_despachos=1)['despachadas'] == 1
+        assert esperada.atendida
+        despachadas += 1
+    assert despachadas > 20
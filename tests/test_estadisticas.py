@@ -0,0 +1,84 @@
+import json
+import math
+import random
+
+import pytest
+
+from proyecto import (Emergencia, PrioridadEmergencia, SimuladorRedLAN, SketchPercentiles, SumideroNulo,
+                      TipoEmergencia)
+
+
+def _exacto(valores, q):
+    return sorted(valores)[math.floor(q * (len(valores) - 1))]
+
+
+@pytest.mark.parametrize("distribucion", ['exponencial', 'lognormal', 'con_ceros'])
+def test_percentiles_con_error_relativo_acotado(distribucion):
+    rng = random.Random(0)
+    if distribucion == 'exponencial':
+        valores = [rng.expovariate(1 / 300) for _ in range(20000)]
+    elif distribucion == 'lognormal':
+        valores = [rng.lognormvariate(3, 2) for _ in range(20000)]
+    else:
+        valores = [0.0] * 3000 + [rng.uniform(0.001, 5) for _ in range(7000)]
+    sketch = SketchPercentiles(precision=0.01)
+    for valor in valores:
+        sketch.agregar(valor)
+
+    for q in (0.0, 0.1, 0.5, 0.9, 0.95, 0.99, 1.0):
+        exacto = _exacto(valores, q)
+        assert sketch.percentil(q) == pytest.approx(exacto, rel=0.01, abs=1e-12)
+    assert sketch.promedio() == pytest.approx(sum(valores) / len(valores))
+    assert SketchPercentiles().percentil(0.5) is None
+
+
+def test_combinar_y_exportar_equivalen_a_un_solo_sketch():
+    rng = random.Random(1)
+    valores = [rng.expovariate(0.01) for _ in range(5000)]
+    total, partes = SketchPercentiles(), [SketchPercentiles() for _ in range(4)]
+    for i, valor in enumerate(valores):
+        total.agregar(valor)
+        partes[i % 4].agregar(valor)
+
+    combinado = SketchPercentiles()
+    for parte in partes:
+        # Ida y vuelta por JSON, como entre procesos o en un checkpoint
+        combinado.combinar(SketchPercentiles.importar(json.loads(json.dumps(parte.exportar()))))
+    assert combinado.resumen() == pytest.approx(total.resumen())
+    assert dict(combinado.cubetas) == dict(total.cubetas)
+
+
+def test_estadisticas_incrementales_coinciden_con_recalcularlas():
+    sim = SimuladorRedLAN(semilla=2, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(40)
+    reloj = [1000.0]
+    sim.reloj = lambda: reloj[0]
+    rng = random.Random(2)
+    ubicaciones = [nodo.ubicacion for nodo in sim.nodos.values()]
+    for ronda in range(5):
+        for i in range(100):
+            sim.registrar_emergencia(Emergencia(
+                f"E{ronda}-{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+                rng.choice(ubicaciones), "", timestamp=reloj[0] - rng.uniform(0, 600)
+            ))
+        sim.procesar_emergencias(drenar=True)
+        reloj[0] += 4000.0
+
+    atendidas = [e for e in sim.tabla_emergencias if e.atendida]
+    estadisticas = sim.obtener_estadisticas()
+    general = estadisticas['general']
+    assert general['emergencias_totales'] == 500
+    assert general['emergencias_atendidas'] == len(atendidas) > 0
+    tiempos = [e.tiempo_respuesta for e in atendidas]
+    assert general['tiempo_respuesta_promedio'] == pytest.approx(sum(tiempos) / len(tiempos))
+    assert estadisticas['tiempo_respuesta']['general']['p50'] == pytest.approx(_exacto(tiempos, 0.5), rel=0.01)
+
+    for tipo in TipoEmergencia:
+        del_tipo = [e.tiempo_respuesta for e in atendidas if e.tipo == tipo]
+        if del_tipo:
+            assert estadisticas['tiempo_respuesta']['por_tipo'][tipo.value]['cuenta'] == len(del_tipo)
+    for id_nodo, datos in estadisticas['nodos'].items():
+        nodo = sim.nodos[id_nodo]
+        assert datos['emergencias_pendientes'] == len(nodo.emergencias_pendientes)
+        assert datos['emergencias_atendidas'] == nodo.emergencias_atendidas
+    assert sum(datos['emergencias_atendidas'] for datos in estadisticas['nodos'].values()) == len(atendidas)
@@ -0,0 +1,106 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from proyecto import (IngestaEmergencias, PrioridadEmergencia, SimuladorRedLAN, SumideroMemoria, TipoEmergencia,
+                      emergencia_desde_registro)
+
+
+def _lineas(cantidad, inicio=0, ubicacion=(0.0, 0.0), paso=0.0):
+    return [
+        json.dumps({'id': f"E{i}", 'tipo': 'medica', 'prioridad': 'ALTA', 'ubicacion': list(ubicacion),
+                    'timestamp': 1000.0 + i * paso}) + '\n'
+        for i in range(inicio, inicio + cantidad)
+    ]
+
+
+def _simulador(num_nodos=10):
+    memoria = SumideroMemoria()
+    sim = SimuladorRedLAN(semilla=0, sumideros=[memoria])
+    sim.generar_topologia_espacial(num_nodos)
+    return sim, memoria
+
+
+def test_formatos_de_registro():
+    a = emergencia_desde_registro({'id': 7, 'tipo': 'INCENDIO', 'prioridad': 1, 'lat': '1.5', 'lon': 2})
+    b = emergencia_desde_registro({'id': "7", 'tipo': 'incendio', 'prioridad': 'CRITICA',
+                                   'ubicacion': [1.5, 2.0], 'timestamp': 5}, reloj=lambda: 0.0)
+    assert (a.id, a.tipo, a.prioridad, a.ubicacion) == ("7", TipoEmergencia.INCENDIO, PrioridadEmergencia.CRITICA,
+                                                        (1.5, 2.0))
+    assert (b.id, b.tipo, b.prioridad, b.ubicacion, b.timestamp) == (a.id, a.tipo, a.prioridad, a.ubicacion, 5.0)
+    with pytest.raises(KeyError):
+        emergencia_desde_registro({'id': 1, 'tipo': 'medica', 'prioridad': 'URGENTE', 'lat': 0, 'lon': 0})
+
+
+def test_ingesta_desde_archivo_con_registros_invalidos(tmp_path):
+    sim, memoria = _simulador()
+    ruta = tmp_path / "emergencias.ndjson"
+    lineas = _lineas(2500)
+    lineas[10:10] = ["{no es json\n", "\n", '{"id": "X", "tipo": "otro", "prioridad": 1, "lat": 0, "lon": 0}\n',
+                     '{"id": "Y"}\n']
+    ruta.write_text(''.join(lineas), encoding='utf-8')
+
+    resultado = IngestaEmergencias(sim, str(ruta), tamaño_lote=1000, limite_cola=10**6).ejecutar()
+    assert resultado['leidos'] == 2503 and resultado['errores'] == 3
+    assert resultado['registrados'] == len(sim.tabla_emergencias) == 2500
+    assert resultado['lotes'] == 3
+    assert sum(1 for _, _, tipo, _ in memoria.eventos if tipo == 'registro_invalido') == 3
+
+
+def test_max_registros_y_socket():
+    sim, _ = _simulador()
+    lector, escritor = socket.socketpair()
+    datos = ''.join(_lineas(300)).encode('utf-8')
+
+    def enviar():
+        with escritor:
+            escritor.sendall(datos)
+
+    hilo = threading.Thread(target=enviar)
+    hilo.start()
+    with lector:
+        resultado = IngestaEmergencias(sim, lector, tamaño_lote=64).ejecutar(max_registros=250)
+    hilo.join()
+    assert resultado['registrados'] == 250 and len(sim.tabla_emergencias) == 250
+
+
+def test_contrapresion_detiene_la_lectura_hasta_aliviar():
+    sim, _ = _simulador(num_nodos=1)
+    nodo = next(iter(sim.nodos.values()))
+    maximos = []
+
+    def aliviar():
+        # Atender la mitad de la cola sin depender de los recursos
+        maximos.append(len(nodo.emergencias_pendientes))
+        for _ in range(len(nodo.emergencias_pendientes) // 2):
+            nodo.obtener_emergencia_prioritaria()
+        return {'despachadas': 1}
+
+    ingesta = IngestaEmergencias(sim, _lineas(5000), tamaño_lote=100, limite_cola=300, aliviar=aliviar)
+    resultado = ingesta.ejecutar()
+    assert resultado['registrados'] == 5000
+    assert resultado['contrapresiones'] > 0
+    # La lectura se detiene con la cola a lo sumo un lote por encima del límite
+    assert max(maximos) <= 300 + 100
+    assert len(nodo.emergencias_pendientes) <= 300
+
+
+def test_contrapresion_sin_progreso_se_agota():
+    sim, memoria = _simulador(num_nodos=1)
+    ingesta = IngestaEmergencias(sim, _lineas(50), tamaño_lote=50, limite_cola=10,
+                                 aliviar=lambda: {'despachadas': 0}, pausa=0.001, max_espera=0.02)
+    resultado = ingesta.ejecutar()
+    assert resultado['registrados'] == 50 and resultado['contrapresiones'] == 1
+    assert resultado['tiempo_en_contrapresion'] >= 0.02
+    assert [tipo for _, _, tipo, _ in memoria.eventos if tipo == 'contrapresion_agotada'] == ['contrapresion_agotada']
+
+
+def test_reproduccion_respeta_los_timestamps():
+    sim, _ = _simulador()
+    # 20 registros a lo largo de 1,9 s de calendario, reproducidos 10 veces más rápido
+    resultado = IngestaEmergencias(sim, _lineas(20, paso=0.1), tamaño_lote=5, velocidad=10.0,
+                                   limite_cola=10**6).ejecutar()
+    assert resultado['duracion'] >= 0.19
+    assert resultado['retraso_maximo'] < 0.5
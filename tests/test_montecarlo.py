@@ -0,0 +1,47 @@
+import statistics
+
+import pytest
+
+from proyecto import SketchPercentiles, _ejecutar_replica, combinar_replicas, ejecutar_montecarlo
+
+PARAMETROS = dict(num_replicas=6, semilla_maestra=7, num_nodos=10, tasa=0.02, duracion=7200.0,
+                  fallas=1, duracion_falla=1800.0)
+
+
+def test_resultado_independiente_del_numero_de_procesos():
+    secuencial = ejecutar_montecarlo(procesos=1, **PARAMETROS)
+    paralelo = ejecutar_montecarlo(procesos=2, **PARAMETROS)
+    assert secuencial == paralelo
+    assert secuencial['replicas'] == 6 and secuencial['semilla_maestra'] == 7
+    assert ejecutar_montecarlo(procesos=1, **{**PARAMETROS, 'semilla_maestra': 8}) != secuencial
+
+
+def test_replica_reproducible():
+    parametros = {'replica': 0, 'semilla': 12345, 'num_nodos': 10, 'tasa': 0.02, 'duracion': 3600.0,
+                  'fallas': 2, 'duracion_falla': 600.0}
+    resultado = _ejecutar_replica(parametros)
+    assert resultado == _ejecutar_replica(parametros)
+    metricas = resultado['metricas']
+    assert 0 < metricas['emergencias_atendidas'] <= metricas['emergencias_totales']
+    assert metricas['tasa_atencion'] == metricas['emergencias_atendidas'] / metricas['emergencias_totales']
+
+
+def test_combinar_replicas():
+    resultados = []
+    for i, x in enumerate((1.0, 2.0, 4.0, 7.0)):
+        sketch = SketchPercentiles()
+        for valor in range(i * 10, i * 10 + 10):
+            sketch.agregar(float(valor))
+        resultados.append({'metricas': {'x': x}, 'sketch_respuesta': sketch.exportar()})
+
+    combinado = combinar_replicas(resultados)
+    x = combinado['metricas']['x']
+    assert x['media'] == pytest.approx(3.5)
+    assert x['desviacion'] == pytest.approx(statistics.stdev([1.0, 2.0, 4.0, 7.0]))
+    margen = 3.182 * x['desviacion'] / 2  # t de 3 grados de libertad
+    assert x['ic95'] == pytest.approx((3.5 - margen, 3.5 + margen))
+    assert combinado['tiempo_respuesta_global']['cuenta'] == 40
+    assert combinado['tiempo_respuesta_global']['promedio'] == pytest.approx(19.5)
+
+    una = combinar_replicas(resultados[:1])['metricas']['x']
+    assert una['desviacion'] == 0.0 and una['ic95'] == (1.0, 1.0)
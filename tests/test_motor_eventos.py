@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from proyecto import (Emergencia, MotorEventos, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo, TipoEmergencia,
+                      generar_emergencias_poisson)
+
+
+def _motor(semilla=0, num_nodos=40, **opciones):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos)
+    motor = MotorEventos(sim, destino_reportes="N01", **opciones)
+    motor.programar_flujo(generar_emergencias_poisson(
+        0.05, 0.0, 20000.0, (-10, 10, -10, 10), rng=random.Random(semilla)
+    ))
+    return sim, motor
+
+
+def _firma(sim, motor):
+    return (
+        sorted((e.id, e.atendida, e.tiempo_respuesta) for e in sim.tabla_emergencias),
+        motor.reportes_entregados, motor.reportes_perdidos, motor.ahora
+    )
+
+
+def test_llegadas_despachos_y_reloj_virtual():
+    sim, motor = _motor()
+    instantes = []
+    original = sim._registrar
+    sim._registrar = lambda emergencia: instantes.append(motor.ahora) or original(emergencia)
+    resultado = motor.ejecutar()
+
+    assert instantes == sorted(instantes)
+    assert len(instantes) == len(sim.tabla_emergencias) == sim.estadisticas['emergencias_totales'] > 0
+    atendidas = [e for e in sim.tabla_emergencias if e.atendida]
+    assert resultado['despachadas'] == len(atendidas) == sim.estadisticas['emergencias_atendidas']
+    assert all(e.tiempo_respuesta >= 0 for e in atendidas)
+    # Con la cola agotada cada recurso ocupado termina liberándose
+    assert not sim.liberaciones
+    assert resultado['eventos_por_tipo']['liberacion'] == len(atendidas)
+    assert motor.reportes_entregados + motor.reportes_perdidos == \
+        len(atendidas) - sim.nodos["N01"].emergencias_atendidas
+
+
+def test_latencia_de_reporte_es_el_costo_de_la_ruta():
+    sim = SimuladorRedLAN(semilla=1, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(30)
+    motor = MotorEventos(sim, destino_reportes="N01", factor_latencia=2.5)
+    origen = sim.nodos["N20"]
+    motor.programar_llegada(Emergencia("E1", TipoEmergencia.MEDICA, PrioridadEmergencia.ALTA,
+                                       origen.ubicacion, "", timestamp=100.0))
+    motor.ejecutar()
+
+    assert sim.tabla_emergencias.buscar("E1").tiempo_respuesta == 0.0
+    assert motor.reportes_entregados == 1
+    _, costo = sim.dijkstra("N20", "N01")
+    assert motor.sketch_latencia.percentil(0.5) == pytest.approx(costo * 2.5, rel=0.01)
+
+
+def test_falla_del_destino_pierde_los_reportes_en_la_ventana():
+    sim, motor = _motor(semilla=2)
+    motor.programar_falla("N01", 5000.0, duracion=5000.0)
+    resultado = motor.ejecutar(hasta=7000.0)
+    assert not sim.nodos["N01"].activo and resultado['reloj_virtual'] <= 7000.0
+    assert motor.reportes_perdidos > 0
+    entregados = motor.reportes_entregados
+    resultado = motor.ejecutar()
+    assert sim.nodos["N01"].activo
+    assert resultado['eventos_por_tipo']['falla'] == resultado['eventos_por_tipo']['restauracion'] == 1
+    # Tras la restauración los reportes vuelven a llegar
+    assert motor.reportes_entregados > entregados
+
+
+def test_ejecutar_por_tramos_da_lo_mismo_que_de_una_vez():
+    sim_entero, entero = _motor(semilla=3)
+    entero.programar_falla("N05", 3000.0, duracion=2000.0)
+    entero.ejecutar()
+
+    sim_tramos, tramos = _motor(semilla=3)
+    tramos.programar_falla("N05", 3000.0, duracion=2000.0)
+    for limite in (1000.0, 4000.0, 12000.0):
+        assert tramos.ejecutar(hasta=limite)['reloj_virtual'] <= limite
+    tramos.ejecutar(max_eventos=50)
+    tramos.ejecutar()
+
+    assert _firma(sim_tramos, tramos) == _firma(sim_entero, entero)
@@ -0,0 +1,101 @@
+import random
+from collections import defaultdict
+
+import pytest
+
+from proyecto import (Emergencia, PrioridadEmergencia, PropagacionDatos, Recurso, SimuladorRedLAN, SumideroMemoria,
+                      SumideroNulo, TipoEmergencia)
+
+
+def _simulador(num_nodos=80, semilla=0):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos)
+    return sim
+
+
+def _referencia(sim, mensajes, destino, ancho_banda):
+    """Un lote mensaje por mensaje: cada enlace de cada ruta lleva una cabecera y la suma de sus cargas"""
+    por_enlace = defaultdict(int)
+    rutas = {}
+    for origen, cantidad_bytes in mensajes:
+        ruta, costo = sim.dijkstra(origen, destino)
+        if costo == float('inf'):
+            continue
+        rutas[origen] = ruta
+        for u, v in zip(ruta, ruta[1:]):
+            por_enlace[u, v] += cantidad_bytes
+    enlaces = {enlace: cantidad + PropagacionDatos.CABECERA for enlace, cantidad in por_enlace.items()}
+    latencias = {
+        origen: sum(sim.grafo[u][v] + enlaces[u, v] / ancho_banda for u, v in zip(ruta, ruta[1:]))
+        for origen, ruta in rutas.items()
+    }
+    return enlaces, latencias
+
+
+def test_lote_coincide_con_el_envio_por_rutas():
+    sim = _simulador()
+    rng = random.Random(0)
+    ids = list(sim.nodos)
+    for id_nodo in rng.sample(ids[5:], 8):
+        sim.simular_falla_nodo(id_nodo)
+    activos = [id_nodo for id_nodo in ids if sim.nodos[id_nodo].activo]
+    mensajes = [(rng.choice(activos), rng.randint(50, 500)) for _ in range(300)]
+
+    propagacion = sim.configurar_propagacion(destinos=["N01"], ancho_banda=1000.0, tamaño_lote=10**6)
+    for origen, cantidad_bytes in mensajes:
+        propagacion.encolar(origen, cantidad_bytes)
+    transmisiones = propagacion.vaciar()
+
+    enlaces, latencias = _referencia(sim, mensajes, "N01", 1000.0)
+    assert transmisiones == len(enlaces)
+    assert {enlace: datos[0] for enlace, datos in propagacion.enlaces.items()} == enlaces
+    for origen, latencia in latencias.items():
+        registro = propagacion.por_nodo[origen]
+        assert registro['latencia'] / registro['mensajes'] == pytest.approx(latencia)
+    assert propagacion.estadisticas['bytes_enlaces'] == sum(enlaces.values())
+    assert sim.estadisticas['datos_transmitidos_total'] == sum(enlaces.values())
+    entregables = sum(1 for origen, _ in mensajes if origen in latencias)
+    assert propagacion.estadisticas['entregas'] == propagacion.por_nodo["N01"]['entregados'] == entregables
+    assert propagacion.estadisticas['sin_ruta'] == 300 - entregables
+
+
+def test_destino_caido_y_origen_aislado():
+    memoria = SumideroMemoria()
+    sim = _simulador(num_nodos=30, semilla=1)
+    sim.agregar_sumidero(memoria)
+    sim.agregar_nodo("AISLADO", "", (50.0, 50.0))
+    propagacion = sim.configurar_propagacion(destinos=["N01", "N02", "NX"])
+    sim.simular_falla_nodo("N02")
+    propagacion.encolar("AISLADO", 100)
+    propagacion.encolar("N10", 100)
+    propagacion.vaciar()
+
+    estadisticas = propagacion.estadisticas
+    # Dos destinos existentes por dos mensajes; N02 caído pierde los dos y N01 no alcanza al aislado
+    assert estadisticas['mensajes'] == 4
+    assert (estadisticas['entregas'], estadisticas['sin_ruta']) == (1, 3)
+    assert sorted(datos['destino'] for _, _, tipo, datos in memoria.eventos if tipo == 'mensajes_sin_ruta') == \
+        ["N01", "N02"]
+
+
+def test_servidores_por_defecto_y_vaciado_en_el_despacho():
+    sim = _simulador(num_nodos=40, semilla=2)
+    for id_nodo in ("N03", "N20"):
+        sim.nodos[id_nodo].agregar_recurso(Recurso(f"{id_nodo}_servidor", 'servidor', sim.nodos[id_nodo].ubicacion))
+    propagacion = sim.configurar_propagacion(tamaño_lote=7)
+    assert propagacion.ids_destino() == ["N03", "N20"]
+
+    for i, nodo in enumerate(list(sim.nodos.values())[:20]):
+        sim.registrar_emergencia(Emergencia(f"E{i}", TipoEmergencia.MEDICA, PrioridadEmergencia.ALTA,
+                                            nodo.ubicacion, "abc", timestamp=0.0))
+    resumen = sim.procesar_emergencias(drenar=True)
+
+    assert not propagacion.pendientes
+    assert propagacion.estadisticas['lotes'] >= resumen['despachadas'] // 7
+    assert propagacion.estadisticas['mensajes'] == 2 * resumen['despachadas']
+    assert propagacion.estadisticas['entregas'] == 2 * resumen['despachadas']
+    assert sum(nodo.datos_transmitidos for nodo in sim.nodos.values()) == \
+        sim.estadisticas['datos_transmitidos_total'] == propagacion.estadisticas['bytes_enlaces']
+    cargados = propagacion.resumen(enlaces_destacados=3)['enlaces_mas_cargados']
+    assert [enlace['bytes'] for enlace in cargados] == sorted((datos[0] for datos in propagacion.enlaces.values()),
+                                                             reverse=True)[:3]
@@ -0,0 +1,60 @@
+import random
+
+from proyecto import Emergencia, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo, TipoEmergencia
+
+
+def _simulador(semilla=None):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(10)
+    reloj = [0.0]
+    sim.reloj = lambda: reloj[0]
+    return sim, reloj
+
+
+def _registrar(sim, cantidad, inicio=0):
+    ubicaciones = [nodo.ubicacion for nodo in sim.nodos.values()]
+    for i in range(inicio, inicio + cantidad):
+        sim.registrar_emergencia(Emergencia(f"E{i}", TipoEmergencia.MEDICA, PrioridadEmergencia.ALTA,
+                                            ubicaciones[i % len(ubicaciones)], "", timestamp=0.0))
+
+
+def test_procesar_no_altera_el_generador_global():
+    sim, _ = _simulador()
+    _registrar(sim, 30)
+    random.seed(123)
+    esperado = random.random()
+    random.seed(123)
+    assert sim.procesar_emergencias(drenar=True)['despachadas'] > 0
+    assert sim.liberaciones
+    assert random.random() == esperado
+
+
+def test_duraciones_reproducibles_con_semilla():
+    fines = []
+    for _ in range(2):
+        sim, _ = _simulador(semilla=9)
+        _registrar(sim, 30)
+        sim.procesar_emergencias(drenar=True)
+        fines.append(sorted(fin for fin, *_ in sim.liberaciones))
+    assert fines[0] == fines[1]
+
+
+def test_recursos_liberados_se_reutilizan():
+    sim, reloj = _simulador(semilla=1)
+    total = sum(len(nodo.recursos) for nodo in sim.nodos.values())
+    # Tres emergencias por recurso en la ubicación de cada estación
+    for nodo in sim.nodos.values():
+        for i in range(3 * len(nodo.recursos)):
+            sim.registrar_emergencia(Emergencia(f"{nodo.id}-{i}", TipoEmergencia.MEDICA, PrioridadEmergencia.ALTA,
+                                                nodo.ubicacion, "", timestamp=0.0))
+
+    sim.procesar_emergencias(drenar=True)
+    assert sum(nodo.num_recursos_disponibles for nodo in sim.nodos.values()) == 0
+    ocupados = len(sim.liberaciones)
+    assert ocupados == total
+
+    # Antes del fin de cualquier servicio no se libera nada
+    assert sim.liberar_recursos(min(fin for fin, *_ in sim.liberaciones) - 1) == 0
+    reloj[0] = max(fin for fin, *_ in sim.liberaciones)
+    assert sim.procesar_emergencias(drenar=True)['despachadas'] == total
+    assert all(not recurso.disponible for nodo in sim.nodos.values() for recurso in nodo.recursos)
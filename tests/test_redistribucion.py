@@ -0,0 +1,85 @@
+import math
+import random
+
+from proyecto import Emergencia, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo, TipoEmergencia
+
+
+def _simulador(num_nodos=60, semilla=0):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos)
+    return sim
+
+
+def _cargar(sim, id_nodo, cantidad, rng):
+    """Encolar emergencias directamente en un nodo, alrededor de su ubicación"""
+    x, y = sim.nodos[id_nodo].ubicacion
+    for i in range(cantidad):
+        emergencia = Emergencia(f"{id_nodo}-{i}", rng.choice(list(TipoEmergencia)),
+                                rng.choice(list(PrioridadEmergencia)),
+                                (x + rng.uniform(-1, 1), y + rng.uniform(-1, 1)), "", timestamp=float(i))
+        sim.tabla_emergencias.insertar(emergencia)
+        sim.nodos[id_nodo].agregar_emergencia(emergencia)
+
+
+def _reparto_esperado(sim, emergencias, origen):
+    """La regla de reparto, con las candidatas buscadas por fuerza bruta"""
+    centro = sim.nodos[origen].ubicacion
+    activas = sorted((n for n in sim.nodos.values() if n.activo and n.id != origen),
+                     key=lambda n: math.dist(n.ubicacion, centro))
+    candidatas = activas[:sim.CANDIDATOS_REDISTRIBUCION]
+    cargas = {n.id: len(n.emergencias_pendientes) for n in candidatas}
+    reparto = {}
+    for emergencia in sorted(emergencias):
+        mejor = min(candidatas, key=lambda n: math.dist(n.ubicacion, emergencia.ubicacion)
+                    + sim.PESO_CARGA_REDISTRIBUCION * cargas[n.id])
+        cargas[mejor.id] += 1
+        reparto[emergencia.id] = mejor.id
+    return reparto
+
+
+def test_reparto_por_distancia_y_carga():
+    sim = _simulador()
+    rng = random.Random(0)
+    ids = list(sim.nodos)
+    for id_nodo in ids[:10]:
+        _cargar(sim, id_nodo, rng.randint(0, 5), rng)
+    _cargar(sim, "N30", 200, rng)
+    for id_nodo in rng.sample(ids[:29], 5):
+        sim.simular_falla_nodo(id_nodo)
+
+    origen = sim.nodos["N30"]
+    atendida = origen.emergencias_pendientes[3]
+    sim.tabla_emergencias.marcar_atendida(atendida)
+    pendientes = [e for e in origen.emergencias_pendientes if not e.atendida]
+    esperado = _reparto_esperado(sim, pendientes, "N30")
+    destinos = sim.simular_falla_nodo("N30")
+
+    assert not origen.emergencias_pendientes
+    ubicacion_real = {e.id: n.id for n in sim.nodos.values() for e in n.emergencias_pendientes}
+    assert atendida.id not in ubicacion_real
+    assert {e.id: ubicacion_real[e.id] for e in pendientes} == esperado
+    assert destinos == {id_destino: list(esperado.values()).count(id_destino) for id_destino in set(esperado.values())}
+    # La carga reparte el bloque entre varias estaciones en lugar de la más cercana
+    assert len(destinos) > 1
+    for nodo in sim.nodos.values():
+        cola = nodo.emergencias_pendientes
+        assert all(not cola[(i - 1) // 2] > cola[i] for i in range(1, len(cola)))
+        if cola:
+            assert sim.torneo.claves[sim.hoja_torneo[nodo.id]] == sim._clave_torneo(nodo)
+
+
+def test_sin_estaciones_activas_esperan_hasta_la_restauracion():
+    sim = _simulador(num_nodos=5)
+    rng = random.Random(1)
+    _cargar(sim, "N01", 20, rng)
+    for id_nodo in ["N02", "N03", "N04", "N05"]:
+        sim.simular_falla_nodo(id_nodo)
+
+    assert sim.simular_falla_nodo("N01") == {}
+    assert len(sim.en_espera) == 20
+    assert min(sim.en_espera) is sim.en_espera[0]
+
+    assert sim.restaurar_nodo("N04") == {"N04": 20}
+    assert not sim.en_espera
+    assert len(sim.nodos["N04"].emergencias_pendientes) == 20
+    assert sim.simular_falla_nodo("NX") == {} and sim.restaurar_nodo("NX") == {}
@@ -0,0 +1,87 @@
+import heapq
+import math
+import random
+
+import pytest
+
+import proyecto
+from proyecto import Emergencia, PrioridadEmergencia, SimuladorRedLAN, SumideroNulo, TipoEmergencia
+
+
+def _emergencias(cantidad, rng, extension=10.0):
+    return [
+        Emergencia(f"E{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+                   (rng.uniform(-extension, extension), rng.uniform(-extension, extension)), "")
+        for i in range(cantidad)
+    ]
+
+
+def _mas_cercano_activo(sim, ubicacion):
+    activos = [nodo for nodo in sim.nodos.values() if nodo.activo]
+    return min(activos, key=lambda nodo: math.dist(nodo.ubicacion, ubicacion)).id if activos else None
+
+
+def test_asigna_el_nodo_activo_mas_cercano_sin_radio_fijo():
+    sim = SimuladorRedLAN(semilla=1, sumideros=[SumideroNulo()])
+    sim.agregar_nodo("A", "A", (0.0, 0.0))
+    sim.agregar_nodo("B", "B", (100.0, 100.0))
+    # Antes una emergencia a más de 5.0 de toda estación quedaba sin asignar
+    lejana = Emergencia("L", TipoEmergencia.ROBO, PrioridadEmergencia.BAJA, (60.0, 60.0), "")
+    assert sim.registrar_emergencia(lejana) == "B"
+
+    sim.simular_falla_nodo("B")
+    otra = Emergencia("M", TipoEmergencia.ROBO, PrioridadEmergencia.BAJA, (90.0, 90.0), "")
+    assert sim.registrar_emergencia(otra) == "A"
+
+
+def test_registro_individual_contra_fuerza_bruta():
+    sim = SimuladorRedLAN(semilla=2, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(300)
+    rng = random.Random(2)
+    for id_nodo in rng.sample(list(sim.nodos), 40):
+        sim.simular_falla_nodo(id_nodo)
+    for emergencia in _emergencias(300, rng, extension=12.0):
+        esperado = _mas_cercano_activo(sim, emergencia.ubicacion)
+        assert sim.registrar_emergencia(emergencia) == esperado
+
+
+@pytest.mark.parametrize("modo", ['numpy', 'arbol', 'python'])
+def test_lote_equivale_a_registros_individuales(modo, monkeypatch):
+    if modo == 'numpy' and proyecto.np is None:
+        pytest.skip("NumPy no está instalado")
+    if modo == 'arbol':
+        monkeypatch.setattr(SimuladorRedLAN, 'UMBRAL_FUERZA_BRUTA', 0)
+    if modo == 'python':
+        monkeypatch.setattr(proyecto, 'np', None)
+
+    individual = SimuladorRedLAN(semilla=3, sumideros=[SumideroNulo()])
+    individual.generar_topologia_espacial(200)
+    lote = SimuladorRedLAN(semilla=3, sumideros=[SumideroNulo()])
+    lote.generar_topologia_espacial(200)
+    for sim in (individual, lote):
+        sim.simular_falla_nodo("N07")
+
+    rng = random.Random(3)
+    emergencias = _emergencias(2000, rng)
+    esperadas = [individual.registrar_emergencia(emergencia) for emergencia in emergencias]
+    copias = [Emergencia(e.id, e.tipo, e.prioridad, e.ubicacion, e.descripcion, e.timestamp) for e in emergencias]
+    assert lote.registrar_emergencias_lote(copias) == esperadas
+
+    assert lote.estadisticas['emergencias_totales'] == 2000
+    assert len(lote.tabla_emergencias) == 2000
+    for id_nodo, nodo in lote.nodos.items():
+        assert sorted(e.id for e in nodo.emergencias_pendientes) == \
+            sorted(e.id for e in individual.nodos[id_nodo].emergencias_pendientes)
+        # La cola sigue siendo un heap válido: sale en orden de (prioridad, antigüedad)
+        cola = list(nodo.emergencias_pendientes)
+        claves = [(e.prioridad.value, e.timestamp) for e in (heapq.heappop(cola) for _ in range(len(cola)))]
+        assert claves == sorted(claves)
+
+
+def test_lote_sin_nodos_activos():
+    sim = SimuladorRedLAN(semilla=4, sumideros=[SumideroNulo()])
+    sim.agregar_nodo("A", "A", (0.0, 0.0))
+    sim.simular_falla_nodo("A")
+    emergencias = _emergencias(5, random.Random(4))
+    assert sim.registrar_emergencias_lote(emergencias) == [None] * 5
+    assert len(sim.tabla_emergencias) == 5
@@ -0,0 +1,141 @@
+import heapq
+import math
+import random
+
+import pytest
+
+from proyecto import GrafoCompacto, SimuladorRedLAN, SumideroNulo
+
+
+def _distancias(sim, origen):
+    """Dijkstra de referencia sobre sim.grafo, solo por nodos activos"""
+    distancias = {origen: 0.0}
+    cola = [(0.0, origen)]
+    while cola:
+        distancia, nodo = heapq.heappop(cola)
+        if distancia > distancias[nodo]:
+            continue
+        for vecino, peso in sim.grafo[nodo].items():
+            if not sim.nodos[vecino].activo:
+                continue
+            nueva = distancia + peso
+            if nueva < distancias.get(vecino, math.inf):
+                distancias[vecino] = nueva
+                heapq.heappush(cola, (nueva, vecino))
+    return distancias
+
+
+def _comprobar_ruta(sim, origen, destino, ruta, costo):
+    if not (sim.nodos[origen].activo and sim.nodos[destino].activo):
+        assert (ruta, costo) == ([], math.inf)
+        return
+    esperado = _distancias(sim, origen).get(destino, math.inf)
+    if esperado == math.inf:
+        assert (ruta, costo) == ([], math.inf)
+        return
+    assert costo == pytest.approx(esperado, rel=1e-9)
+    assert ruta[0] == origen and ruta[-1] == destino
+    assert all(sim.nodos[nodo].activo for nodo in ruta)
+    assert sum(sim.grafo[u][v] for u, v in zip(ruta, ruta[1:])) == pytest.approx(costo, rel=1e-9)
+
+
+def _red(num_nodos=300, semilla=0, **opciones):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()], **opciones)
+    sim.generar_topologia_espacial(num_nodos)
+    return sim
+
+
+def test_cache_de_rutas_sigue_fallas_restauraciones_y_conexiones():
+    sim = _red(capacidad_cache_rutas=16)
+    rng = random.Random(0)
+    ids = list(sim.nodos)
+    origenes = ids[:10]  # Pocos orígenes para que la caché tenga aciertos y reparaciones
+    for paso in range(300):
+        accion = rng.random()
+        if accion < 0.1:
+            id_nodo = rng.choice(ids)
+            if sim.nodos[id_nodo].activo:
+                sim.simular_falla_nodo(id_nodo)
+            else:
+                sim.restaurar_nodo(id_nodo)
+        elif accion < 0.2:
+            # Peso nuevo mayor o menor que el anterior: desalojo o reparación del árbol
+            sim.agregar_conexion(rng.choice(ids), rng.choice(ids), rng.uniform(0.1, 8))
+        origen, destino = rng.choice(origenes), rng.choice(ids)
+        _comprobar_ruta(sim, origen, destino, *sim.dijkstra(origen, destino))
+
+    estadisticas = sim.estadisticas_cache_rutas
+    assert estadisticas['aciertos'] > estadisticas['fallos']
+    assert estadisticas['reparaciones'] > 0 and estadisticas['desalojos'] > 0
+    assert len(sim.cache_rutas) <= 16
+
+
+def test_cache_desactivada_da_lo_mismo():
+    con_cache, sin_cache = _red(semilla=1), _red(semilla=1, capacidad_cache_rutas=0)
+    rng = random.Random(1)
+    ids = list(con_cache.nodos)
+    for _ in range(100):
+        origen, destino = rng.choice(ids[:5]), rng.choice(ids)
+        assert con_cache.dijkstra(origen, destino) == sin_cache.dijkstra(origen, destino)
+    assert not sin_cache.cache_rutas
+
+
+@pytest.mark.parametrize("motor", ['astar', 'bidireccional'])
+@pytest.mark.parametrize("compacto", [False, True])
+def test_motores_coinciden_con_dijkstra(motor, compacto):
+    sim = _red(semilla=2, usar_grafo_compacto=compacto)
+    rng = random.Random(2)
+    ids = list(sim.nodos)
+    # Atajos con peso menor que la distancia: la heurística de A* debe seguir siendo admisible
+    for _ in range(30):
+        u, v = rng.sample(ids, 2)
+        sim.agregar_conexion(u, v, math.dist(sim.nodos[u].ubicacion, sim.nodos[v].ubicacion) * 0.3)
+    for id_nodo in rng.sample(ids, 20):
+        sim.simular_falla_nodo(id_nodo)
+    consultas = 0
+    for _ in range(150):
+        origen, destino = rng.choice(ids), rng.choice(ids)
+        _comprobar_ruta(sim, origen, destino, *sim.calcular_ruta(origen, destino, motor))
+        consultas += sim.nodos[origen].activo and sim.nodos[destino].activo
+    assert sim.estadisticas_motores[motor]['consultas'] == consultas
+
+
+def test_motor_desconocido():
+    sim = _red(num_nodos=10)
+    assert sim.calcular_ruta("N01", "N02", motor='otro') == ([], math.inf)
+
+
+def test_grafo_compacto_refleja_el_grafo():
+    sim = _red(num_nodos=200, semilla=3)
+    sim.simular_falla_nodo("N10")
+    compacto = GrafoCompacto.desde_grafo(sim.nodos, sim.grafo)
+    assert compacto.ids == list(sim.nodos)
+    for i, id_nodo in enumerate(compacto.ids):
+        inicio, fin = compacto.offsets[i], compacto.offsets[i + 1]
+        vecinos = {compacto.ids[j]: peso for j, peso in zip(compacto.destinos[inicio:fin], compacto.pesos[inicio:fin])}
+        assert vecinos == sim.grafo[id_nodo]
+        assert compacto.activos[i] == sim.nodos[id_nodo].activo
+
+    distancias, _, _ = compacto.dijkstra(compacto.indices["N01"])
+    referencia = _distancias(sim, "N01")
+    for i, id_nodo in enumerate(compacto.ids):
+        assert distancias[i] == referencia.get(id_nodo, math.inf)
+
+
+def test_backend_compacto_da_las_mismas_rutas_y_se_reconstruye():
+    dicts, csr = _red(semilla=4), _red(semilla=4, usar_grafo_compacto=True)
+    rng = random.Random(4)
+    ids = list(dicts.nodos)
+    for paso in range(200):
+        if paso % 20 == 0:
+            u, v, peso = rng.choice(ids), rng.choice(ids), rng.uniform(0.1, 5)
+            for sim in (dicts, csr):
+                sim.agregar_conexion(u, v, peso)
+        if paso % 30 == 0:
+            id_nodo = rng.choice(ids)
+            for sim in (dicts, csr):
+                sim.simular_falla_nodo(id_nodo)
+        origen, destino = rng.choice(ids), rng.choice(ids)
+        ruta, costo = csr.dijkstra(origen, destino)
+        assert costo == pytest.approx(dicts.dijkstra(origen, destino)[1], rel=1e-12)
+        _comprobar_ruta(csr, origen, destino, ruta, costo)
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from proyecto import SimuladorRedLAN, SumideroNulo
+
+
+@pytest.fixture
+def simulador():
+    sim = SimuladorRedLAN(semilla=4, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(300)
+    sim.simular_falla_nodo(list(sim.nodos)[7])
+    return sim
+
+
+@pytest.fixture
+def snapshot(simulador, tmp_path):
+    ruta = tmp_path / "red.bin"
+    simulador.exportar_snapshot(str(ruta))
+    return ruta
+
+
+def test_ida_y_vuelta(simulador, snapshot):
+    cargado = SimuladorRedLAN(sumideros=[SumideroNulo()])
+    assert cargado.cargar_snapshot(str(snapshot))
+
+    assert list(cargado.nodos) == list(simulador.nodos)
+    for id_nodo, nodo in simulador.nodos.items():
+        copia = cargado.nodos[id_nodo]
+        assert copia.ubicacion == nodo.ubicacion and copia.activo == nodo.activo
+        assert [r.id for r in copia.recursos] == [r.id for r in nodo.recursos]
+        assert cargado.grafo[id_nodo] == simulador.grafo[id_nodo]
+
+    indices = {id_nodo: i for i, id_nodo in enumerate(simulador.nodos)}
+    assert cargado.arbol_geografico.a_preorden(indices) == simulador.arbol_geografico.a_preorden(indices)
+
+    rng = random.Random(0)
+    ids = list(simulador.nodos)
+    for _ in range(50):
+        origen, destino = rng.choice(ids), rng.choice(ids)
+        assert cargado.dijkstra(origen, destino) == simulador.dijkstra(origen, destino)
+
+
+def test_archivo_vacio(tmp_path):
+    ruta = tmp_path / "vacio.bin"
+    ruta.write_bytes(b"")
+    sim = SimuladorRedLAN(sumideros=[SumideroNulo()])
+    assert sim.cargar_snapshot(str(ruta)) is False
+    assert sim._snapshot_mmap is None
+
+
+def test_magia_invalida(snapshot):
+    datos = bytearray(snapshot.read_bytes())
+    datos[:8] = b"XXXXXXXX"
+    snapshot.write_bytes(bytes(datos))
+    assert SimuladorRedLAN(sumideros=[SumideroNulo()]).cargar_snapshot(str(snapshot)) is False
+
+
+def test_archivo_truncado(snapshot):
+    datos = snapshot.read_bytes()
+    for longitud in (10, 136, len(datos) // 3, len(datos) - 1):
+        snapshot.write_bytes(datos[:longitud])
+        sim = SimuladorRedLAN(sumideros=[SumideroNulo()])
+        assert sim.cargar_snapshot(str(snapshot)) is False
+        assert not sim.nodos
+
+
+def test_segunda_carga_cierra_el_mapeo_anterior(snapshot, tmp_path):
+    vacio = tmp_path / "vacio_valido.bin"
+    SimuladorRedLAN(sumideros=[SumideroNulo()]).exportar_snapshot(str(vacio))
+    sim = SimuladorRedLAN(sumideros=[SumideroNulo()])
+    assert sim.cargar_snapshot(str(vacio))
+    anterior = sim._snapshot_mmap
+    assert sim.cargar_snapshot(str(snapshot))
+    assert anterior.closed and not sim._snapshot_mmap.closed
@@ -0,0 +1,83 @@
+import io
+import json
+import re
+from pathlib import Path
+
+import proyecto
+from proyecto import NivelEvento, SimuladorRedLAN, SumideroConsola, SumideroMemoria, SumideroNDJSON, SumideroNulo
+
+
+def test_cada_tipo_de_evento_tiene_plantilla_de_consola():
+    fuente = Path(proyecto.__file__).read_text(encoding='utf-8')
+    tipos = set(re.findall(r"_emitir\(NivelEvento\.\w+,\s*'(\w+)'", fuente))
+    assert tipos and tipos <= set(SumideroConsola.MENSAJES)
+
+
+def test_cada_sumidero_recibe_solo_su_nivel():
+    todo, advertencias = SumideroMemoria(), SumideroMemoria(nivel_minimo=NivelEvento.ADVERTENCIA)
+    sim = SimuladorRedLAN(sumideros=[todo, advertencias])
+    sim.agregar_nodo("N1", "Uno", (0.0, 0.0))
+    sim.agregar_conexion("N1", "X", 1.0)
+
+    assert [(nivel, tipo) for _, nivel, tipo, _ in todo.eventos] == [
+        (NivelEvento.DEBUG, 'nodo_agregado'), (NivelEvento.ERROR, 'nodos_inexistentes')
+    ]
+    assert [tipo for _, _, tipo, _ in advertencias.eventos] == ['nodos_inexistentes']
+    assert todo.eventos[0][3] == {'id': "N1", 'nombre': "Uno", 'ubicacion': (0.0, 0.0)}
+
+    sim.quitar_sumidero(todo)
+    sim.agregar_nodo("N2", "Dos", (1.0, 1.0))
+    assert len(todo.eventos) == 2 and len(advertencias.eventos) == 1
+
+
+def test_sin_sumideros_activos_no_se_consulta_el_reloj():
+    sim = SimuladorRedLAN(sumideros=[SumideroNulo()])
+    llamadas = []
+    sim.reloj = lambda: llamadas.append(1) or 0.0
+    sim._emitir(NivelEvento.ERROR, 'nodos_inexistentes')
+    assert not llamadas
+    sim.agregar_sumidero(SumideroMemoria(nivel_minimo=NivelEvento.ERROR))
+    sim._emitir(NivelEvento.INFO, 'nodo_restaurado', id="N1")
+    assert not llamadas
+    sim._emitir(NivelEvento.ERROR, 'nodos_inexistentes')
+    assert llamadas == [1]
+
+
+def test_memoria_acotada():
+    memoria = SumideroMemoria(capacidad=3)
+    for i in range(10):
+        memoria.emitir(float(i), NivelEvento.INFO, 'nodo_restaurado', {'id': i})
+    assert [datos['id'] for *_, datos in memoria.eventos] == [7, 8, 9]
+
+
+def test_ndjson_con_buffer(tmp_path):
+    flujo = io.StringIO()
+    sumidero = SumideroNDJSON(flujo, tamaño_buffer=3)
+    for i in range(4):
+        sumidero.emitir(float(i), NivelEvento.INFO, 'nodo_restaurado', {'id': f"N{i}"})
+    assert len(flujo.getvalue().splitlines()) == 3
+    sumidero.cerrar()
+    lineas = [json.loads(linea) for linea in flujo.getvalue().splitlines()]
+    assert lineas[-1] == {'t': 3.0, 'nivel': 'INFO', 'tipo': 'nodo_restaurado', 'id': "N3"}
+    assert not flujo.closed  # El flujo ajeno no se cierra
+
+    ruta = tmp_path / "eventos.ndjson"
+    with SumideroNDJSON(str(ruta)) as archivo:
+        sim = SimuladorRedLAN(sumideros=[archivo])
+        sim.agregar_nodo("N1", "Estación ñ", (0.0, 0.0))
+    registro = json.loads(ruta.read_text(encoding='utf-8'))
+    assert archivo.archivo.closed
+    assert registro['tipo'] == 'nodo_agregado' and registro['nombre'] == "Estación ñ"
+    assert registro['ubicacion'] == [0.0, 0.0]
+
+
+def test_consola_reproduce_los_mensajes(capsys):
+    sim = SimuladorRedLAN()
+    sim.agregar_nodo("N1", "Uno", (0.0, 0.0))
+    sim.agregar_conexion("N1", "X", 1.0)
+    SumideroConsola().emitir(0.0, NivelEvento.INFO, 'sin_plantilla', {'a': 1})
+    assert capsys.readouterr().out.splitlines() == [
+        "Nodo N1 (Uno) agregado en ubicación (0.0, 0.0)",
+        "Error: Uno o ambos nodos no existen",
+        "[INFO] sin_plantilla: {'a': 1}",
+    ]
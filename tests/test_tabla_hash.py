@@ -0,0 +1,118 @@
+import gc
+import random
+import time
+
+from proyecto import Emergencia, PrioridadEmergencia, TablaHashEmergencias, TipoEmergencia
+
+
+def _emergencia(i, rng):
+    return Emergencia(f"E{i}", rng.choice(list(TipoEmergencia)), rng.choice(list(PrioridadEmergencia)),
+                      (0.0, 0.0), "", timestamp=float(i))
+
+
+def test_coincide_con_dict_durante_rehash():
+    rng = random.Random(7)
+    tabla = TablaHashEmergencias(8)
+    referencia = {}
+    tamaños = set()
+    for i in range(20000):
+        operacion = rng.random()
+        if operacion < 0.6 or not referencia:
+            emergencia = _emergencia(rng.randrange(8000), rng)
+            tabla.insertar(emergencia)
+            referencia[emergencia.id] = emergencia
+        elif operacion < 0.9:
+            id_emergencia = rng.choice(list(referencia)) if rng.random() < 0.8 else "X"
+            assert tabla.eliminar(id_emergencia) is referencia.pop(id_emergencia, None)
+        else:
+            id_emergencia = f"E{rng.randrange(8000)}"
+            assert tabla.buscar(id_emergencia) is referencia.get(id_emergencia)
+        tamaños.add(tabla.tamaño)
+        assert len(tabla) == len(referencia)
+
+    assert len(tamaños) > 3
+    assert {e.id for e in tabla} == set(referencia)
+    for id_emergencia, emergencia in referencia.items():
+        assert tabla.buscar(id_emergencia) is emergencia
+    for tipo in TipoEmergencia:
+        esperadas = {e.id for e in referencia.values() if e.tipo == tipo}
+        assert {e.id for e in tabla.consultar(tipo=tipo)} == esperadas
+
+
+def test_encoge_sin_mas_eliminaciones():
+    tabla = TablaHashEmergencias(8)
+    rng = random.Random(1)
+    emergencias = [_emergencia(i, rng) for i in range(2000)]
+    for emergencia in emergencias:
+        tabla.insertar(emergencia)
+    for emergencia in emergencias[:1990]:
+        tabla.eliminar(emergencia.id)
+    # Solo búsquedas: el factor de carga se revisa igual y la tabla vuelve a achicarse
+    for _ in range(2000):
+        tabla.buscar("E1995")
+    assert tabla.tabla_nueva is None
+    assert tabla.tamaño <= 64
+    assert all(tabla.buscar(e.id) is e for e in emergencias[1990:])
+
+
+def _peores_inserciones(emergencias):
+    """Peor inserción que inicia un rehash y peor inserción durante la migración"""
+    tabla = TablaHashEmergencias(8)
+    peor_al_iniciar_rehash = 0.0
+    peor_en_rehash = 0.0
+    # Sin GC para no atribuir a la tabla una recolección completa que cae en cualquier inserción
+    gc.disable()
+    try:
+        for emergencia in emergencias:
+            en_rehash = tabla.tabla_nueva is not None
+            inicio = time.perf_counter()
+            tabla.insertar(emergencia)
+            duracion = time.perf_counter() - inicio
+            if not en_rehash and tabla.tabla_nueva is not None:
+                peor_al_iniciar_rehash = max(peor_al_iniciar_rehash, duracion)
+            elif en_rehash:
+                peor_en_rehash = max(peor_en_rehash, duracion)
+    finally:
+        gc.enable()
+    assert max(tabla.tamaño, tabla.tamaño_nuevo) >= 262144
+    return peor_al_iniciar_rehash, peor_en_rehash
+
+
+def test_ninguna_insercion_se_detiene_al_crecer():
+    rng = random.Random(3)
+    emergencias = [_emergencia(i, rng) for i in range(150000)]
+    # El mejor de tres descarta pausas del sistema que no dependen de la tabla
+    corridas = [_peores_inserciones(emergencias) for _ in range(3)]
+    # Crear la tabla de 2^18 cubetas con una lista por cubeta tardaba ~17 ms en esa inserción
+    assert min(al_iniciar for al_iniciar, _ in corridas) < 0.005
+    assert min(en_rehash for _, en_rehash in corridas) < 0.005
+
+
+def test_indices_secundarios_y_lote():
+    rng = random.Random(11)
+    tabla = TablaHashEmergencias(4)
+    tabla.insertar_lote([_emergencia(i, rng) for i in range(3000)])
+    assert tabla.tabla_nueva is None and len(tabla) == 3000
+    referencia = {e.id: e for e in tabla}
+
+    for id_emergencia in rng.sample(list(referencia), 1000):
+        tabla.marcar_atendida(referencia[id_emergencia])
+    # Reemplazar una entrada con otro tipo y prioridad actualiza los índices
+    for i in rng.sample(range(3000), 300):
+        emergencia = _emergencia(i, rng)
+        tabla.insertar(emergencia)
+        referencia[emergencia.id] = emergencia
+    for id_emergencia in rng.sample(list(referencia), 500):
+        tabla.eliminar(id_emergencia)
+        del referencia[id_emergencia]
+
+    assert len(tabla) == len(referencia)
+    for tipo in (None, *TipoEmergencia):
+        for prioridad in (None, *PrioridadEmergencia):
+            for atendida in (None, False, True):
+                esperadas = {
+                    e.id for e in referencia.values()
+                    if (tipo is None or e.tipo == tipo) and (prioridad is None or e.prioridad == prioridad)
+                    and (atendida is None or e.atendida == atendida)
+                }
+                assert {e.id for e in tabla.consultar(tipo, prioridad, atendida)} == esperadas
@@ -0,0 +1,83 @@
+import math
+import random
+
+import pytest
+
+import proyecto
+from proyecto import GrafoCompacto, SimuladorRedLAN, SumideroNulo, TablaRutasCompleta
+
+
+def _simulador(num_nodos=120, semilla=0):
+    sim = SimuladorRedLAN(semilla=semilla, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(num_nodos)
+    return sim
+
+
+def _comprobar_tabla(sim, tabla):
+    """Cada fila contra un Dijkstra nuevo sobre el estado actual del grafo"""
+    compacto = GrafoCompacto.desde_grafo(sim.nodos, sim.grafo)
+    for t, destino in enumerate(compacto.ids):
+        if not compacto.activos[t]:
+            continue
+        referencia, _, _ = compacto.dijkstra(t)
+        for s, origen in enumerate(compacto.ids):
+            if not compacto.activos[s] or referencia[s] == math.inf:
+                assert tabla.hacia[t][s] < 0 or not compacto.activos[s]
+                continue
+            assert tabla.distancia(origen, destino) == pytest.approx(referencia[s], rel=1e-5)
+            ruta, costo = sim.dijkstra(origen, destino)
+            assert ruta[0] == origen and ruta[-1] == destino
+            assert all(sim.nodos[nodo].activo for nodo in ruta)
+            # El costo es la suma float64 sobre el grafo, no el valor float32 de la tabla
+            assert costo == sum(sim.grafo[u][v] for u, v in zip(ruta, ruta[1:]))
+            assert costo == pytest.approx(referencia[s], rel=1e-5)
+
+
+@pytest.mark.parametrize("metodo", ['floyd', 'dijkstra', 'auto'])
+def test_construccion_coincide_con_dijkstra(metodo):
+    if metodo == 'floyd' and proyecto.np is None:
+        pytest.skip("NumPy no está instalado")
+    sim = _simulador()
+    sim.simular_falla_nodo("N07")
+    tabla = sim.precalcular_rutas(metodo, procesos=1)
+    assert tabla.metodo == (metodo if metodo != 'auto' else tabla.elegir_metodo(1))
+    _comprobar_tabla(sim, tabla)
+
+
+def test_parches_equivalen_a_reconstruir():
+    sim = _simulador(semilla=1)
+    sim.precalcular_rutas('dijkstra', procesos=1)
+    rng = random.Random(1)
+    ids = list(sim.nodos)
+    for paso in range(12):
+        id_nodo = rng.choice(ids)
+        if sim.nodos[id_nodo].activo:
+            sim.simular_falla_nodo(id_nodo)
+        else:
+            sim.restaurar_nodo(id_nodo)
+        if paso % 4 == 3:
+            nueva = TablaRutasCompleta.construir(GrafoCompacto.desde_grafo(sim.nodos, sim.grafo), 'dijkstra', 1)
+            for parchada, reconstruida in zip(sim.tabla_rutas.distancias, nueva.distancias):
+                assert list(map(float, parchada)) == pytest.approx(list(map(float, reconstruida)), rel=1e-5)
+    _comprobar_tabla(sim, sim.tabla_rutas)
+
+
+def test_sin_numpy_y_errores(monkeypatch):
+    monkeypatch.setattr(proyecto, 'np', None)
+    sim = _simulador(num_nodos=40, semilla=2)
+    compacto = sim.obtener_grafo_compacto()
+    with pytest.raises(RuntimeError):
+        TablaRutasCompleta.construir(compacto, 'floyd')
+    with pytest.raises(ValueError):
+        TablaRutasCompleta.construir(compacto, 'otro')
+
+    tabla = sim.precalcular_rutas('auto')
+    assert tabla.metodo == 'dijkstra'
+    sim.simular_falla_nodo("N05")
+    sim.restaurar_nodo("N05")
+    sim.simular_falla_nodo("N09")
+    _comprobar_tabla(sim, tabla)
+
+    # Una conexión nueva descarta la tabla
+    sim.agregar_conexion("N01", "N30", 0.5)
+    assert sim.tabla_rutas is None
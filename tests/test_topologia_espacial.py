@@ -0,0 +1,77 @@
+import math
+from collections import deque
+
+import pytest
+
+import proyecto
+from proyecto import SimuladorRedLAN, SumideroNulo
+
+
+def _componentes(sim):
+    vistos, componentes = set(), 0
+    for inicio in sim.nodos:
+        if inicio in vistos:
+            continue
+        componentes += 1
+        vistos.add(inicio)
+        cola = deque([inicio])
+        while cola:
+            for vecino in sim.grafo[cola.popleft()]:
+                if vecino not in vistos:
+                    vistos.add(vecino)
+                    cola.append(vecino)
+    return componentes
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def modo(request, monkeypatch):
+    if request.param == 'numpy':
+        if proyecto.np is None:
+            pytest.skip("NumPy no está instalado")
+    else:
+        monkeypatch.setattr(proyecto, 'np', None)
+    return request.param
+
+
+def test_red_conexa_de_k_vecinos(modo):
+    sim = SimuladorRedLAN(semilla=3, sumideros=[SumideroNulo()])
+    assert sim.generar_topologia_espacial(2000, vecinos=3)
+    assert len(sim.nodos) == 2000
+    assert _componentes(sim) == 1
+    for id_nodo, nodo in sim.nodos.items():
+        assert len(nodo.conexiones) >= 3
+        assert sim.grafo[id_nodo] is nodo.conexiones
+        assert 1 <= len(nodo.recursos) <= 3
+        for vecino, peso in nodo.conexiones.items():
+            assert sim.grafo[vecino][id_nodo] == peso
+            assert peso == pytest.approx(math.dist(nodo.ubicacion, sim.nodos[vecino].ubicacion))
+    assert len(sim.arbol_geografico) == 2000
+
+
+def test_vecinos_son_los_mas_cercanos(modo):
+    sim = SimuladorRedLAN(semilla=5, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(400, vecinos=4)
+    nodos = list(sim.nodos.values())
+    for nodo in nodos[:50]:
+        cercanos = sorted((math.dist(nodo.ubicacion, otro.ubicacion), otro.id) for otro in nodos if otro is not nodo)
+        assert {id_otro for _, id_otro in cercanos[:4]} <= set(nodo.conexiones)
+
+
+def test_rechaza_ids_existentes():
+    sim = SimuladorRedLAN(semilla=1, sumideros=[SumideroNulo()])
+    sim.agregar_nodo("N05", "Existente", (0.0, 0.0))
+    assert sim.generar_topologia_espacial(10) is False
+    assert list(sim.nodos) == ["N05"] and sim.nodos["N05"].nombre == "Existente"
+
+    assert sim.generar_topologia_espacial(10, prefijo="R")
+    assert len(sim.nodos) == 11 and len(sim.arbol_geografico) == 11
+
+
+def test_en_modo_concurrente_crea_cerrojos_y_torneo():
+    sim = SimuladorRedLAN(semilla=2, sumideros=[SumideroNulo()])
+    sim.generar_topologia_espacial(50)
+    with sim.modo_concurrente():
+        assert sim.generar_topologia_espacial(50, prefijo="C")
+        assert all(id_nodo in sim._cerrojos_nodo for id_nodo in sim.nodos)
+    for id_nodo, hoja in sim.hoja_torneo.items():
+        assert sim.torneo.claves[hoja] == sim._clave_torneo(sim.nodos[id_nodo])